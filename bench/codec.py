@@ -0,0 +1,94 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Decode cost of a 100k-entry get_transfers response: the old `response.json()` + `ResultClass(...)`
+path against Codec.decode() over the raw response bytes, eager, validated (VALIDATE_RESULTS),
+lazy (LAZY_RESULTS) and raw (Client.raw, the result bytes a proxy would forward) for every
+codec that is installed.
+
+    python -m bench.codec [entries]
+"""
+
+import sys
+import json
+import timeit
+import httpx
+from xmrpy._codec import _CODECS
+from xmrpy._raw import RawResult
+from xmrpy._result import Result
+from xmrpy.t import RpcResponse
+
+
+def transfers_payload(n: int) -> bytes:
+    transfer = {
+        "address": "83Gwvm9JV6TQvzjfLeRxnaUPMF6cHaK4cVtcrLmZQmnfWEr5hDsoJuXPVYy7yP9f1rXxSTRt8FJBK7MKfUGDBsyc5RKAn1c",
+        "amount": 1000000000000,
+        "confirmations": 10,
+        "double_spend_seen": False,
+        "fee": 8270000,
+        "height": 2400000,
+        "note": "",
+        "payment_id": "0000000000000000",
+        "subaddr_index": {"major": 0, "minor": 1},
+        "suggested_confirmations_threshold": 1,
+        "timestamp": 1633000000,
+        "txid": "5885d365f50564cf92cccd4542287af16951c590eff7fc7fe1daf88eb480d65e",
+        "type": "in",
+        "unlock_time": 0,
+    }
+    result = {"in": [dict(transfer, height=transfer["height"] + i) for i in range(n)], "out": []}
+    return json.dumps({"id": "0", "jsonrpc": "2.0", "result": result}).encode()
+
+
+def legacy_decode(response: httpx.Response) -> RpcResponse:
+    rjson = response.json()
+    rjson.update({"result": Result.GetTransfers.value(rjson["result"]), "error": None})
+    return RpcResponse(rjson)
+
+
+def main(n: int):
+    content = transfers_payload(n)
+    print("payload: {} entries, {:.1f} MB".format(n, len(content) / 1e6))
+
+    def best(fn) -> float:
+        return min(timeit.repeat(fn, number=1, repeat=5))
+
+    baseline = best(lambda: legacy_decode(httpx.Response(200, content=content)))
+    print("{:<32} {:8.1f} ms".format("response.json()", baseline * 1e3))
+
+    for name, Codec in _CODECS.items():
+        try:
+            codec = Codec()
+        except ImportError:
+            print("{:<32} not installed".format(name))
+            continue
+
+        for mode in ("", "validate", "lazy"):
+            codec.lazy, codec.validate = mode == "lazy", mode == "validate"
+            elapsed = best(lambda: codec.decode(content, Result.GetTransfers.value))
+            label = "Codec.decode[{}{}]".format(name, ", " + mode if mode else "")
+            print("{:<32} {:8.1f} ms  ({:.2f}x)".format(label, elapsed * 1e3, baseline / elapsed))
+
+        codec.lazy = codec.validate = False
+        elapsed = best(lambda: bytes(codec.decode(content, RawResult).result))
+        label = "Codec.decode[{}, raw]".format(name)
+        print("{:<32} {:8.1f} ms  ({:.2f}x)".format(label, elapsed * 1e3, baseline / elapsed))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,83 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Per-account, per-day revenue rollup over a 1M-entry get_transfers result: the Python loop over
+the decoded _FullTransfer objects against TransferTable's vectorized group_sum over a mask (and the
+one-off cost of building the table, from eager and from lazy results).
+
+    python -m bench.columnar [entries]
+"""
+
+import sys
+import json
+import timeit
+from collections import defaultdict
+from bench.codec import transfers_payload
+from xmrpy._codec import get_codec
+from xmrpy._columnar import TransferTable
+from xmrpy._result import Result
+
+
+def varied_payload(n: int) -> bytes:
+    # transfers_payload's rows spread over 8 accounts and a year of timestamps
+    rjson = json.loads(transfers_payload(n))
+    for i, transfer in enumerate(rjson["result"]["in"]):
+        transfer["subaddr_index"] = {"major": i % 8, "minor": i % 5}
+        transfer["timestamp"] = 1600000000 + (i * 7919) % (365 * 86400)
+    return json.dumps(rjson).encode()
+
+
+def python_rollup(result):
+    totals = defaultdict(int)
+    for transfer in result.in_:
+        if transfer.subaddr_index.minor != 0:
+            totals[(transfer.subaddr_index.major, transfer.timestamp // 86400)] += transfer.amount
+    return totals
+
+
+def table_rollup(table):
+    return table.group_sum(["major", "day"], where=(table.type == "in") & (table.minor != 0))
+
+
+def main(n: int):
+    content = varied_payload(n)
+    print("payload: {} entries, {:.1f} MB".format(n, len(content) / 1e6))
+
+    def best(fn) -> float:
+        return min(timeit.repeat(fn, number=1, repeat=3))
+
+    eager = get_codec().decode(content, Result.GetTransfers.value).result
+    lazy = get_codec(lazy=True).decode(content, Result.GetTransfers.value).result
+    table = TransferTable.from_result(eager)
+
+    keys, sums = table_rollup(table)
+    assert dict(zip(zip(*(k.tolist() for k in keys)), sums.tolist())) == python_rollup(eager)
+
+    baseline = best(lambda: python_rollup(eager))
+    rows = [
+        ("python loop", baseline),
+        ("TransferTable rollup", best(lambda: table_rollup(table))),
+        ("TransferTable.from_result", best(lambda: TransferTable.from_result(eager))),
+        ("TransferTable.from_result[lazy]", best(lambda: TransferTable.from_result(lazy))),
+    ]
+    for name, elapsed in rows:
+        print("{:<32} {:8.1f} ms  ({:.2f}x)".format(name, elapsed * 1e3, baseline / elapsed))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,85 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""
+Cold-start cost of `import xmrpy` from `python -X importtime`, checked against a budget, plus
+what first touching `xmrpy.Wallet` costs on top. Exits non-zero if the import goes over budget,
+pulls in httpx or writes a log file.
+
+    python -m bench.importtime [budget_ms]
+"""
+
+import os
+import re
+import sys
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)")
+
+
+def cumulative_us(code: str, cwd: str) -> int:
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=cwd, env=env, capture_output=True, text=True
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr)
+
+    # Top level imports done by `code` itself, rather than by the interpreter's startup (site)
+    total, started = 0, False
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        if match.group(3) == "site":
+            started = True
+            continue
+        if started and len(match.group(2)) == 1:
+            total += int(match.group(1))
+    return total
+
+
+def main(budget_ms: float):
+    with tempfile.TemporaryDirectory() as cwd:
+        imported = min(cumulative_us("import xmrpy", cwd) for _ in range(5))
+        wallet = min(cumulative_us("import xmrpy; xmrpy.Wallet", cwd) for _ in range(5))
+
+        probe = "import sys, xmrpy; print('httpx' in sys.modules)"
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        pulled = subprocess.run([sys.executable, "-c", probe], cwd=cwd, env=env, capture_output=True, text=True)
+        wrote = os.listdir(cwd)
+
+    print("import xmrpy                {:8.1f} ms  (budget {:.1f} ms)".format(imported / 1e3, budget_ms))
+    print("import xmrpy; xmrpy.Wallet  {:8.1f} ms".format(wallet / 1e3))
+
+    failures = []
+    if imported / 1e3 > budget_ms:
+        failures.append("import took {:.1f} ms".format(imported / 1e3))
+    if pulled.stdout.strip() != "False":
+        failures.append("import pulled in httpx")
+    if wrote:
+        failures.append("import wrote {}".format(", ".join(wrote)))
+    for failure in failures:
+        print("FAIL:", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 10.0)
@@ -0,0 +1,90 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""
+Cost on the calling thread of the per-request "POST - %s" line: written synchronously to a file
+and a console stream, handed to a QueueListener thread, and rate limited on top of the queue.
+
+    python -m bench.log [lines]
+"""
+
+import os
+import sys
+import queue
+import timeit
+import tempfile
+import logging
+import logging.handlers
+from xmrpy._logger import LOG_FORMAT, RateLimitedLogger
+
+URL = "http://127.0.0.1:18083/json_rpc"
+
+
+def handlers(directory: str):
+    file = logging.FileHandler(os.path.join(directory, "bench.log"))
+    console = logging.StreamHandler(open(os.devnull, "w"))
+    for handler in (file, console):
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return [file, console]
+
+
+def isolated(name: str) -> logging.Logger:
+    log = logging.getLogger("bench." + name)
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    return log
+
+
+def main(n: int):
+    def per_line(fn) -> float:
+        return min(timeit.repeat(fn, number=n, repeat=3)) / n * 1e6
+
+    with tempfile.TemporaryDirectory() as directory:
+        sync = isolated("sync")
+        for handler in handlers(directory):
+            sync.addHandler(handler)
+
+        queued = isolated("queued")
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        enqueue = logging.handlers.QueueHandler(records)  # type: ignore
+        enqueue.setFormatter(logging.Formatter())
+        queued.addHandler(enqueue)
+        listener = logging.handlers.QueueListener(records, *handlers(directory))  # type: ignore
+        listener.start()
+
+        limited = RateLimitedLogger(queued, rate=10)
+        disabled = RateLimitedLogger(isolated("disabled"), rate=10)
+        disabled._logger.setLevel(logging.WARNING)
+
+        results = [
+            ("FileHandler + console", per_line(lambda: sync.info("POST - %s", URL))),
+            ("QueueHandler", per_line(lambda: queued.info("POST - %s", URL))),
+            ("QueueHandler, 10 lines/s", per_line(lambda: limited.info("POST - %s", URL))),
+            ("level disabled", per_line(lambda: disabled.info("POST - %s", URL))),
+        ]
+        listener.stop()
+
+    baseline = results[0][1]
+    for name, cost in results:
+        print("{:<28} {:8.2f} us/line  ({:.1f}x)".format(name, cost, baseline / cost))
+    share = "at 5k RPC/s: {:.1f}% of a core synchronously, {:.2f}% rate limited"
+    print(share.format(baseline * 5000 / 1e4, results[2][1] * 5000 / 1e4))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,74 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""
+Memory held by a decoded 200k-entry get_transfers result: the old `__dict__`-based DataClass
+(transfers left as plain dicts, or wrapped one DataClass each as the streaming iterators do)
+against the `__slots__` result classes with typed nested fields.
+
+    python -m bench.memory [entries]
+"""
+
+import gc
+import sys
+import json
+import tracemalloc
+from bench.codec import transfers_payload
+from xmrpy._result import Result
+
+
+class LegacyDataClass:
+    # The pre-__slots__ DataClass: fields in __dict__, nested dicts as generic instances
+    def __init__(self, data):
+        for key, value in data.items():
+            self.__dict__[key] = LegacyDataClass(value) if isinstance(value, dict) else value
+
+
+def legacy_wrapped(result):
+    result = LegacyDataClass(result)
+    result.__dict__["in"] = [LegacyDataClass(transfer) for transfer in result.__dict__["in"]]
+    return result
+
+
+def held(build, content: bytes) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = build(json.loads(content)["result"])
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main(n: int):
+    content = transfers_payload(n)
+    print("payload: {} entries, {:.1f} MB".format(n, len(content) / 1e6))
+
+    rows = [
+        ("DataClass, transfers as dicts", held(LegacyDataClass, content)),
+        ("DataClass per transfer", held(legacy_wrapped, content)),
+        ("__slots__ classes", held(Result.GetTransfers.value, content)),
+    ]
+    baseline = rows[0][1]
+    for name, size in rows:
+        print("{:<32} {:8.1f} MB  {:6.0f} B/entry  ({:.2f}x)".format(name, size / 1e6, size / n, baseline / size))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
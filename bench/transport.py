@@ -0,0 +1,86 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Round-trip latency of sequential get_height calls over loopback TCP against a unix domain
+socket, both served by the same minimal in-process HTTP/1.1 JSON-RPC server.
+
+    python -m bench.transport [calls]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+from xmrpy import Wallet, Config
+
+BODY = b'{"id":"0","jsonrpc":"2.0","result":{"height":2400000}}'
+RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s" % (len(BODY), BODY)
+
+
+async def serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            writer.write(RESPONSE)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        writer.close()
+
+
+async def measure(addr: str, calls: int) -> float:
+    wallet = Wallet(Config(WALLET_RPC_ADDR=addr, LOG_LEVEL="ERROR"))
+    await wallet.get_height()
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        await wallet.get_height()
+    elapsed = time.perf_counter() - start
+
+    await wallet.close()
+    return elapsed / calls
+
+
+async def main(calls: int):
+    path = os.path.join(tempfile.mkdtemp(), "wallet-rpc.sock")
+    tcp = await asyncio.start_server(serve, "127.0.0.1", 0)
+    uds = await asyncio.start_unix_server(serve, path)
+    port = tcp.sockets[0].getsockname()[1]
+
+    tcp_latency = await measure("127.0.0.1:{}".format(port), calls)
+    uds_latency = await measure("unix://" + path, calls)
+    print("{:<8} {:8.1f} us/call".format("tcp", tcp_latency * 1e6))
+    print("{:<8} {:8.1f} us/call  ({:.2f}x)".format("unix", uds_latency * 1e6, tcp_latency / uds_latency))
+
+    tcp.close()
+    uds.close()
+    os.unlink(path)
+
+
+if __name__ == "__main__":
+    import logging
+
+    # Keep per-request log lines (ours and httpx's) out of the measurement
+    logging.getLogger().setLevel(logging.ERROR)
+    logging.getLogger("xmrpy").setLevel(logging.ERROR)
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -17,18 +17,23 @@ async def transfer(request):
     account_index = request.data["account_index"]
     subaddress_indices = request.data["subaddress_indices"]
 
-    r = await wallet.transfer_sign_submit(destinations, account_index, subaddress_indices)
+    # Raw mode: forward the wallet's JSON without decoding it into result objects first
+    with wallet.raw():
+        r = await wallet.transfer_sign_submit(
+            destinations=destinations, account_index=account_index, subaddress_indices=subaddress_indices
+        )
 
-    return response(data={"tx_hash_list": r.result.tx_hash_list})
+    return response(data={"tx_hash_list": r.result.pointer("/tx_hash_list")})
 
 
 @app.route("/balance", methods=["GET"])
 async def get_galance(request):
     account_index = request.data["account_index"]
     address_indices = request.data["address_indices"]
-    r = await wallet.get_balance(account_index, address_indices)
+    with wallet.raw():
+        r = await wallet.get_balance(account_index, address_indices)
 
-    return response(data={"balance": r.result.balance, "unlocked_balance": r.result.unlocked_balance})
+    return response(data={"balance": r.result.get("balance"), "unlocked_balance": r.result.get("unlocked_balance")})
 
 
 if __name__ == "__main__":
@@ -41,6 +41,7 @@ setup(
     python_requires=">=3.8",
     description="Python impelementation of Monero wallet JSON RPC client library",
     install_requires=derive_dependencies_from_pipenvlock(),
+    extras_require={"columnar": ["numpy"]},
     include_package_data=True,
     platforms="any",
     keywords="xmr, monero, privacy",
@@ -17,3 +17,125 @@
 
 # pylint: disable=unused-import
 import pytest
+import json
+import asyncio
+import httpx
+from xmrpy import SyncWallet, Wallet
+from xmrpy._config import Config
+
+
+class MockRpc:
+    """
+    MockTransport handler answering JSON-RPC calls (single or batched) from `replies`, a
+    mapping of method to result, or to a callable taking the params and returning the result,
+    after `delay` seconds
+    """
+
+    def __init__(self, replies, delay=0.0):
+        self.replies = replies
+        self.delay = delay
+        self.calls = []
+        self.bodies = []
+
+    def reply(self, data):
+        self.calls.append(data["method"])
+        result = self.replies[data["method"]]
+        if callable(result):
+            result = result(data.get("params") or {})
+        return {"id": data.get("id", "0"), "jsonrpc": "2.0", "result": result}
+
+    async def __call__(self, request):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        data = json.loads(request.content)
+        self.bodies.append(data)
+        if isinstance(data, list):
+            return httpx.Response(200, json=[self.reply(item) for item in data])
+        return httpx.Response(200, json=self.reply(data))
+
+
+@pytest.fixture
+def mock_wallet():
+    """
+    `make(replies, **conf)` returning a Wallet whose requests are answered by a MockRpc, and the MockRpc
+    """
+
+    def make(replies, **conf):
+        rpc = MockRpc(replies)
+        wallet = Wallet(
+            Config(DIGEST_USER_NAME="user", DIGEST_USER_PASSWORD="password", LOG_FILE="xmrpy.test.log", **conf)
+        ).auth()
+        wallet._http._httpx = httpx.AsyncClient(transport=httpx.MockTransport(rpc))
+        return wallet, rpc
+
+    return make
+
+
+@pytest.fixture
+def mock_sync_wallet():
+    """
+    mock_wallet for SyncWallet; the wallets made are closed after the test
+    """
+    wallets = []
+
+    def make(replies, **conf):
+        rpc = MockRpc(replies)
+        wallet = SyncWallet(
+            Config(DIGEST_USER_NAME="user", DIGEST_USER_PASSWORD="password", LOG_FILE="xmrpy.test.log", **conf)
+        )
+        wallet._client._http._httpx = httpx.AsyncClient(transport=httpx.MockTransport(rpc))
+        wallets.append(wallet)
+        return wallet, rpc
+
+    yield make
+    for wallet in wallets:
+        wallet.close()
+
+
+class FakeChain:
+    """
+    wallet-rpc's get_address, get_height and get_transfers over a list of transfers that tests edit
+    between polls
+    """
+
+    def __init__(self, height, address="44AFFq5kSiGBoZ"):
+        self.height = height
+        self.address = address
+        self.transfers = []
+        self.params = []
+
+    def add(self, txid, type_="in", height=0, major=0, minor=0, amount=1, **fields):
+        transfer = dict(
+            fields, txid=txid, type=type_, height=height, amount=amount, subaddr_index={"major": major, "minor": minor}
+        )
+        self.transfers.append(transfer)
+        return transfer
+
+    def remove(self, txid):
+        self.transfers = [transfer for transfer in self.transfers if transfer["txid"] != txid]
+
+    def get_address(self, params):
+        return {"address": self.address, "addresses": [{"address": self.address, "address_index": 0}]}
+
+    def get_height(self, params):
+        return {"height": self.height}
+
+    def get_transfers(self, params):
+        self.params.append(params)
+        result = {}
+        for transfer in self.transfers:
+            if transfer["type"] in ("in", "out") and transfer["height"] <= params.get("min_height", 0):
+                continue
+            if not params.get("all_accounts") and transfer["subaddr_index"]["major"] != params["account_index"]:
+                continue
+            result.setdefault(transfer["type"], []).append(transfer)
+        return result
+
+
+@pytest.fixture
+def chain_wallet(mock_wallet):
+    chain = FakeChain(height=101)
+    wallet, _ = mock_wallet(
+        {"get_address": chain.get_address, "get_height": chain.get_height, "get_transfers": chain.get_transfers}
+    )
+    return chain, wallet
@@ -0,0 +1,120 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import hashlib
+import httpx
+import pytest
+from urllib.request import parse_http_list, parse_keqv_list
+from xmrpy._auth import DigestAuth
+
+
+def H(value):
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+class DigestServer:
+    """
+    wallet-rpc's digest check: verifies every signed request, rejects a replayed nonce count
+    and answers `stale=true` once `rotate()` has issued a new nonce
+    """
+
+    def __init__(self):
+        self.nonce = "n1"
+        self.authorizations = []
+        self.seen = set()
+
+    def rotate(self, nonce):
+        self.nonce = nonce
+
+    def challenge(self, stale=False):
+        header = 'Digest qop="auth",algorithm=MD5,realm="monero-rpc",nonce="{}",stale={}'
+        return httpx.Response(401, headers={"www-authenticate": header.format(self.nonce, str(stale).lower())})
+
+    def __call__(self, request):
+        header = request.headers.get("authorization")
+        if header is None:
+            return self.challenge()
+
+        params = parse_keqv_list(parse_http_list(header[len("Digest ") :]))
+        self.authorizations.append(params)
+        if params["nonce"] != self.nonce:
+            return self.challenge(stale=True)
+
+        ha1 = H("user:monero-rpc:password")
+        ha2 = H("POST:" + params["uri"])
+        expected = H(":".join([ha1, params["nonce"], params["nc"], params["cnonce"], "auth", ha2]))
+        if params["response"] != expected or (params["nonce"], params["nc"]) in self.seen:
+            return self.challenge()
+
+        self.seen.add((params["nonce"], params["nc"]))
+        return httpx.Response(200, json={"id": "0", "jsonrpc": "2.0", "result": {}})
+
+
+@pytest.fixture
+def server():
+    return DigestServer()
+
+
+@pytest.fixture
+def post(server):
+    auth = DigestAuth("user", "password")
+    client = httpx.AsyncClient(auth=auth, transport=httpx.MockTransport(server))
+
+    async def post():
+        return await client.post("http://127.0.0.1:18083/json_rpc", content=b"{}")
+
+    post.auth = auth
+    return post
+
+
+class TestDigestAuth:
+    @pytest.mark.asyncio
+    async def test_challenge_once_then_sign_up_front(self, server, post):
+        for _ in range(4):
+            assert (await post()).status_code == 200
+
+        assert post.auth.stats() == {"challenges": 1, "stale": 0, "avoided": 3}
+        assert [params["nc"] for params in server.authorizations] == ["00000001", "00000002", "00000003", "00000004"]
+        assert len({params["cnonce"] for params in server.authorizations}) == 4
+
+    @pytest.mark.asyncio
+    async def test_stale_nonce_rechallenges_and_restarts_count(self, server, post):
+        for _ in range(2):
+            assert (await post()).status_code == 200
+
+        server.rotate("n2")
+        assert (await post()).status_code == 200
+        assert (await post()).status_code == 200
+
+        assert post.auth.stats() == {"challenges": 2, "stale": 1, "avoided": 2}
+        assert [(params["nonce"], params["nc"]) for params in server.authorizations] == [
+            ("n1", "00000001"),
+            ("n1", "00000002"),
+            ("n1", "00000003"),
+            ("n2", "00000001"),
+            ("n2", "00000002"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_non_digest_challenge_is_returned(self):
+        transport = httpx.MockTransport(lambda request: httpx.Response(401, headers={"www-authenticate": "Basic"}))
+        auth = DigestAuth("user", "password")
+        client = httpx.AsyncClient(auth=auth, transport=transport)
+
+        assert (await client.post("http://127.0.0.1:18083/json_rpc", content=b"{}")).status_code == 401
+        assert auth.stats() == {"challenges": 0, "stale": 0, "avoided": 0}
@@ -0,0 +1,123 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import json
+import httpx
+import pytest
+from xmrpy._retry import ERR_TRANSPORT
+
+
+def serve(wallet, handler):
+    wallet._http._httpx = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestBatch:
+    @pytest.mark.asyncio
+    async def test_batch(self, mock_wallet):
+        wallet, rpc = mock_wallet({"get_height": {"height": 7}, "get_balance": {"balance": 3}})
+        requests = []
+
+        async def handler(request):
+            requests.append(json.loads(request.content))
+            return await rpc(request)
+
+        serve(wallet, handler)
+        async with wallet.batch() as batch:
+            height = await batch.get_height()
+            balance = await batch.get_balance()
+
+        assert (await height).result.height == 7
+        assert (await balance).result.balance == 3
+        assert len(requests) == 1 and isinstance(requests[0], list)
+        assert len({call["id"] for call in requests[0]}) == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "status, body",
+        [
+            (200, {"id": None, "jsonrpc": "2.0", "error": {"code": -32600, "message": "Invalid Request"}}),
+            (400, {"id": None, "jsonrpc": "2.0", "error": {"code": -32700, "message": "Parse error"}}),
+            (200, {"id": "0", "jsonrpc": "2.0", "result": {}}),
+        ],
+    )
+    async def test_unsupported_falls_back_for_good(self, mock_wallet, status, body):
+        wallet, rpc = mock_wallet({"get_height": {"height": 7}})
+        batches = []
+
+        async def handler(request):
+            if isinstance(json.loads(request.content), list):
+                batches.append(request)
+                return httpx.Response(status, json=body)
+            return await rpc(request)
+
+        serve(wallet, handler)
+        for _ in range(2):
+            async with wallet.batch() as batch:
+                first, second = await batch.get_height(), await batch.get_height()
+            assert (await first).result.height == 7 and (await second).result.height == 7
+
+        assert len(batches) == 1
+        assert rpc.calls == ["get_height"] * 4
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", [500, 503, 401])
+    async def test_failed_batch_is_not_latched(self, mock_wallet, status):
+        wallet, rpc = mock_wallet({"get_height": {"height": 7}})
+        statuses = [status]
+
+        async def handler(request):
+            if statuses:
+                return httpx.Response(statuses.pop(), text="unavailable")
+            return await rpc(request)
+
+        serve(wallet, handler)
+        async with wallet.batch() as batch:
+            failed = await batch.get_height()
+        assert (await failed).error.code == status
+
+        async with wallet.batch() as batch:
+            height = await batch.get_height()
+        assert (await height).result.height == 7
+        assert wallet._http._batch_supported
+
+    @pytest.mark.asyncio
+    async def test_transport_error(self, mock_wallet):
+        wallet, _ = mock_wallet({})
+
+        def handler(request):
+            raise httpx.ConnectError("connection refused")
+
+        serve(wallet, handler)
+        async with wallet.batch() as batch:
+            height = await batch.get_height()
+        assert (await height).error.code == ERR_TRANSPORT
+        assert wallet._http._batch_supported
+
+    @pytest.mark.asyncio
+    async def test_helpers(self, mock_wallet):
+        wallet, _ = mock_wallet({})
+        async with wallet.batch() as batch:
+            assert batch.cache_stats() == wallet.cache_stats()
+            assert batch.coalesce_stats() == wallet.coalesce_stats()
+            batch.invalidate_cache()
+            with pytest.raises(TypeError):
+                batch.iter_transfers()
+            with pytest.raises(TypeError):
+                await batch.transfer_sign_submit(destinations=[])
+            with pytest.raises(TypeError):
+                batch.transfer_sync()
@@ -0,0 +1,125 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import types
+import pytest
+from xmrpy import _cache
+from xmrpy._cache import ResponseCache
+from xmrpy.t import RpcResponse
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=0.0)
+    monkeypatch.setattr(_cache, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def response(result):
+    return RpcResponse({"id": "0", "jsonrpc": "2.0", "result": result})
+
+
+class TestResponseCache:
+    @pytest.mark.asyncio
+    async def test_cached_methods(self, mock_wallet):
+        wallet, rpc = mock_wallet(
+            {"query_key": {"key": "abc"}, "get_attribute": {"value": "1"}, "set_attribute": {}},
+            RESPONSE_CACHE="true",
+        )
+        for _ in range(3):
+            assert (await wallet.query_key("view_key")).result.key == "abc"
+            assert (await wallet.get_attribute("foo")).result.value == "1"
+        assert rpc.calls == ["query_key", "get_attribute"]
+
+        # Writes drop what they make stale
+        await wallet.set_attribute("foo", "2")
+        await wallet.get_attribute("foo")
+        assert rpc.calls[-2:] == ["set_attribute", "get_attribute"]
+
+    @pytest.mark.asyncio
+    async def test_only_reads_coalesce(self, mock_wallet):
+        wallet, rpc = mock_wallet({"query_key": {"key": "abc"}, "get_balance": {"balance": 1}}, COALESCE_READS="true")
+        await wallet.query_key("view_key")
+        await wallet.get_balance()
+        assert wallet.coalesce_stats()["misses"] == 1
+        assert rpc.calls == ["query_key", "get_balance"]
+
+    @pytest.mark.asyncio
+    async def test_new_block_drops_balances(self, mock_wallet):
+        chain = {"height": 10, "balance": 10}
+        wallet, rpc = mock_wallet(
+            {
+                "get_height": lambda params: {"height": chain["height"]},
+                "get_balance": lambda params: {"balance": chain["balance"]},
+                "query_key": {"key": "abc"},
+            },
+            RESPONSE_CACHE="true",
+        )
+        await wallet.get_height()
+        await wallet.query_key("view_key")
+        assert (await wallet.get_balance()).result.balance == 10
+
+        chain["balance"] = 9
+        await wallet.get_height()
+        assert (await wallet.get_balance()).result.balance == 10
+
+        chain["height"] = 11
+        await wallet.get_height()
+        assert (await wallet.get_balance()).result.balance == 9
+        await wallet.query_key("view_key")
+        assert rpc.calls.count("get_balance") == 2
+        assert rpc.calls.count("query_key") == 1
+
+    @pytest.mark.asyncio
+    async def test_batched_write_invalidates(self, mock_wallet):
+        chain = {"balance": 10}
+
+        def relay_tx(params):
+            chain["balance"] = 9
+            return {"tx_hash": "a"}
+
+        wallet, rpc = mock_wallet(
+            {"get_balance": lambda params: {"balance": chain["balance"]}, "relay_tx": relay_tx},
+            RESPONSE_CACHE="true",
+        )
+        assert (await wallet.get_balance()).result.balance == 10
+        async with wallet.batch() as b:
+            await b.relay_tx("00")
+        assert (await wallet.get_balance()).result.balance == 9
+
+    def test_ttl_expiry(self, clock):
+        cache = ResponseCache(ttls={"get_version": 10.0})
+        cache.put("k", "get_version", response({"version": 1}))
+        clock.now = 9.9
+        assert cache.get("k").result.version == 1
+        clock.now = 10.1
+        assert cache.get("k") is None
+        assert cache.stats()["size"] == 0
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_lru_eviction(self, clock):
+        cache = ResponseCache(max_size=2, ttls={"get_version": 60.0})
+        for key in ("a", "b"):
+            cache.put(key, "get_version", response({"version": key}))
+        assert cache.get("a") is not None
+        cache.put("c", "get_version", response({"version": "c"}))
+
+        assert cache.get("b") is None
+        assert cache.get("a").result.version == "a"
+        assert cache.get("c").result.version == "c"
+        assert cache.evictions == 1
@@ -0,0 +1,67 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import asyncio
+import pytest
+from xmrpy import Priority
+from xmrpy._retry import ERR_DEADLINE
+
+
+class TestCoalesce:
+    @pytest.mark.asyncio
+    async def test_identical_reads_share_a_call(self, mock_wallet):
+        wallet, rpc = mock_wallet({"get_balance": {"balance": 1}}, COALESCE_READS="true")
+        rpc.delay = 0.05
+        responses = await asyncio.gather(*[wallet.get_balance() for _ in range(5)])
+        assert all(response.result.balance == 1 for response in responses)
+        assert rpc.calls == ["get_balance"]
+        assert wallet.coalesce_stats()["hits"] == 4
+
+    @pytest.mark.asyncio
+    async def test_priorities_are_not_merged(self, mock_wallet):
+        wallet, rpc = mock_wallet({"get_balance": {"balance": 1}}, COALESCE_READS="true")
+        rpc.delay = 0.05
+
+        async def background():
+            with wallet.priority(Priority.BACKGROUND):
+                return await wallet.get_balance()
+
+        await asyncio.gather(wallet.get_balance(), background(), wallet.get_balance())
+        assert rpc.calls == ["get_balance", "get_balance"]
+
+    @pytest.mark.asyncio
+    async def test_deadline_is_not_shared(self, mock_wallet):
+        wallet, rpc = mock_wallet({"get_balance": {"balance": 1}}, COALESCE_READS="true")
+        rpc.delay = 0.1
+
+        async def hurried():
+            with wallet.deadline(0.02):
+                return await wallet.get_balance()
+
+        first, second = await asyncio.gather(hurried(), wallet.get_balance())
+        assert first.error.code == ERR_DEADLINE
+        assert second.result.balance == 1
+
+    @pytest.mark.asyncio
+    async def test_warmup_is_never_coalesced_or_cached(self, mock_wallet):
+        wallet, rpc = mock_wallet({"get_version": {"version": 1}}, COALESCE_READS="true", RESPONSE_CACHE="true")
+        rpc.delay = 0.05
+        await wallet.warmup(4)
+        await wallet.warmup(4)
+        assert rpc.calls == ["get_version"] * 8
+        assert wallet.coalesce_stats()["hits"] == 0
@@ -0,0 +1,78 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import pytest
+from xmrpy._decoder import decoder
+from xmrpy._result import GetTransfersResult
+
+# numpy is an optional extra (pip install xmrpy[columnar])
+np = pytest.importorskip("numpy")
+from xmrpy import TransferTable
+
+
+def transfer(txid, type_, amount, major=0, timestamp=0):
+    return {
+        "txid": txid,
+        "type": type_,
+        "amount": amount,
+        "fee": 1,
+        "height": 10,
+        "timestamp": timestamp,
+        "payment_id": "0" * 16,
+        "subaddr_index": {"major": major, "minor": 0},
+    }
+
+
+REPLY = {
+    "in": [transfer("a", "in", 5, major=1), transfer("b", "in", 7, major=0, timestamp=86400)],
+    "pool": [transfer("c", "pool", 2, major=1)],
+    "out": [transfer("a", "out", 3)],
+}
+
+
+@pytest.fixture(params=["eager", "lazy"])
+def result(request):
+    if request.param == "lazy":
+        return GetTransfersResult.wrap(REPLY)
+    return decoder(GetTransfersResult)(REPLY)
+
+
+class TestTransferTable:
+    def test_categories_in_order(self, result):
+        table = TransferTable.from_result(result)
+        assert len(table) == 4
+        assert table.type.tolist() == ["in", "in", "out", "pool"]
+        assert table.txid.tolist() == ["a", "b", "a", "c"]
+        assert table.txid.codes.tolist() == [0, 1, 0, 2]
+        assert table.amount.tolist() == [5, 7, 3, 2]
+        assert table.major.tolist() == [1, 0, 0, 1]
+
+    def test_filter_and_group_sum(self, result):
+        table = TransferTable.from_result(result)
+        incoming = table[table.type.isin(["in", "pool"])]
+        (accounts, days), totals = incoming.group_sum(["major", "day"])
+        assert accounts.tolist() == [0, 1]
+        assert days.tolist() == [1, 0]
+        assert totals.tolist() == [7, 7]
+        assert table[table.type != "in"].sum("fee") == 2
+
+    def test_empty(self):
+        table = TransferTable.from_result(GetTransfersResult.wrap({}))
+        assert len(table) == 0
+        assert table.type.values == []
+        assert table.group_sum(["major"])[1].dtype == np.uint64
@@ -0,0 +1,208 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""
+Offline decoder tests over wallet-rpc replies recorded from monero-wallet-rpc v0.18 (tx blobs
+and metadata shortened), decoded both as-is and with VALIDATE_RESULTS on
+"""
+
+import json
+import pickle
+import logging
+import pytest
+from xmrpy._codec import Codec
+from xmrpy._result import Result, _FullTransfer, _Index
+
+TRANSFER = {
+    "id": "0",
+    "jsonrpc": "2.0",
+    "result": {
+        "amount": 100,
+        "fee": 8270000,
+        "multisig_txset": "",
+        "spent_key_images": {"key_images": ["fda4094cf7225f6ac4e19c14b56ed192c321a4e011f58443dd4c18aeac35175a"]},
+        "tx_blob": "02000102000bacd7e20fb2bfea02eeff0bd1b90cb4c101",
+        "tx_hash": "5885d365f50564cf92cccd4542287af16951c590eff7fc7fe1daf88eb480d65e",
+        "tx_key": "4e3aec0d967f8e5e2d17a5be59edb4174bd1552f131b50ce716dacc58727cb02",
+        "tx_metadata": "02000102000bacd7e20fb2bfea02eeff0bd1b90cb4c101",
+        "unsigned_txset": "",
+        "weight": 1455,
+    },
+}
+
+TRANSFER_SPLIT = {
+    "id": "0",
+    "jsonrpc": "2.0",
+    "result": {
+        "amount_list": [1000000000000],
+        "fee_list": [47730000],
+        "multisig_txset": "",
+        "spent_key_images_list": [{"key_images": ["a1ec0ae1a5e6e9e7c7d4e1b8f5a7f4b3b9b7b5b1b8b2b6b4b0b8b2b6b4b0b8b2"]}],
+        "tx_blob_list": ["020001020010"],
+        "tx_hash_list": ["c8d7a0f7b7b1d1a0d6b8b1c6a0d7f6c8b7d1c6a0f6b8c7d6a0f7b1d1c8a0d6b8"],
+        "tx_key_list": [""],
+        "tx_metadata_list": ["020001020010"],
+        "unsigned_txset": "",
+        "weight_list": [1526],
+    },
+}
+
+CHECK_TX_KEY = {
+    "id": "0",
+    "jsonrpc": "2.0",
+    "result": {"confirmations": 0, "in_pool": False, "received": 1000000000000},
+}
+
+VALIDATE_ADDRESS = {
+    "id": "0",
+    "jsonrpc": "2.0",
+    "result": {"integrated": False, "nettype": "mainnet", "openalias_address": "", "subaddress": False, "valid": True},
+}
+
+GET_TRANSFERS = {
+    "id": "0",
+    "jsonrpc": "2.0",
+    "result": {
+        "in": [
+            {
+                "address": "77Vx9cs1VPicFndSVgYUvTdLCJEZw9h81hXLMYsjBCXSJfUehLa9TDW3Ffh45SQa7xb6dUs18mpNxfUhQGqfwXPSMrvKhVp",
+                "amount": 200000000000,
+                "confirmations": 1,
+                "double_spend_seen": False,
+                "fee": 21650200000,
+                "height": 153624,
+                "locked": False,
+                "note": "",
+                "payment_id": "0000000000000000",
+                "subaddr_index": {"major": 1, "minor": 0},
+                "subaddr_indices": [{"major": 1, "minor": 0}],
+                "suggested_confirmations_threshold": 1,
+                "timestamp": 1535918400,
+                "txid": "c36258a276018c3a4bc1f195a7fb530f50cd63a4fa765fb7c6f7f49fc051762a",
+                "type": "in",
+                "unlock_time": 0,
+            }
+        ]
+    },
+}
+
+
+def decode(reply, result, validate=False):
+    return Codec(validate=validate).decode(json.dumps(reply).encode(), result.value)
+
+
+class TestDecoder:
+    @pytest.mark.parametrize("validate", [False, True])
+    @pytest.mark.parametrize(
+        "reply, result",
+        [
+            (TRANSFER, Result.Transfer),
+            (TRANSFER_SPLIT, Result.TransferSplit),
+            (CHECK_TX_KEY, Result.CheckTxKey),
+            (VALIDATE_ADDRESS, Result.ValidateAddress),
+            (GET_TRANSFERS, Result.GetTransfers),
+        ],
+    )
+    def test_recorded_reply(self, reply, result, validate, caplog):
+        with caplog.at_level(logging.WARNING, logger="xmrpy"):
+            response = decode(reply, result, validate)
+
+        assert not response.is_err()
+        assert isinstance(response.result, result.value)
+        assert not caplog.records
+
+    def test_fields(self):
+        transfer = decode(TRANSFER, Result.Transfer, True).result
+        assert transfer.multisig_txset == ""
+        assert transfer.tx_hash == TRANSFER["result"]["tx_hash"]
+        assert transfer.spent_key_images.key_images == TRANSFER["result"]["spent_key_images"]["key_images"]
+
+        assert decode(CHECK_TX_KEY, Result.CheckTxKey, True).result.received == 1000000000000
+
+        transfers = decode(GET_TRANSFERS, Result.GetTransfers, True).result
+        assert transfers.in_[0].subaddr_index.major == 1
+        assert transfers.in_[0].amount == 200000000000
+
+    def test_mismatch_is_logged_not_an_error(self, caplog):
+        reply = json.loads(json.dumps(TRANSFER))
+        reply["result"]["fee"] = "8270000"
+        with caplog.at_level(logging.WARNING, logger="xmrpy"):
+            response = decode(reply, Result.Transfer, True)
+
+        # A transfer that went through must never come back as an error
+        assert not response.is_err()
+        assert response.result.fee == "8270000"
+        assert response.result.tx_hash == TRANSFER["result"]["tx_hash"]
+        assert "TransferResult.fee" in caplog.text
+
+    def test_error_envelope(self):
+        reply = {"id": "0", "jsonrpc": "2.0", "error": {"code": -38, "message": "no connection to daemon"}}
+        response = decode(reply, Result.Transfer, True)
+        assert response.is_err()
+        assert response.error.code == -38
+
+    def test_only(self):
+        InOnly = Result.GetTransfers.value.only("in")
+        assert InOnly is Result.GetTransfers.value.only("in")
+        assert issubclass(InOnly, Result.GetTransfers.value)
+
+        data = dict(GET_TRANSFERS["result"], out=GET_TRANSFERS["result"]["in"])
+        selected = InOnly(data)
+        assert selected.in_[0].amount == 200000000000
+        assert not hasattr(selected, "out")
+
+        restored = pickle.loads(pickle.dumps(selected))
+        assert type(restored) is InOnly
+        assert restored.in_[0].amount == 200000000000
+
+    def test_only_lazy(self):
+        data = dict(GET_TRANSFERS["result"], out=GET_TRANSFERS["result"]["in"])
+        selected = Result.GetTransfers.value.only("in").wrap(data)
+        assert selected.in_[0].amount == 200000000000
+        assert not hasattr(selected, "out")
+        assert "out" not in selected
+        assert selected.get("out") is None
+        assert [key for key, _ in selected.items()] == ["in"]
+
+
+class TestWrap:
+    def test_fields_materialize_once(self):
+        wrapped = Result.GetTransfers.value.wrap(GET_TRANSFERS["result"])
+        transfer = wrapped.in_[0]
+        assert type(transfer) is _FullTransfer
+        assert type(transfer.subaddr_index) is _Index
+        assert transfer.subaddr_index.major == 1
+
+        assert wrapped.in_[0] is transfer
+        assert transfer.subaddr_index is transfer.subaddr_index
+
+    def test_as_dict_is_the_wrapped_dict(self):
+        data = GET_TRANSFERS["result"]
+        wrapped = Result.GetTransfers.value.wrap(data)
+        assert wrapped.as_dict() is data
+        wrapped.in_
+        assert wrapped.as_dict() is data
+
+    def test_mapping_access(self):
+        wrapped = Result.GetTransfers.value.wrap(GET_TRANSFERS["result"])
+        assert "in" in wrapped
+        assert "out" not in wrapped
+        assert wrapped.get("in")[0].amount == 200000000000
+        assert wrapped.get("out") is None
+        assert wrapped.get("out", []) == []
+        assert wrapped["in"] is wrapped.in_
@@ -0,0 +1,161 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import pytest
+from xmrpy._history import FileStateStore, MemoryStateStore, StateStore
+
+
+def txids(transfers):
+    return sorted(transfer.txid for transfer in transfers)
+
+
+class TestTransferSync:
+    @pytest.mark.asyncio
+    async def test_cursor(self, chain_wallet):
+        chain, wallet = chain_wallet
+        chain.add("a", height=90)
+        chain.add("b", height=95, major=1)
+        sync = wallet.transfer_sync(reorg_window=10)
+
+        delta = await sync.poll()
+        assert txids(delta.added) == ["a", "b"]
+        assert delta.height == 100
+        assert chain.params[-1]["min_height"] == 0
+        assert chain.params[-1]["all_accounts"]
+
+        chain.height = 121
+        chain.add("c", height=115)
+        delta = await sync.poll()
+        assert txids(delta.added) == ["c"]
+        assert chain.params[-1]["min_height"] == 90
+
+        chain.height = 122
+        assert not await sync.poll()
+        assert chain.params[-1]["min_height"] == 110
+
+    @pytest.mark.asyncio
+    async def test_pending_confirms_fails_or_drops(self, chain_wallet):
+        chain, wallet = chain_wallet
+        chain.add("p1", "pending")
+        chain.add("p2", "pool")
+        chain.add("p3", "pending")
+        sync = wallet.transfer_sync()
+
+        delta = await sync.poll()
+        assert txids(delta.pending) == ["p1", "p2", "p3"]
+        assert not delta.added
+
+        chain.remove("p1")
+        chain.add("p1", "out", height=101)
+        chain.remove("p2")
+        chain.add("p2", "in", height=101)
+        chain.remove("p3")
+        chain.add("p3", "failed")
+        chain.height = 102
+        delta = await sync.poll()
+        assert txids(delta.confirmed) == ["p1", "p2"]
+        assert txids(delta.failed) == ["p3"]
+        assert not delta.added and not delta.pending and not delta.dropped
+
+        chain.add("p4", "pool")
+        await sync.poll()
+        chain.remove("p4")
+        delta = await sync.poll()
+        assert txids(delta.dropped) == ["p4"]
+        # Already reported
+        assert not delta.failed and not delta.confirmed
+
+    @pytest.mark.asyncio
+    async def test_reorg(self, chain_wallet):
+        chain, wallet = chain_wallet
+        chain.add("a", height=98)
+        chain.add("b", height=99)
+        chain.add("old", height=50)
+        sync = wallet.transfer_sync(reorg_window=10)
+        await sync.poll()
+
+        # Block 99 is reorganized away: b is mined again in 101, a is lost
+        chain.remove("a")
+        chain.remove("b")
+        chain.add("b", height=101)
+        chain.height = 102
+        delta = await sync.poll()
+        assert txids(delta.reorged) == ["a", "b"]
+        assert txids(delta.added) == ["b"]
+        assert {transfer.txid: transfer.height for transfer in delta.reorged} == {"a": 98, "b": 99}
+
+    @pytest.mark.asyncio
+    async def test_uncommitted_delta_is_delivered_again(self, chain_wallet):
+        chain, wallet = chain_wallet
+        chain.add("a", height=90)
+        sync = wallet.transfer_sync()
+
+        assert txids((await sync.poll(commit=False)).added) == ["a"]
+        delta = await sync.poll(commit=False)
+        assert txids(delta.added) == ["a"]
+        await sync.commit(delta)
+        assert not await sync.poll()
+
+    @pytest.mark.asyncio
+    async def test_account_scope(self, chain_wallet):
+        chain, wallet = chain_wallet
+        chain.add("a", height=90)
+        chain.add("b", height=95, major=1)
+        store = MemoryStateStore()
+        everything = wallet.transfer_sync(store)
+        account = wallet.transfer_sync(store, account_index=1)
+
+        assert txids((await account.poll()).added) == ["b"]
+        assert chain.params[-1]["account_index"] == 1 and "all_accounts" not in chain.params[-1]
+        assert txids((await everything.poll()).added) == ["a", "b"]
+        assert await everything.wallet_key() == "44AFFq5kSiGBoZ"
+        assert await account.wallet_key() == "44AFFq5kSiGBoZ#1"
+
+    @pytest.mark.asyncio
+    async def test_file_state_store(self, chain_wallet, tmp_path):
+        chain, wallet = chain_wallet
+        chain.add("a", height=90)
+        chain.add("p", "pending")
+        path = str(tmp_path / "transfers.json")
+        await wallet.transfer_sync(FileStateStore(path)).poll()
+
+        store = FileStateStore(path)
+        state = await store.load("44AFFq5kSiGBoZ")
+        assert state["height"] == 100
+        assert list(state["pending"]) == ["out:p:0:0"]
+        assert await store.load("elsewhere") is None
+        assert not await wallet.transfer_sync(store).poll()
+
+    @pytest.mark.asyncio
+    async def test_wallets_on_one_rpc_keep_their_own_cursor(self, chain_wallet):
+        chain, wallet = chain_wallet
+        store = MemoryStateStore()
+        chain.add("a", height=90)
+        assert txids((await wallet.transfer_sync(store).poll()).added) == ["a"]
+
+        # open_wallet on the same wallet-rpc: the other wallet starts from its own (empty) cursor
+        chain.address = "48edfHu7V9Z84Y"
+        chain.transfers = []
+        chain.add("old", height=20)
+        assert txids((await wallet.transfer_sync(store).poll()).added) == ["old"]
+        assert chain.params[-1]["min_height"] == 0
+        assert sorted(store._states) == ["44AFFq5kSiGBoZ", "48edfHu7V9Z84Y"]
+
+    def test_state_store_is_abstract(self):
+        with pytest.raises(TypeError):
+            StateStore()
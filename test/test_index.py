@@ -0,0 +1,112 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import pytest
+import pytest_asyncio
+
+
+@pytest_asyncio.fixture
+async def index(chain_wallet):
+    chain, wallet = chain_wallet
+    chain.add("a", height=90, payment_id="aaaaaaaaaaaaaaaa", amount=5, timestamp=1000)
+    chain.add("b", height=95, payment_id="aaaaaaaaaaaaaaaa", amount=7, timestamp=2000, major=1, minor=2)
+    chain.add("c", "out", height=96, amount=3, fee=1, timestamp=3000)
+    chain.add("p", "pool", payment_id="bbbbbbbbbbbbbbbb", amount=11)
+    index = wallet.transfer_index(":memory:")
+    yield chain, index
+    await index.close()
+
+
+def txids(transfers):
+    return sorted(transfer.txid for transfer in transfers)
+
+
+class TestTransferIndex:
+    @pytest.mark.asyncio
+    async def test_schema(self, index):
+        _, index = index
+        await index.count()
+        tables = await index._run(index._fetch, "SELECT type, name FROM sqlite_master ORDER BY name", ())
+        assert ("table", "transfers") in tables
+        assert ("table", "sync_state") in tables
+        for name in ("txid", "payment_id", "subaddress", "height", "timestamp"):
+            assert ("index", "transfers_" + name) in tables
+
+        plan = await index._run(
+            index._fetch, "EXPLAIN QUERY PLAN SELECT data FROM transfers WHERE wallet = ? AND txid = ?", ("w", "a")
+        )
+        assert "transfers_txid" in str(plan)
+
+    @pytest.mark.asyncio
+    async def test_queries(self, index):
+        _, index = index
+        delta = await index.refresh()
+        assert txids(delta.added) == ["a", "b", "c"]
+        assert await index.count() == 4
+
+        (a,) = await index.by_txid("a")
+        assert a.amount == 5 and a.subaddr_index.major == 0
+        assert txids(await index.by_payment_id("aaaaaaaaaaaaaaaa")) == ["a", "b"]
+        assert txids(await index.by_subaddress(1)) == ["b"]
+        assert txids(await index.by_subaddress(1, 2)) == ["b"]
+        assert await index.by_subaddress(1, 0) == []
+        assert [t.txid for t in await index.between(91, 96)] == ["b", "c"]
+        assert [t.txid for t in await index.between(1500, None, by="timestamp")] == ["b", "c"]
+        with pytest.raises(ValueError):
+            await index.between(by="fee")
+
+        assert await index.received() == 12
+        assert await index.received(payment_id="aaaaaaaaaaaaaaaa", major=1) == 7
+        assert await index.received(payment_id="bbbbbbbbbbbbbbbb") == 0
+        assert await index.received(payment_id="bbbbbbbbbbbbbbbb", min_height=0) == 11
+
+    @pytest.mark.asyncio
+    async def test_upserts(self, index):
+        chain, index = index
+        await index.refresh()
+        state = await index.load(await index.wallet_key())
+        assert state["height"] == 100
+
+        # The pool transfer confirms, "b" is reorganized into another block, "c" is lost
+        chain.remove("p")
+        chain.add("p", "in", height=101, payment_id="bbbbbbbbbbbbbbbb", amount=11)
+        chain.remove("b")
+        chain.add("b", height=102, payment_id="aaaaaaaaaaaaaaaa", amount=7, major=1, minor=2)
+        chain.remove("c")
+        chain.height = 103
+        await index.refresh()
+
+        assert await index.count() == 3
+        (p,) = await index.by_txid("p")
+        assert p.type == "in" and p.height == 101
+        (b,) = await index.by_txid("b")
+        assert b.height == 102
+        assert await index.by_txid("c") == []
+        assert await index.received(payment_id="bbbbbbbbbbbbbbbb") == 11
+        assert (await index.load(await index.wallet_key()))["height"] == 102
+
+        # Nothing changed: applying an empty delta leaves the rows alone
+        assert not await index.refresh()
+        assert await index.count() == 3
+
+    @pytest.mark.asyncio
+    async def test_every_account_by_default(self, index):
+        chain, index = index
+        await index.refresh()
+        assert chain.params[-1]["all_accounts"]
+        assert txids(await index.by_subaddress(1)) == ["b"]
@@ -0,0 +1,184 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import types
+import asyncio
+import pytest
+from xmrpy import _limiter
+from xmrpy._limiter import AdaptiveLimiter
+from xmrpy.t import Priority
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=0.0)
+    monkeypatch.setattr(_limiter, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+async def fill(limiter):
+    for _ in range(limiter.limit):
+        assert await limiter.acquire()
+
+
+class TestAdaptiveLimiter:
+    @pytest.mark.asyncio
+    async def test_increase(self):
+        limiter = AdaptiveLimiter(initial=4, max_limit=6)
+        await fill(limiter)
+        for expected in (5, 6, 6):
+            limiter.release(latency=0.01)
+            assert limiter.limit == expected
+            assert await limiter.acquire()
+
+    @pytest.mark.asyncio
+    async def test_idle_client_does_not_grow(self):
+        limiter = AdaptiveLimiter(initial=10)
+        assert await limiter.acquire()
+        limiter.release(latency=0.01)
+        assert limiter.limit == 10
+
+    @pytest.mark.asyncio
+    async def test_decrease(self):
+        limiter = AdaptiveLimiter(initial=10, min_limit=8)
+        await fill(limiter)
+        limiter.release(latency=0.01)
+        assert limiter.limit == 11
+
+        # 10x the best latency seen: most of our requests are queueing inside the wallet
+        for expected in (10, 9, 8, 8):
+            limiter.release(latency=0.1)
+            assert limiter.limit == expected
+
+    @pytest.mark.asyncio
+    async def test_dropped_backs_off(self):
+        limiter = AdaptiveLimiter(initial=10, min_limit=8, backoff=0.5)
+        await fill(limiter)
+        limiter.release(dropped=True)
+        assert limiter.limit == 8
+        assert limiter.as_dict()["inflight"] == 9
+
+    @pytest.mark.asyncio
+    async def test_priority_order(self, clock):
+        limiter = AdaptiveLimiter(initial=1)
+        await fill(limiter)
+        order = []
+
+        async def call(priority):
+            assert await limiter.acquire(priority)
+            order.append(priority)
+            limiter.release()
+
+        tasks = [asyncio.ensure_future(call(p)) for p in (Priority.BACKGROUND, Priority.NORMAL, Priority.INTERACTIVE)]
+        await asyncio.sleep(0)
+        assert limiter.as_dict()["queued_by_priority"] == {"interactive": 1, "normal": 1, "background": 1}
+
+        limiter.release()
+        await asyncio.gather(*tasks)
+        assert order == [Priority.INTERACTIVE, Priority.NORMAL, Priority.BACKGROUND]
+
+    @pytest.mark.asyncio
+    async def test_priority_aging(self, clock):
+        limiter = AdaptiveLimiter(initial=1, aging=1.0)
+        await fill(limiter)
+        order = []
+
+        async def call(priority):
+            assert await limiter.acquire(priority)
+            order.append(priority)
+            limiter.release()
+
+        tasks = [asyncio.ensure_future(call(Priority.BACKGROUND))]
+        await asyncio.sleep(0)
+        clock.now = 0.5
+        tasks.append(asyncio.ensure_future(call(Priority.INTERACTIVE)))
+        await asyncio.sleep(0)
+
+        # The background call has waited past `aging`, the interactive one hasn't
+        clock.now = 1.2
+        limiter.release()
+        await asyncio.gather(*tasks)
+        assert order == [Priority.BACKGROUND, Priority.INTERACTIVE]
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout(self):
+        limiter = AdaptiveLimiter(initial=1, queue_timeout=0.01)
+        await fill(limiter)
+        assert not await limiter.acquire()
+        assert limiter.rejected == 1
+        assert limiter.queued == 0
+        assert limiter.inflight == 1
+
+        limiter.release()
+        assert await limiter.acquire()
+
+    @pytest.mark.asyncio
+    async def test_queue_full(self):
+        limiter = AdaptiveLimiter(initial=1, max_queue=1)
+        await fill(limiter)
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not await limiter.acquire()
+        assert limiter.rejected == 1
+
+        limiter.release()
+        assert await waiting
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter(self):
+        limiter = AdaptiveLimiter(initial=1)
+        await fill(limiter)
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert limiter.queued == 0
+
+        limiter.release()
+        assert limiter.inflight == 0
+
+    @pytest.mark.asyncio
+    async def test_fixed_limit_never_adapts(self):
+        limiter = AdaptiveLimiter.fixed(4)
+        await fill(limiter)
+        limiter.release(latency=0.01)
+        limiter.release(dropped=True)
+        limiter.release(latency=10.0)
+        assert limiter.limit == 4
+
+
+class TestPriorityWithoutAdaptiveConcurrency:
+    @pytest.mark.asyncio
+    async def test_queued_calls_are_served_by_priority(self, mock_wallet):
+        wallet, rpc = mock_wallet(
+            {"get_height": {"height": 1}, "get_transfers": {}, "get_balance": {"balance": 1}},
+            HTTP_MAX_CONNECTIONS="1",
+        )
+        rpc.delay = 0.02
+        first = asyncio.ensure_future(wallet.get_height())
+        await asyncio.sleep(0.005)
+
+        with wallet.priority(Priority.BACKGROUND):
+            background = asyncio.ensure_future(wallet.get_transfers())
+        await asyncio.sleep(0.005)
+        interactive = asyncio.ensure_future(wallet.get_balance())
+
+        await asyncio.gather(first, background, interactive)
+        assert rpc.calls == ["get_height", "get_balance", "get_transfers"]
+        assert wallet.endpoints()[0]["concurrency"]["limit"] == 1
@@ -0,0 +1,95 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import types
+import logging
+import pytest
+from xmrpy import _logger
+from xmrpy._logger import RateLimitedLogger
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=0.0)
+    monkeypatch.setattr(_logger, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def records():
+    captured = []
+    handler = logging.Handler()
+    handler.emit = captured.append
+    log = logging.getLogger("xmrpy.test.hot")
+    log.setLevel(logging.DEBUG)
+    log.propagate = False
+    log.addHandler(handler)
+    yield log, captured
+    log.removeHandler(handler)
+
+
+class TestRateLimitedLogger:
+    def test_burst_then_refill(self, clock, records):
+        log, captured = records
+        hot = RateLimitedLogger(log, 2)
+        for _ in range(5):
+            hot.debug("poll")
+        assert len(captured) == 2
+        assert hot.suppressed == 3
+
+        clock.now += 0.5
+        hot.debug("poll")
+        assert len(captured) == 3
+
+        hot.debug("poll")
+        assert len(captured) == 3
+
+    def test_reports_suppressed_lines(self, clock, records):
+        log, captured = records
+        hot = RateLimitedLogger(log, 1)
+        hot.info("call %s", "get_height")
+        hot.info("call %s", "get_height")
+        hot.info("call %s", "get_height")
+
+        clock.now += 1
+        hot.info("call %s", "get_balance")
+        assert captured[-1].getMessage() == "call get_balance (2 similar lines suppressed)"
+        assert hot.suppressed == 0
+
+        clock.now += 1
+        hot.info("call %s", "get_balance")
+        assert captured[-1].getMessage() == "call get_balance"
+
+    def test_zero_rate_is_unlimited(self, clock, records):
+        log, captured = records
+        hot = RateLimitedLogger(log, 0)
+        for _ in range(100):
+            hot.debug("poll")
+        assert len(captured) == 100
+        assert hot.suppressed == 0
+
+    def test_disabled_level_costs_nothing(self, clock, records, monkeypatch):
+        log, captured = records
+        log.setLevel(logging.INFO)
+        monkeypatch.setattr(log, "log", lambda *args, **kwargs: pytest.fail("a LogRecord was built"))
+        hot = RateLimitedLogger(log, 1)
+        for _ in range(10):
+            hot.debug("poll")
+        assert hot._tokens == 1
+        assert hot.suppressed == 0
+        assert not captured
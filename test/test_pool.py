@@ -0,0 +1,58 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import httpx
+import pytest
+from xmrpy._pool import EndpointPool
+
+
+class TestEndpointPool:
+    def test_reads_go_to_replicas(self):
+        pool = EndpointPool("127.0.0.1:18083", ["127.0.0.1:18084"])
+        assert pool.select("get_balance") is pool.replicas[0]
+        assert pool.select("transfer") is pool.primary
+
+    def test_failed_request_leaves_replica_to_its_breaker(self):
+        pool = EndpointPool("127.0.0.1:18083", ["127.0.0.1:18084"])
+        replica = pool.replicas[0]
+        with pytest.raises(httpx.ConnectError):
+            with pool.track(replica):
+                raise httpx.ConnectError("connection refused")
+
+        assert replica.healthy
+        assert replica.outstanding == 0
+        assert pool.select("get_balance") is replica
+
+        for _ in range(replica.breaker.threshold):
+            replica.breaker.failure()
+        assert pool.select("get_balance") is pool.primary
+
+    @pytest.mark.asyncio
+    async def test_warmup_reaches_every_endpoint(self, mock_wallet):
+        wallet, rpc = mock_wallet(
+            {"get_version": {"version": 1}}, WALLET_RPC_REPLICA_ADDRS="127.0.0.1:18084,127.0.0.1:18085"
+        )
+        hosts = []
+
+        async def handler(request):
+            hosts.append(request.url.netloc.decode())
+            return await rpc(request)
+
+        wallet._http._httpx = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        await wallet.warmup(2)
+        assert sorted(hosts) == ["127.0.0.1:18083"] * 2 + ["127.0.0.1:18084"] * 2 + ["127.0.0.1:18085"] * 2
@@ -0,0 +1,98 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import json
+import pytest
+from xmrpy._codec import Codec
+from xmrpy._raw import RawResult, decode_raw
+from xmrpy._retry import ERR_INVALID_RESULT
+
+codec = Codec()
+
+
+def raw(body):
+    return decode_raw(body if isinstance(body, bytes) else json.dumps(body).encode(), codec)
+
+
+class TestDecodeRaw:
+    @pytest.mark.parametrize(
+        "body",
+        [
+            b'{"id":"0","jsonrpc":"2.0","result":{"a":1}}',
+            b'{\n  "id": "0",\n  "jsonrpc": "2.0",\n  "result": {\n    "a": 1\n  }\n}\n',
+            b'{"jsonrpc":"2.0","id":"0","result":{"a":1}}',
+            b'{"id":"0","jsonrpc":"2.0","result":{"a":1},"error":null}',
+            b'{"id":"0","result":{"a":1},"jsonrpc":"2.0"}',
+            b'{"result":{"a":1},"id":"0","jsonrpc":"2.0"}',
+            b'{"id":"0","jsonrpc":"2.0","result":{"a":1},"extra":{"b":[2]}}',
+        ],
+    )
+    def test_key_order(self, body):
+        response = raw(body)
+        assert not response.is_err()
+        assert response.id == "0"
+        assert isinstance(response.result, RawResult)
+        assert json.loads(bytes(response.result)) == {"a": 1}
+
+    @pytest.mark.parametrize(
+        "result",
+        [
+            5,
+            "text",
+            None,
+            [1, [2, 3]],
+            {"note": "a,b}]", "list": [{"x": "["}]},
+            {"note": 'quoted \\"},{\\" escapes', "n": [1]},
+            {"in": [{"amount": 1, "subaddr_index": {"major": 0, "minor": 1}}] * 3},
+        ],
+    )
+    def test_result_values(self, result):
+        for trailing in ({}, {"error": None}):
+            body = dict({"id": "0", "jsonrpc": "2.0", "result": result}, **trailing)
+            response = raw(body)
+            assert not response.is_err()
+            assert json.loads(bytes(response.result)) == result
+
+    def test_sliced_bytes_are_the_wallets(self):
+        body = b'{"id":"0","jsonrpc":"2.0","result":{"balance": 1,  "unlocked_balance": 2}}'
+        assert bytes(raw(body).result) == b'{"balance": 1,  "unlocked_balance": 2}'
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            {"id": "0", "jsonrpc": "2.0", "error": {"code": -13, "message": "No wallet file"}},
+            {"id": "0", "jsonrpc": "2.0", "error": {"code": -13, "message": "No wallet file"}, "result": None},
+            {"id": "0", "jsonrpc": "2.0", "result": None, "error": {"code": -13, "message": "No wallet file"}},
+        ],
+    )
+    def test_error_envelope(self, body):
+        response = raw(body)
+        assert response.is_err()
+        assert response.error.code == -13
+        assert response.error.message == "No wallet file"
+
+    @pytest.mark.parametrize("body", [b"", b"not json", b"[]", b'{"id":"0","jsonrpc":"2.0"}'])
+    def test_malformed(self, body):
+        assert raw(body).error.code == ERR_INVALID_RESULT
+
+    def test_codec_decode(self):
+        body = b'{"id":"0","jsonrpc":"2.0","result":{"per_subaddress":[{"balance":7}]},"error":null}'
+        result = codec.decode(body, RawResult).result
+        assert result.pointer("/per_subaddress/0/balance") == 7
+        assert result.pointer("/missing", None) is None
+        assert result.pointer_bytes("/per_subaddress/0") == b'{"balance":7}'
@@ -0,0 +1,183 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import types
+import random
+import httpx
+import pytest
+from xmrpy import _retry
+from xmrpy._retry import ERR_CIRCUIT_OPEN, ERR_TRANSPORT, CircuitBreaker, RetryPolicy
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=0.0)
+    monkeypatch.setattr(_retry, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+class Flaky:
+    """
+    MockRpc behind `failures` refused connections
+    """
+
+    def __init__(self, rpc, failures):
+        self.rpc = rpc
+        self.failures = failures
+        self.attempts = 0
+
+    async def __call__(self, request):
+        self.attempts += 1
+        if self.failures:
+            self.failures -= 1
+            raise httpx.ConnectError("connection refused")
+        return await self.rpc(request)
+
+
+@pytest.fixture
+def flaky_wallet(mock_wallet):
+    def make(failures, **conf):
+        wallet, rpc = mock_wallet(
+            {
+                "get_balance": {"balance": 5, "unlocked_balance": 5},
+                "create_address": {"address": "8", "address_index": 1},
+            },
+            RETRY_ATTEMPTS="3",
+            RETRY_BACKOFF_BASE="0",
+            **conf
+        )
+        flaky = Flaky(rpc, failures)
+        wallet._http._httpx = httpx.AsyncClient(transport=httpx.MockTransport(flaky))
+        return wallet, flaky
+
+    return make
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self, clock):
+        breaker = CircuitBreaker(threshold=3, reset_timeout=10)
+        for _ in range(2):
+            assert breaker.allow()
+            breaker.failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        breaker.failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+        assert not breaker.available()
+
+    def test_success_resets_the_count(self, clock):
+        breaker = CircuitBreaker(threshold=2)
+        breaker.failure()
+        breaker.success()
+        breaker.failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_lets_one_trial_through(self, clock):
+        breaker = CircuitBreaker(threshold=1, reset_timeout=10)
+        breaker.failure()
+        clock.now = 9.9
+        assert breaker.state == CircuitBreaker.OPEN
+
+        clock.now = 10
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.available()
+        assert breaker.allow()
+        assert not breaker.available()
+        assert not breaker.allow()
+
+    def test_trial_success_closes(self, clock):
+        breaker = CircuitBreaker(threshold=1, reset_timeout=10)
+        breaker.failure()
+        clock.now = 10
+        assert breaker.allow()
+        breaker.success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.as_dict() == {"state": CircuitBreaker.CLOSED, "failures": 0}
+
+    def test_trial_failure_reopens_for_another_timeout(self, clock):
+        breaker = CircuitBreaker(threshold=3, reset_timeout=10)
+        for _ in range(3):
+            breaker.failure()
+        clock.now = 10
+        assert breaker.allow()
+        breaker.failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+        clock.now = 19.9
+        assert not breaker.allow()
+        clock.now = 20
+        assert breaker.allow()
+
+    def test_released_trial_can_be_retried(self, clock):
+        breaker = CircuitBreaker(threshold=1, reset_timeout=10)
+        breaker.failure()
+        clock.now = 10
+        assert breaker.allow()
+        breaker.release()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow()
+
+
+class TestRetryPolicy:
+    def test_delay_bounds(self):
+        random.seed(7)
+        policy = RetryPolicy(attempts=5, backoff_base=0.1, backoff_max=0.5)
+        for attempt, cap in enumerate([0.1, 0.2, 0.4, 0.5, 0.5, 0.5]):
+            delays = [policy.delay(attempt) for _ in range(200)]
+            assert all(0 <= delay <= cap for delay in delays)
+            assert max(delays) > cap * 0.9
+
+    def test_at_least_one_attempt(self):
+        assert RetryPolicy(attempts=0).attempts == 1
+
+
+class TestRetries:
+    @pytest.mark.asyncio
+    async def test_idempotent_call_is_retried(self, flaky_wallet):
+        wallet, flaky = flaky_wallet(failures=2)
+        response = await wallet.get_balance()
+        assert not response.is_err()
+        assert response.result.balance == 5
+        assert flaky.attempts == 3
+
+    @pytest.mark.asyncio
+    async def test_retries_run_out(self, flaky_wallet):
+        wallet, flaky = flaky_wallet(failures=5)
+        response = await wallet.get_balance()
+        assert response.error.code == ERR_TRANSPORT
+        assert flaky.attempts == 3
+
+    @pytest.mark.asyncio
+    async def test_non_idempotent_call_is_not_retried(self, flaky_wallet):
+        wallet, flaky = flaky_wallet(failures=1)
+        response = await wallet.create_address(account_index=0)
+        assert response.error.code == ERR_TRANSPORT
+        assert flaky.attempts == 1
+        assert flaky.rpc.calls == []
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_fails_fast(self, flaky_wallet, clock):
+        wallet, flaky = flaky_wallet(failures=3, BREAKER_FAILURE_THRESHOLD="3", BREAKER_RESET_TIMEOUT="10")
+        assert (await wallet.get_balance()).error.code == ERR_TRANSPORT
+        assert (await wallet.get_balance()).error.code == ERR_CIRCUIT_OPEN
+        assert flaky.attempts == 3
+
+        clock.now = 10
+        assert not (await wallet.get_balance()).is_err()
+        assert flaky.attempts == 4
@@ -0,0 +1,94 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import json
+import pytest
+from xmrpy._stream import ArrayStream
+
+KEYS = frozenset(["in", "out"])
+
+BODY = {
+    "id": "0",
+    "jsonrpc": "2.0",
+    "result": {
+        "in": [
+            {"txid": "a", "amount": 1, "note": 'quoted "}]," and \\ backslash'},
+            {"txid": "b", "amount": 20000000000000, "note": "café € \U0001f600"},
+        ],
+        "pool": [{"txid": "c"}],
+        "out": [{"txid": "d", "amount": 3, "destinations": [{"amount": 3, "address": "4"}]}],
+        "last_height": 12345,
+    },
+}
+
+
+def parse(body, size):
+    stream = ArrayStream(KEYS)
+    items = []
+    for start in range(0, len(body), size):
+        items.extend(stream.feed(body[start : start + size]))
+    items.extend(stream.close())
+    return stream, items
+
+
+class TestArrayStream:
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 20])
+    @pytest.mark.parametrize("ensure_ascii", [True, False])
+    def test_chunk_boundaries(self, size, ensure_ascii):
+        body = json.dumps(BODY, ensure_ascii=ensure_ascii).encode()
+        stream, items = parse(body, size)
+
+        assert items == [("in", item) for item in BODY["result"]["in"]] + [("out", BODY["result"]["out"][0])]
+        assert stream.extras == {"pool": [{"txid": "c"}], "last_height": 12345}
+        assert stream.error is None
+
+    @pytest.mark.parametrize("size", [1, 5])
+    def test_numbers_split_across_chunks(self, size):
+        body = b'{"result": {"in": [12345678901234567890, -1.5e3, true, null]}, "id": "0"}'
+        _, items = parse(body, size)
+        assert items == [("in", 12345678901234567890), ("in", -1500.0), ("in", True), ("in", None)]
+
+    def test_empty_and_missing_arrays(self):
+        _, items = parse(b'{"id": "0", "jsonrpc": "2.0", "result": {"in": []}}', 4)
+        assert items == []
+
+    @pytest.mark.parametrize("size", [1, 1 << 20])
+    def test_error_envelope(self, size):
+        body = {"id": "0", "jsonrpc": "2.0", "error": {"code": -13, "message": "No wallet file"}}
+        stream, items = parse(json.dumps(body).encode(), size)
+        assert items == []
+        assert stream.error == body["error"]
+
+    def test_null_error_is_not_an_error(self):
+        stream, items = parse(b'{"error": null, "result": {"out": [{"txid": "d"}]}}', 3)
+        assert items == [("out", {"txid": "d"})]
+        assert stream.error is None
+
+    def test_error_stops_parsing(self):
+        stream = ArrayStream(KEYS)
+        assert stream.feed(b'{"error": {"code": -1, "message": "x"}, "result": {"in": [1, 2') == []
+        assert stream.error == {"code": -1, "message": "x"}
+
+    @pytest.mark.parametrize("body", [b'{"result": {"in": [1, 2', b'{"result": {"in": [{"txid": "a"', b""])
+    def test_truncated(self, body):
+        with pytest.raises(ValueError):
+            parse(body, 1)
+
+    def test_not_an_object(self):
+        with pytest.raises(ValueError):
+            ArrayStream(KEYS).feed(b"[1, 2]")
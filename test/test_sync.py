@@ -0,0 +1,75 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import pytest
+import concurrent.futures
+from xmrpy._retry import ERR_DEADLINE
+
+
+@pytest.fixture
+def sync_wallet(mock_sync_wallet):
+    return mock_sync_wallet(
+        {
+            "get_height": {"height": 7},
+            "get_balance": {"balance": 3},
+            "get_transfers": {"in": [{"txid": "a", "amount": 1}, {"txid": "b", "amount": 2}], "out": []},
+        }
+    )
+
+
+class TestSyncWallet:
+    def test_calls(self, sync_wallet):
+        wallet, rpc = sync_wallet
+        assert wallet.get_height().result.height == 7
+        assert wallet.get_balance().result.balance == 3
+        assert [transfer.txid for transfer in wallet.iter_transfers()] == ["a", "b"]
+        assert rpc.calls == ["get_height", "get_balance", "get_transfers"]
+
+    def test_batch(self, sync_wallet):
+        wallet, rpc = sync_wallet
+        with wallet.batch() as batch:
+            height = batch.get_height()
+            balance = batch.get_balance()
+            assert isinstance(height, concurrent.futures.Future)
+            assert not height.done()
+
+        assert height.result(timeout=5).result.height == 7
+        assert balance.result(timeout=5).result.balance == 3
+        assert len(rpc.bodies) == 1 and [call["method"] for call in rpc.bodies[0]] == ["get_height", "get_balance"]
+
+        with pytest.raises(TypeError):
+            with wallet.batch() as batch:
+                batch.iter_transfers()
+
+    def test_batch_cancelled_on_error(self, sync_wallet):
+        wallet, rpc = sync_wallet
+        with pytest.raises(RuntimeError):
+            with wallet.batch() as batch:
+                height = batch.get_height()
+                raise RuntimeError
+        with pytest.raises(concurrent.futures.CancelledError):
+            height.result(timeout=5)
+        assert not rpc.bodies
+
+    def test_deadline(self, sync_wallet):
+        wallet, rpc = sync_wallet
+        rpc.delay = 0.2
+        with wallet.deadline(0.01):
+            assert wallet.get_height().error.code == ERR_DEADLINE
+        rpc.delay = 0
+        assert wallet.get_height().result.height == 7
@@ -0,0 +1,65 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import json
+import httpx
+import pytest
+
+
+@pytest.fixture
+def read_timeouts(mock_wallet):
+    """
+    `make(**conf)` returning a wallet and the read timeout each method was last sent with
+    """
+
+    def make(**conf):
+        wallet, rpc = mock_wallet({"get_height": {"height": 1}, "get_transfers": {}, "refresh": {}}, **conf)
+        timeouts = {}
+
+        async def handler(request):
+            timeouts[json.loads(request.content)["method"]] = request.extensions["timeout"]["read"]
+            return await rpc(request)
+
+        wallet._http._httpx = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return wallet, timeouts
+
+    return make
+
+
+async def call_all(wallet):
+    await wallet.get_height()
+    await wallet.get_transfers()
+    await wallet.refresh(0)
+
+
+class TestMethodTimeouts:
+    @pytest.mark.asyncio
+    async def test_defaults_only_loosen_the_read_timeout(self, read_timeouts):
+        wallet, timeouts = read_timeouts(HTTP_READ_TIMEOUT="10")
+        await call_all(wallet)
+        assert timeouts == {"get_height": 10.0, "get_transfers": 120.0, "refresh": 600.0}
+
+        wallet, timeouts = read_timeouts(HTTP_READ_TIMEOUT="300")
+        await call_all(wallet)
+        assert timeouts == {"get_height": 300.0, "get_transfers": 300.0, "refresh": 600.0}
+
+    @pytest.mark.asyncio
+    async def test_configured_timeouts_win(self, read_timeouts):
+        wallet, timeouts = read_timeouts(HTTP_READ_TIMEOUT="10", METHOD_TIMEOUTS="get_height:2 refresh:30")
+        await call_all(wallet)
+        assert timeouts == {"get_height": 2.0, "get_transfers": 120.0, "refresh": 30.0}
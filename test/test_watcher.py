@@ -0,0 +1,208 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import json
+import asyncio
+import httpx
+import pytest
+
+A = "a" * 16
+B = "b" * 16
+C = "c" * 16
+
+
+class FakePayments:
+    """
+    wallet-rpc's get_height and get_bulk_payments over payments tests add between polls
+    """
+
+    def __init__(self, height):
+        self.height = height
+        self.payments = []
+        self.requests = []
+
+    def add(self, payment_id, block_height, amount=1):
+        tx_hash = "{:064x}".format(len(self.payments))
+        self.payments.append(
+            {
+                "payment_id": payment_id,
+                "tx_hash": tx_hash,
+                "amount": amount,
+                "block_height": block_height,
+                "unlock_time": 0,
+                "subaddr_index": {"major": 0, "minor": 0},
+                "address": "4",
+            }
+        )
+
+    def get_height(self, params):
+        return {"height": self.height}
+
+    def get_bulk_payments(self, params):
+        ids, since = params["payment_ids"], params["min_block_height"]
+        self.requests.append((since, sorted(ids)))
+        return {"payments": [p for p in self.payments if p["payment_id"] in ids and p["block_height"] > since]}
+
+
+@pytest.fixture
+def watched(mock_wallet):
+    chain = FakePayments(height=10)
+    wallet, _ = mock_wallet({"get_height": chain.get_height, "get_bulk_payments": chain.get_bulk_payments})
+    return chain, wallet
+
+
+def summary(events):
+    return [(event.payment_id, event.payment.block_height, event.received, event.settled) for event in events]
+
+
+class TestPaymentWatcher:
+    @pytest.mark.asyncio
+    async def test_cursor_follows_confirmed_height(self, watched):
+        chain, wallet = watched
+        watcher = wallet.payment_watcher(confirmations=2)
+        watcher.add(A, height=3)
+        chain.add(A, block_height=5)
+        chain.add(A, block_height=9)
+
+        assert summary(await watcher.poll()) == [(A, 5, 1, False)]
+        assert chain.requests == [(3, [A])]
+        assert watcher.chunks() == [(8, [A])]
+
+        chain.height = 12
+        assert summary(await watcher.poll()) == [(A, 9, 2, False)]
+        assert chain.requests[-1] == (8, [A])
+        assert watcher.chunks() == [(10, [A])]
+
+    @pytest.mark.asyncio
+    async def test_nothing_new_skips_the_request(self, watched):
+        chain, wallet = watched
+        watcher = wallet.payment_watcher()
+        watcher.add(A)
+        await watcher.poll()
+        await watcher.poll()
+        assert chain.requests == [(0, [A])]
+
+    @pytest.mark.asyncio
+    async def test_payment_reported_once_across_shared_chunks(self, watched):
+        chain, wallet = watched
+        watcher = wallet.payment_watcher()
+        watcher.add(A)
+        chain.add(A, block_height=4)
+        assert summary(await watcher.poll()) == [(A, 4, 1, False)]
+
+        # B's older cursor makes the shared chunk ask from height 2, which covers A's payment again
+        watcher.add(B, height=2)
+        chain.add(B, block_height=6)
+        chain.height = 12
+        assert summary(await watcher.poll()) == [(B, 6, 1, False)]
+        assert chain.requests[-1] == (2, [A, B])
+        assert watcher.chunks() == [(11, [A, B])]
+
+    @pytest.mark.asyncio
+    async def test_settled_invoice_is_dropped(self, watched):
+        chain, wallet = watched
+        watcher = wallet.payment_watcher()
+        watcher.add(A, amount=5)
+        watcher.add(B, amount=5)
+        chain.add(A, block_height=3, amount=2)
+        chain.add(A, block_height=4, amount=3)
+        chain.add(B, block_height=5, amount=4)
+
+        assert summary(await watcher.poll()) == [(A, 3, 2, False), (A, 4, 5, True), (B, 5, 4, False)]
+        assert A not in watcher and B in watcher
+        assert len(watcher) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_request_keeps_cursors(self, watched):
+        chain, wallet = watched
+        transport = wallet._http._httpx._transport
+        rpc = transport.handler
+
+        async def busy(request):
+            if json.loads(request.content)["method"] == "get_bulk_payments":
+                return httpx.Response(200, json={"id": "0", "jsonrpc": "2.0", "error": {"code": -1, "message": "busy"}})
+            return await rpc(request)
+
+        transport.handler = busy
+        watcher = wallet.payment_watcher()
+        watcher.add(A, height=3)
+        chain.add(A, block_height=5)
+        assert await watcher.poll() == []
+        assert watcher.chunks() == [(3, [A])]
+
+        transport.handler = rpc
+        assert summary(await watcher.poll()) == [(A, 5, 1, False)]
+
+    def test_chunks_are_evenly_sized(self, watched):
+        _, wallet = watched
+        watcher = wallet.payment_watcher(chunk_size=2)
+        for height, payment_id in enumerate([A, B, C, "d" * 16, "e" * 64]):
+            watcher.add(payment_id, height=height)
+        assert [len(ids) for _, ids in watcher.chunks()] == [2, 2, 1]
+        assert [cursor for cursor, _ in watcher.chunks()] == [0, 2, 4]
+
+    def test_invalid_payment_id(self, watched):
+        _, wallet = watched
+        with pytest.raises(ValueError):
+            wallet.payment_watcher().add("not hex")
+
+    @pytest.mark.asyncio
+    async def test_delivery(self, watched):
+        chain, wallet = watched
+        seen = []
+
+        async def on_payment(event):
+            seen.append(event.payment_id)
+
+        queue = asyncio.Queue()
+        watcher = wallet.payment_watcher(on_payment=on_payment, queue=queue)
+        watcher.add(A, amount=1)
+        chain.add(A, block_height=2)
+
+        events = [event async for event in watcher.events(interval=0)]
+        assert summary(events) == [(A, 2, 1, True)]
+        assert seen == [A]
+        assert queue.get_nowait() is events[0]
+
+    @pytest.mark.asyncio
+    async def test_polls_read_from_the_primary(self, mock_wallet):
+        chain = FakePayments(height=10)
+        lagging = FakePayments(height=20)
+        wallet, rpc = mock_wallet(
+            {"get_height": chain.get_height, "get_bulk_payments": chain.get_bulk_payments},
+            WALLET_RPC_REPLICA_ADDRS="127.0.0.1:18084",
+            RESPONSE_CACHE="true",
+        )
+
+        async def route(request):
+            if request.url.port == 18083:
+                return await rpc(request)
+            data = json.loads(request.content)
+            result = getattr(lagging, data["method"])(data.get("params") or {})
+            return httpx.Response(200, json={"id": data["id"], "jsonrpc": "2.0", "result": result})
+
+        wallet._http._httpx = httpx.AsyncClient(transport=httpx.MockTransport(route))
+        # A cached height from the replica must not be used either
+        assert (await wallet.get_height()).result.height == 20
+
+        watcher = wallet.payment_watcher()
+        watcher.add(A, height=3)
+        chain.add(A, block_height=5)
+        assert summary(await watcher.poll()) == [(A, 5, 1, False)]
+        assert watcher.chunks() == [(9, [A])]
+        assert lagging.requests == []
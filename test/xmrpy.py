@@ -486,3 +486,26 @@ class TestWallet:
 
         assert not response.is_err()
         assert isinstance(response.result.version, int)
+
+    @pytest.mark.asyncio
+    async def test_batch__get_height_and_get_balance(self):
+        async with self.client.batch() as b:
+            height = await b.get_height()
+            balance = await b.get_balance()
+
+        response = await height
+        print(response.as_dict())
+        assert not response.is_err()
+        assert response.result.height > 0
+
+        response = await balance
+        print(response.as_dict())
+        assert not response.is_err()
+        assert isinstance(response.result.balance, int)
+
+    @pytest.mark.asyncio
+    async def test_stream__iter_transfers(self):
+        async for transfer in self.client.iter_transfers():
+            print(transfer.as_dict())
+            assert isinstance(transfer.txid, str)
+            assert transfer.type in ("in", "out", "pending", "failed", "pool")
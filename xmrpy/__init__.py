@@ -15,16 +15,66 @@
 # IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
 # USE OR OTHER DEALINGS IN THE SOFTWARE.
 
-from xmrpy._wallet import Client as Wallet
-from xmrpy._config import Config
-from xmrpy._logger import logger
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from xmrpy._wallet import Client as Wallet
+    from xmrpy._sync import SyncClient as SyncWallet
+    from xmrpy._config import Config
+    from xmrpy._columnar import TransferTable
+    from xmrpy._history import TransferSync, StateStore, FileStateStore
+    from xmrpy._index import TransferIndex
+    from xmrpy._watcher import PaymentWatcher, PaymentEvent
+    from xmrpy._logger import logger
+    from xmrpy.t import Priority
 
 atomic_unit_multiplier = 10e11
 
+# Imported on first access (PEP 562) so `import xmrpy` stays cheap and free of side effects;
+# httpx, the result classes, xmrpy.conf and logging setup wait until they're needed
+_LAZY = {
+    "Wallet": ("xmrpy._wallet", "Client"),
+    "SyncWallet": ("xmrpy._sync", "SyncClient"),
+    "Config": ("xmrpy._config", "Config"),
+    "TransferTable": ("xmrpy._columnar", "TransferTable"),
+    "TransferSync": ("xmrpy._history", "TransferSync"),
+    "StateStore": ("xmrpy._history", "StateStore"),
+    "FileStateStore": ("xmrpy._history", "FileStateStore"),
+    "TransferIndex": ("xmrpy._index", "TransferIndex"),
+    "PaymentWatcher": ("xmrpy._watcher", "PaymentWatcher"),
+    "PaymentEvent": ("xmrpy._watcher", "PaymentEvent"),
+    "Priority": ("xmrpy.t", "Priority"),
+    "logger": ("xmrpy._logger", "logger"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    module, attr = _LAZY[name]
+    value = getattr(importlib.import_module(module), attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY))
+
 
 __all__ = [
     "Wallet",
+    "SyncWallet",
     "Config",
+    "TransferTable",
+    "TransferSync",
+    "StateStore",
+    "FileStateStore",
+    "TransferIndex",
+    "PaymentWatcher",
+    "PaymentEvent",
+    "Priority",
     "logger",
     "atomic_unit_multiplier",
 ]
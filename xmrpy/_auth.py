@@ -0,0 +1,144 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import os
+import hashlib
+from urllib.request import parse_http_list, parse_keqv_list
+import httpx
+from xmrpy._logger import logger
+from xmrpy.t import Dict, Optional, Generator, Any
+
+_ALGORITHMS: Dict[str, Any] = {
+    "MD5": hashlib.md5,
+    "MD5-SESS": hashlib.md5,
+    "SHA-256": hashlib.sha256,
+    "SHA-256-SESS": hashlib.sha256,
+}
+
+
+class _Challenge:
+    def __init__(self, realm: str, nonce: str, algorithm: str, opaque: Optional[str], qop: Optional[str], stale: bool):
+        self.realm = realm
+        self.nonce = nonce
+        self.algorithm = algorithm
+        self.opaque = opaque
+        self.qop = qop
+        self.stale = stale
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> Optional["_Challenge"]:
+        for header in response.headers.get_list("www-authenticate"):
+            scheme, _, fields = header.partition(" ")
+            if scheme.lower() != "digest":
+                continue
+
+            params = parse_keqv_list(parse_http_list(fields))
+            qops = [q.strip() for q in params.get("qop", "").split(",")]
+            return cls(
+                realm=params.get("realm", ""),
+                nonce=params["nonce"],
+                algorithm=params.get("algorithm", "MD5").upper(),
+                opaque=params.get("opaque"),
+                qop="auth" if "auth" in qops else None,
+                stale=params.get("stale", "").lower() == "true",
+            )
+        return None
+
+
+class DigestAuth(httpx.Auth):
+    """
+    Digest auth that caches the server challenge and signs every following request up front
+    with an incrementing nonce count, so only the first request (or one answered with a stale
+    nonce) pays the 401 round trip
+    """
+
+    def __init__(self, username: str, password: str):
+        self._username = username
+        self._password = password
+        self._challenge: Optional[_Challenge] = None
+        self._nonce_count = 0
+
+        self.challenges = 0
+        self.stale = 0
+        self.avoided = 0
+
+    def auth_flow(self, request: httpx.Request) -> Generator[httpx.Request, httpx.Response, None]:
+        preemptive = self._challenge is not None
+        if preemptive:
+            request.headers["Authorization"] = self._authorization(request)
+
+        response = yield request
+
+        if response.status_code != 401:
+            if preemptive:
+                self.avoided += 1
+            return
+
+        challenge = _Challenge.from_response(response)
+        if challenge is None:
+            return
+
+        self.challenges += 1
+        if challenge.stale:
+            self.stale += 1
+            logger.debug("Digest nonce for realm '%s' went stale, re-challenging", challenge.realm)
+
+        self._challenge = challenge
+        self._nonce_count = 0
+        request.headers["Authorization"] = self._authorization(request)
+        yield request
+
+    def stats(self) -> Dict[str, int]:
+        return {"challenges": self.challenges, "stale": self.stale, "avoided": self.avoided}
+
+    def _authorization(self, request: httpx.Request) -> str:
+        challenge: _Challenge = self._challenge  # type: ignore
+        digest = _ALGORITHMS.get(challenge.algorithm, hashlib.md5)
+
+        def H(value: str) -> str:
+            hexdigest: str = digest(value.encode()).hexdigest()
+            return hexdigest
+
+        self._nonce_count += 1
+        nc = "{:08x}".format(self._nonce_count)
+        cnonce = os.urandom(8).hex()
+        uri = request.url.raw_path.decode()
+
+        ha1 = H("{}:{}:{}".format(self._username, challenge.realm, self._password))
+        if challenge.algorithm.endswith("-SESS"):
+            ha1 = H("{}:{}:{}".format(ha1, challenge.nonce, cnonce))
+        ha2 = H("{}:{}".format(request.method, uri))
+
+        if challenge.qop:
+            response = H(":".join([ha1, challenge.nonce, nc, cnonce, challenge.qop, ha2]))
+        else:
+            response = H(":".join([ha1, challenge.nonce, ha2]))
+
+        fields = [
+            'username="{}"'.format(self._username),
+            'realm="{}"'.format(challenge.realm),
+            'nonce="{}"'.format(challenge.nonce),
+            'uri="{}"'.format(uri),
+            'response="{}"'.format(response),
+            "algorithm={}".format(challenge.algorithm),
+        ]
+        if challenge.opaque is not None:
+            fields.append('opaque="{}"'.format(challenge.opaque))
+        if challenge.qop:
+            fields.extend(["qop={}".format(challenge.qop), "nc={}".format(nc), 'cnonce="{}"'.format(cnonce)])
+
+        return "Digest " + ", ".join(fields)
@@ -0,0 +1,96 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import time
+from collections import OrderedDict
+from xmrpy._logger import logger
+from xmrpy._methods import BALANCE_METHODS, CACHE_TTLS, INVALIDATES
+from xmrpy.t import Any, Dict, Optional, Tuple, FrozenSet, RpcResponse
+
+
+class ResponseCache:
+    """
+    LRU cache of successful read-only responses, bounded to `max_size` entries, with a
+    per-method TTL (see CACHE_TTLS). Balance and transfer entries are dropped as soon as
+    get_height reports a new block, and writes drop whatever they make stale (see INVALIDATES).
+    """
+
+    def __init__(self, max_size: int = 1024, ttls: Optional[Dict[str, float]] = None):
+        self.max_size = max_size
+        self._ttls = ttls if ttls is not None else CACHE_TTLS
+        self._entries: "OrderedDict[str, Tuple[float, str, RpcResponse]]" = OrderedDict()
+        self._height: Optional[int] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def cacheable(self, method: Optional[str]) -> bool:
+        return method in self._ttls
+
+    def get(self, key: str) -> Optional[RpcResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires, _, response = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def put(self, key: str, method: str, response: RpcResponse):
+        self._entries[key] = (time.monotonic() + self._ttls[method], method, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def observe(self, method: Optional[str], response: RpcResponse):
+        if response.is_err():
+            return
+
+        if method == "get_height":
+            height = response.result.get("height")
+            if self._height is not None and height != self._height:
+                logger.debug("Height moved %s -> %s, dropping cached balances", self._height, height)
+                self.invalidate(BALANCE_METHODS)
+            self._height = height
+        elif method in INVALIDATES:
+            self.invalidate(INVALIDATES[method])
+
+    def invalidate(self, methods: Optional[FrozenSet[str]] = None):
+        if methods is None:
+            self._entries.clear()
+            return
+
+        for key in [key for key, (_, method, _) in self._entries.items() if method in methods]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "height": self._height,
+        }
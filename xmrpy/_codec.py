@@ -0,0 +1,124 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+from xmrpy._decoder import decoder
+from xmrpy._logger import logger
+from xmrpy._raw import RawResult, decode_raw
+from xmrpy.t import Any, Dict, RpcResponse
+
+
+def to_response(rjson: Dict[str, Any], ResultClass: Any, lazy: bool = False, validate: bool = False) -> RpcResponse:
+    if not "error" in rjson:
+        result = rjson["result"]
+        if not isinstance(result, dict):
+            rjson["result"] = ResultClass(result)
+        elif lazy:
+            rjson["result"] = ResultClass.wrap(result)
+        else:
+            try:
+                rjson["result"] = decoder(ResultClass, validate)(result)
+            except TypeError as err:
+                # Only raised by validation: the wallet's reply doesn't match the result's annotations. The
+                # call itself succeeded (and may have been a transfer), so report the mismatch and keep the result
+                logger.warning("Result failed validation: %s", err)
+                rjson["result"] = decoder(ResultClass)(result)
+        rjson["error"] = None
+    return RpcResponse(rjson)
+
+
+class Codec:
+    """
+    With `lazy`, decoded results are wrapped (DataClass.wrap) rather than built up front; with
+    `validate`, results built up front are type checked against their annotations and mismatches logged
+    """
+
+    name = "json"
+
+    def __init__(self, lazy: bool = False, validate: bool = False):
+        self.lazy = lazy
+        self.validate = validate
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode()
+
+    def loads(self, content: bytes) -> Any:
+        return json.loads(content)
+
+    def decode(self, content: bytes, ResultClass: Any) -> RpcResponse:
+        """
+        Decode a raw JSON-RPC response body straight into an RpcResponse whose `result`
+        is an instance of `ResultClass` (a RawResult slice of the body for RawResult)
+        """
+        if ResultClass is RawResult:
+            return decode_raw(content, self)
+        return to_response(self.loads(content), ResultClass, self.lazy, self.validate)
+
+
+class OrjsonCodec(Codec):
+    name = "orjson"
+
+    def __init__(self, lazy: bool = False, validate: bool = False):
+        import orjson
+
+        super().__init__(lazy, validate)
+        self._orjson = orjson
+
+    def dumps(self, data: Any) -> bytes:
+        return self._orjson.dumps(data)
+
+    def loads(self, content: bytes) -> Any:
+        return self._orjson.loads(content)
+
+
+class UjsonCodec(Codec):
+    name = "ujson"
+
+    def __init__(self, lazy: bool = False, validate: bool = False):
+        import ujson  # type: ignore
+
+        super().__init__(lazy, validate)
+        self._ujson = ujson
+
+    def dumps(self, data: Any) -> bytes:
+        dumped: str = self._ujson.dumps(data)
+        return dumped.encode()
+
+    def loads(self, content: bytes) -> Any:
+        return self._ujson.loads(content)
+
+
+_CODECS = {"orjson": OrjsonCodec, "ujson": UjsonCodec, "json": Codec}
+
+
+def get_codec(name: str = "auto", lazy: bool = False, validate: bool = False) -> Codec:
+    """
+    Return the codec called `name`, or with "auto" the fastest one installed (orjson, then
+    ujson, then the stdlib json module)
+    """
+    name = name.lower()
+    if name != "auto":
+        if name not in _CODECS:
+            raise ValueError("Unrecognized JSON codec: {}.".format(name))
+        return _CODECS[name](lazy, validate)
+
+    for codec in (OrjsonCodec, UjsonCodec):
+        try:
+            return codec(lazy, validate)
+        except ImportError:
+            continue
+    return Codec(lazy, validate)
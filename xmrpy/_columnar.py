@@ -0,0 +1,306 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Columnar views over transfer and payment history: one NumPy array per numeric field and
+dictionary-encoded strings, so filters and group-by sums over a wallet's whole history run as a
+handful of vectorized operations instead of a Python loop over result objects.
+
+numpy is optional (pip install xmrpy[columnar]); it's only needed once this module is imported
+(`xmrpy.TransferTable`).
+"""
+
+from itertools import count
+from operator import attrgetter, itemgetter
+
+try:
+    import numpy as np
+except ImportError as err:  # pragma: no cover
+    raise ImportError("xmrpy.TransferTable needs numpy (pip install xmrpy[columnar])") from err
+
+from xmrpy.t import Any, DataClass, Dict, Iterable, List, Optional, RpcException, RpcResponse, Sequence, Tuple, Union
+
+# get_transfers categories, in the order their rows are laid out
+CATEGORIES = ("in", "out", "pending", "failed", "pool")
+
+_UNSIGNED = ("amount", "fee")
+_SIGNED = ("height", "timestamp", "confirmations", "major", "minor")
+# Payments and incoming_transfers name these fields differently
+_ALIASES = {"height": ("height", "block_height"), "txid": ("txid", "tx_hash")}
+
+
+class Encoded:
+    """
+    A dictionary-encoded string column: `codes[i]` indexes into `values`
+    """
+
+    __slots__ = ("codes", "values", "_index")
+
+    def __init__(self, codes: np.ndarray, values: List[str]):
+        self.codes = codes
+        self.values = values
+        self._index: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def encode(cls, strings: Sequence[str]) -> "Encoded":
+        index: Dict[str, int] = dict.fromkeys(strings)  # type: ignore
+        index.update(zip(index, count()))
+        codes = np.fromiter(map(index.__getitem__, strings), dtype=np.int32, count=len(strings))
+        encoded = cls(codes, list(index))
+        encoded._index = index
+        return encoded
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, (int, np.integer)):
+            return self.values[self.codes[key]]
+        return Encoded(self.codes[key], self.values)
+
+    def __eq__(self, value: Any) -> np.ndarray:  # type: ignore
+        return self.isin((value,))
+
+    def __ne__(self, value: Any) -> np.ndarray:  # type: ignore
+        return ~self.isin((value,))
+
+    def isin(self, values: Iterable[str]) -> np.ndarray:
+        if self._index is None:
+            self._index = {value: code for code, value in enumerate(self.values)}
+        wanted = [self._index[v] for v in values if v in self._index]
+        return np.isin(self.codes, wanted)
+
+    def tolist(self) -> List[str]:
+        values = self.values
+        return [values[code] for code in self.codes.tolist()]
+
+
+class TransferTable:
+    """
+    Columnar transfer (or payment) history. Numeric columns are NumPy arrays: `amount` and `fee`
+    (uint64 atomic units), `height`, `timestamp`, `confirmations`, and the subaddress index as
+    `major` (account) and `minor`. `txid`, `payment_id` and `type` (the get_transfers category)
+    are Encoded columns. Fields a source doesn't carry (a payment's fee, say) are zero or "".
+
+    Building a table reads every field of every row, so it costs a few times one Python loop over
+    the same rows (3-5x for 100k get_transfers rows, lazy results included). The queries after it
+    run in about a millisecond each, so it pays off once a history is filtered or summed more than
+    once, not for a single pass.
+
+        table = TransferTable.from_result(await wallet.get_transfers())
+        incoming = table[(table.type == "in") & (table.major == 0)]
+        (accounts, days), totals = incoming.group_sum(["major", "day"])
+    """
+
+    __slots__ = _UNSIGNED + _SIGNED + ("txid", "payment_id", "type")
+
+    amount: np.ndarray
+    fee: np.ndarray
+    height: np.ndarray
+    timestamp: np.ndarray
+    confirmations: np.ndarray
+    major: np.ndarray
+    minor: np.ndarray
+    txid: Encoded
+    payment_id: Encoded
+    type: Encoded
+
+    def __init__(self, columns: Dict[str, Any]):
+        for name in self.__slots__:
+            setattr(self, name, columns[name])
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Any], category: Optional[str] = None) -> "TransferTable":
+        """
+        Build from _FullTransfer, _Payment or _Transfer items, or the plain dicts they decode from;
+        `category` fills the type column for rows that don't carry one
+        """
+        if rows and isinstance(rows[0], DataClass) and rows[0]._raw is not None:
+            rows = [row._raw for row in rows]
+        if category is None:
+            return cls._build(rows, Encoded.encode(_pluck(rows, ("type",), "")))
+        return cls._build(rows, Encoded(np.zeros(len(rows), dtype=np.int32), [category] if rows else []))
+
+    @classmethod
+    def _build(cls, rows: Sequence[Any], types: Encoded) -> "TransferTable":
+        n = len(rows)
+
+        def column(name: str, dtype: Any, source: Sequence[Any] = rows) -> np.ndarray:
+            return np.fromiter(_pluck(source, _ALIASES.get(name, (name,)), 0), dtype=dtype, count=n)
+
+        columns: Dict[str, Any] = {name: column(name, np.uint64) for name in _UNSIGNED}
+        for name in ("height", "timestamp", "confirmations"):
+            columns[name] = column(name, np.int64)
+
+        indices = _pluck(rows, ("subaddr_index",), {})
+        columns["major"] = column("major", np.int64, indices)
+        columns["minor"] = column("minor", np.int64, indices)
+
+        columns["txid"] = Encoded.encode(_pluck(rows, _ALIASES["txid"], ""))
+        columns["payment_id"] = Encoded.encode(_pluck(rows, ("payment_id",), ""))
+        columns["type"] = types
+        return cls(columns)
+
+    @classmethod
+    def from_result(cls, result: Any) -> "TransferTable":
+        """
+        Build from a get_transfers, get_transfer_by_txid, get_payments, get_bulk_payments or
+        incoming_transfers result (or the RpcResponse carrying it). With LAZY_RESULTS the rows
+        are read straight from the decoded JSON without building any result objects.
+        """
+        if isinstance(result, RpcResponse):
+            if result.is_err():
+                raise RpcException(result.error)
+            result = result.result
+
+        source = _source(result)
+        # Wallets leave empty categories out of the reply, so go by the result's fields when it has them
+        fields = getattr(type(result), "_fields", source)
+        if any(category in fields for category in CATEGORIES):
+            # One table over all categories' rows, so the string columns are encoded once rather
+            # than per category and then merged
+            parts = [source.get(category) or [] for category in CATEGORIES]
+            present = [category for category, part in zip(CATEGORIES, parts) if part]
+            codes = np.repeat(np.arange(len(present), dtype=np.int32), [len(part) for part in parts if part])
+            return cls._build([row for part in parts for row in part], Encoded(codes, present))
+
+        for key in ("transfers", "payments"):
+            if key in fields:
+                return cls.from_rows(source.get(key) or [])
+        raise ValueError("{} has no transfer or payment rows".format(type(result).__name__))
+
+    @classmethod
+    def concat(cls, tables: Sequence["TransferTable"]) -> "TransferTable":
+        columns: Dict[str, Any] = {}
+        for name in cls.__slots__:
+            parts = [getattr(table, name) for table in tables]
+            if isinstance(parts[0], Encoded):
+                columns[name] = _concat_encoded(parts)
+            else:
+                columns[name] = np.concatenate(parts)
+        return cls(columns)
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    def __getitem__(self, key: Any) -> "TransferTable":
+        """
+        Rows selected by a boolean mask, an index array or a slice
+        """
+        return TransferTable({name: getattr(self, name)[key] for name in self.__slots__})
+
+    @property
+    def day(self) -> np.ndarray:
+        """
+        UTC day number of each row (timestamp // 86400)
+        """
+        return self.timestamp // 86400
+
+    def column(self, key: Union[str, np.ndarray]) -> np.ndarray:
+        if not isinstance(key, str):
+            return key
+        value = getattr(self, key)
+        return value.codes if isinstance(value, Encoded) else value
+
+    def group_sum(
+        self, keys: Sequence[Union[str, np.ndarray]], value: str = "amount", where: Optional[np.ndarray] = None
+    ) -> Tuple[Tuple[np.ndarray, ...], np.ndarray]:
+        """
+        Sum `value` per distinct combination of `keys` (column names such as "major" or "day", or
+        arrays as long as the table), over the rows selected by the `where` mask if given. Returns
+        one array of group keys per key and the sums, in key order; Encoded keys come back as codes
+        (see `Encoded.values`).
+        """
+        columns = [self.column(key) for key in keys]
+        values = self.column(value)
+        if where is not None:
+            columns = [column[where] for column in columns]
+            values = values[where]
+        if not len(values):
+            return tuple(np.empty(0, dtype=column.dtype) for column in columns), np.empty(0, dtype=values.dtype)
+
+        lows = [int(column.min()) for column in columns]
+        spans = [int(column.max()) - low + 1 for column, low in zip(columns, lows)]
+        size = 1
+        for span in spans:
+            size *= span
+
+        if size > max(4 * len(values), 1 << 16):
+            # Sparse keys (txid codes, raw timestamps): sort instead
+            order = np.lexsort(columns[::-1])
+            ordered = [column[order] for column in columns]
+            starts = np.flatnonzero(np.any([np.diff(column) != 0 for column in ordered], axis=0)) + 1
+            starts = np.concatenate(([0], starts))
+            return tuple(column[starts] for column in ordered), np.add.reduceat(values[order], starts)
+
+        # Dense keys (accounts, days, heights): one slot per possible combination, no sort
+        slots = np.zeros(len(values), dtype=np.int64)
+        for column, low, span in zip(columns, lows, spans):
+            slots = slots * span + (column - low)
+        sums = np.zeros(size, dtype=values.dtype)
+        np.add.at(sums, slots, values)
+        present = np.flatnonzero(np.bincount(slots, minlength=size))
+
+        groups = []
+        rest = present
+        for column, low, span in reversed(list(zip(columns, lows, spans))):
+            rest, offset = np.divmod(rest, span)
+            groups.append((offset + low).astype(column.dtype))
+        return tuple(groups[::-1]), sums[present]
+
+    def sum(self, value: str = "amount") -> int:
+        return int(self.column(value).sum())
+
+
+def _source(item: Any) -> Any:
+    # Lazy results keep the decoded JSON around: read it instead of materializing each field
+    if isinstance(item, DataClass) and item._raw is not None:
+        return item._raw
+    return item
+
+
+def _pluck(rows: Sequence[Any], keys: Tuple[str, ...], default: Any) -> List[Any]:
+    # One field of every row. Rows of a list share a shape, so the first row settles which alias
+    # is present and whether they're dicts (decoded JSON) or eagerly built DataClass instances;
+    # the plain getter only falls back to the slower defaulting one when some row lacks the field
+    if not rows:
+        return []
+    first = rows[0]
+    if isinstance(first, dict):
+        key = next((key for key in keys if key in first), keys[0])
+        try:
+            return list(map(itemgetter(key), rows))
+        except KeyError:
+            return [row.get(key, default) for row in rows]
+
+    fields = type(first)._fields
+    attr = next((fields[key][0] for key in keys if key in fields), keys[0])
+    try:
+        return list(map(attrgetter(attr), rows))
+    except AttributeError:
+        return [getattr(row, attr, default) for row in rows]
+
+
+def _concat_encoded(parts: List[Encoded]) -> Encoded:
+    index: Dict[str, int] = {}
+    codes = []
+    for part in parts:
+        remap = np.array([index.setdefault(value, len(index)) for value in part.values], dtype=np.int32)
+        codes.append(remap[part.codes] if len(part.values) else part.codes)
+    encoded = Encoded(np.concatenate(codes) if codes else np.empty(0, dtype=np.int32), list(index))
+    encoded._index = index
+    return encoded
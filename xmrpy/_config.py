@@ -16,6 +16,7 @@
 # USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 import os
+from xmrpy.t import Optional
 from xmrpy._utils import config_file_to_config, derive_loglevel
 
 
@@ -23,20 +24,74 @@ class Config:
 
     DAEMON_RPC_ADDR: str = "127.0.0.1:18081"
     WALLET_RPC_ADDR: str = "127.0.0.1:18083"
+    WALLET_RPC_REPLICA_ADDRS: str = ""
+    LOAD_BALANCE_STRATEGY: str = "least_outstanding"
+    HEALTH_CHECK_INTERVAL: str = "10"
 
     DIGEST_USER_NAME: str
     DIGEST_USER_PASSWORD: str
 
     HTTP_READ_TIMEOUT: str = "10"
+    HTTP_CONNECT_TIMEOUT: Optional[str] = None
+    HTTP_WRITE_TIMEOUT: Optional[str] = None
+    HTTP_POOL_TIMEOUT: Optional[str] = None
+    METHOD_TIMEOUTS: str = ""
+
+    HTTP_MAX_CONNECTIONS: str = "100"
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: str = "20"
+    HTTP_KEEPALIVE_EXPIRY: str = "5"
+    HTTP_PREWARM_CONNECTIONS: str = "0"
+    HTTP2: str = "false"
+
+    JSON_CODEC: str = "auto"
+    LAZY_RESULTS: str = "false"
+    VALIDATE_RESULTS: str = "false"
+
+    COALESCE_READS: str = "false"
+    RESPONSE_CACHE: str = "false"
+    RESPONSE_CACHE_SIZE: str = "1024"
+
+    RETRY_ATTEMPTS: str = "3"
+    RETRY_BACKOFF_BASE: str = "0.1"
+    RETRY_BACKOFF_MAX: str = "2"
+    BREAKER_FAILURE_THRESHOLD: str = "5"
+    BREAKER_RESET_TIMEOUT: str = "30"
+
+    ADAPTIVE_CONCURRENCY: str = "false"
+    CONCURRENCY_LIMIT_INITIAL: str = "10"
+    CONCURRENCY_LIMIT_MIN: str = "1"
+    CONCURRENCY_LIMIT_MAX: str = "100"
+    CONCURRENCY_QUEUE_TIMEOUT: str = "10"
+    CONCURRENCY_MAX_QUEUE: str = "1000"
+    PRIORITY_AGING: str = "1"
 
     LOG_LEVEL = derive_loglevel("DEBUG")
     LOG_FILE = "xmrpy.log"
+    LOG_ASYNC: str = "true"
+    LOG_HOT_PATH_RATE: str = "10"
 
     def __init__(self, **kwargs):
         self.__dict__.update(**kwargs)
 
 
-p = os.path.join(os.path.dirname(os.path.dirname(os.path.relpath(__file__))), "xmrpy.conf")
-config = Config()
-if os.path.exists(p) and os.path.isfile("xmrpy.conf"):
-    config = config_file_to_config(p)
+_loaded: Optional[Config] = None
+
+
+def load_config() -> Config:
+    """
+    The default Config, read from xmrpy.conf on first use rather than at import
+    """
+    global _loaded
+    if _loaded is None:
+        p = os.path.join(os.path.dirname(os.path.dirname(os.path.relpath(__file__))), "xmrpy.conf")
+        _loaded = Config()
+        if os.path.exists(p) and os.path.isfile("xmrpy.conf"):
+            _loaded = config_file_to_config(p)
+    return _loaded
+
+
+def __getattr__(name: str) -> Config:
+    # `config` is still importable from here, it's just loaded when first asked for
+    if name == "config":
+        return load_config()
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,148 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""
+Decoders compiled per DataClass subclass from its annotations, the first time the class is
+decoded. Each is straight-line generated code: one `data.get` per field, the nested decoders of
+typed sub-objects and lists of them called directly, and keyword keys ("in") stored under their
+trailing-underscore field ("in_"). With `validate`, every present field is also type checked.
+Classes made by DataClass.only() skip the keys they don't select outright.
+"""
+
+from xmrpy.t import Any, Callable, DataClass, Dict, Tuple
+
+_MISSING = object()
+_SCALARS = {int: (int,), float: (int, float), str: (str,), bool: (bool,)}
+
+_Compiled = Tuple[Callable[[Any, Dict[str, Any]], None], Callable[[Dict[str, Any]], Any]]
+
+_compiled: Dict[Tuple[type, bool], _Compiled] = {}
+
+
+def filler(cls: type, validate: bool = False) -> Callable[[Any, Dict[str, Any]], None]:
+    """
+    `fill(instance, data)` setting the fields of an already created instance of `cls`
+    """
+    return _compile(cls, validate)[0]
+
+
+def decoder(cls: type, validate: bool = False) -> Callable[[Dict[str, Any]], Any]:
+    """
+    `decode(data)` returning a new instance of `cls` built from the decoded JSON object `data`
+    """
+    return _compile(cls, validate)[1]
+
+
+def _generic(value: Dict[str, Any]) -> DataClass:
+    return DataClass(value)
+
+
+def _extras(data: Dict[str, Any], fields: Any) -> Dict[str, Any]:
+    # Keys without a field keep the old behaviour: nested dicts become generic DataClass instances
+    return {
+        key: DataClass(value) if value.__class__ is dict else value for key, value in data.items() if key not in fields
+    }
+
+
+def _mismatch(cls: type, key: str, expected: str, value: Any):
+    raise TypeError("{}.{}: expected {}, got {}".format(cls.__name__, key, expected, type(value).__name__))
+
+
+def _kind(annotation: Any) -> Tuple[str, Any]:
+    if isinstance(annotation, type) and issubclass(annotation, DataClass):
+        return "object", annotation
+
+    origin = getattr(annotation, "__origin__", None)
+    args = getattr(annotation, "__args__", None) or ()
+    if origin is list:
+        if args and isinstance(args[0], type) and issubclass(args[0], DataClass):
+            return "objects", args[0]
+        return "list", None
+    if annotation in _SCALARS:
+        return "scalar", annotation
+    # Any, Dict[...], TypeVars: dicts still become generic DataClass instances
+    return "any", None
+
+
+def _compile(cls: type, validate: bool) -> _Compiled:
+    compiled = _compiled.get((cls, validate))
+    if compiled is not None:
+        return compiled
+
+    namespace: Dict[str, Any] = {
+        "_cls": cls,
+        "_new": cls.__new__,
+        "_MISSING": _MISSING,
+        "_generic": _generic,
+        "_extras": _extras,
+        "_mismatch": _mismatch,
+        "_fields": cls._fields,  # type: ignore
+    }
+    annotations: Dict[str, Any] = {}
+    for klass in reversed(cls.__mro__):
+        annotations.update(getattr(klass, "__annotations__", {}))
+
+    body = ["n = 0"]
+    for key, (attr, _) in cls._fields.items():  # type: ignore
+        kind, target = _kind(annotations.get(attr))
+        if target is not None and kind != "scalar":
+            namespace["_dec_" + attr] = decoder(target, validate)
+        body += ["v = get({!r}, _MISSING)".format(key), "if v is not _MISSING:", "    n += 1"]
+
+        if validate and kind != "any":
+            expected = {"object": dict, "objects": list, "list": list}.get(kind)
+            types = _SCALARS[target] if kind == "scalar" else (expected,)
+            namespace["_types_" + attr] = types
+            name = target.__name__ if kind == "scalar" else expected.__name__  # type: ignore
+            body += [
+                "    if v is not None and not isinstance(v, _types_{}):".format(attr),
+                "        _mismatch(_cls, {!r}, {!r}, v)".format(key, name),
+            ]
+
+        if kind == "object":
+            value = "_dec_{0}(v) if v.__class__ is dict else v".format(attr)
+        elif kind == "objects":
+            value = "[_dec_{0}(i) if i.__class__ is dict else i for i in v] if v.__class__ is list else v".format(attr)
+        elif kind == "any":
+            value = "_generic(v) if v.__class__ is dict else v"
+        else:
+            value = "v"
+        body.append("    self.{} = {}".format(attr, value))
+    if not cls._skip:  # type: ignore
+        body += ["if n != len(data):", "    self._extra = _extras(data, _fields)"]
+
+    indented = "\n".join("    " + line for line in body)
+    source = (
+        "def fill(self, data):\n"
+        "    self._extra = None\n"
+        "    self._raw = None\n"
+        "    get = data.get\n"
+        "{0}\n"
+        "\n"
+        "def decode(data):\n"
+        "    self = _new(_cls)\n"
+        "    self._extra = None\n"
+        "    self._raw = None\n"
+        "    get = data.get\n"
+        "{0}\n"
+        "    return self\n"
+    ).format(indented)
+    exec(compile(source, "<decoder {}{}>".format(cls.__name__, ", validated" if validate else ""), "exec"), namespace)
+
+    _compiled[(cls, validate)] = (namespace["fill"], namespace["decode"])
+    return _compiled[(cls, validate)]
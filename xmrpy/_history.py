@@ -0,0 +1,267 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Incremental transfer history: each poll asks wallet-rpc only for blocks above a stored per-wallet
+cursor (less a reorg window) and reports what changed since the previous poll
+"""
+
+import os
+import abc
+import json
+import asyncio
+from xmrpy._logger import logger
+from xmrpy._result import _FullTransfer
+from xmrpy.t import Any, AsyncIterator, Dict, List, Optional, RpcException
+
+# Transfers are keyed by direction rather than category, so a pending "out" that confirms (or a
+# "pool" that lands in a block as "in") keeps its key
+_DIRECTIONS = {"in": "in", "pool": "in", "out": "out", "pending": "out", "failed": "out"}
+
+
+class StateStore(abc.ABC):
+    """
+    Where TransferSync keeps each wallet's cursor between polls. `load` returns None for a wallet
+    it has never seen; states are plain JSON-serializable dicts.
+    """
+
+    @abc.abstractmethod
+    async def load(self, key: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abc.abstractmethod
+    async def save(self, key: str, state: Dict[str, Any]):
+        ...
+
+
+class MemoryStateStore(StateStore):
+    def __init__(self):
+        self._states: Dict[str, Dict[str, Any]] = {}
+
+    async def load(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._states.get(key)
+
+    async def save(self, key: str, state: Dict[str, Any]):
+        self._states[key] = state
+
+
+class FileStateStore(StateStore):
+    """
+    Every wallet's state in one JSON file, rewritten atomically (write then rename) off the event loop
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = asyncio.Lock()
+
+    async def load(self, key: str) -> Optional[Dict[str, Any]]:
+        states = await asyncio.get_running_loop().run_in_executor(None, self._read)
+        return states.get(key)
+
+    async def save(self, key: str, state: Dict[str, Any]):
+        async with self._lock:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, key, state)
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r") as f:
+                states: Dict[str, Any] = json.load(f)
+                return states
+        except FileNotFoundError:
+            return {}
+
+    def _write(self, key: str, state: Dict[str, Any]):
+        states = self._read()
+        states[key] = state
+        tmp = "{}.tmp".format(self.path)
+        with open(tmp, "w") as f:
+            json.dump(states, f)
+        os.replace(tmp, self.path)
+
+
+class TransferDelta:
+    """
+    What changed between two polls:
+
+    - added: transfers newly confirmed in a block (never seen pending)
+    - confirmed: pending or pool transfers that are now in a block
+    - pending: transfers newly seen in the pool or pending
+    - failed: transfers that newly failed
+    - reorged: previously reported confirmed transfers whose block was reorganized away (a
+      transfer that was mined again in another block is also in `added`)
+    - dropped: pending or pool transfers that disappeared without confirming or failing
+    """
+
+    __slots__ = ("added", "confirmed", "pending", "failed", "reorged", "dropped", "height", "state")
+
+    def __init__(self, height: int, state: Dict[str, Any]):
+        self.added: List[_FullTransfer] = []
+        self.confirmed: List[_FullTransfer] = []
+        self.pending: List[_FullTransfer] = []
+        self.failed: List[_FullTransfer] = []
+        self.reorged: List[_FullTransfer] = []
+        self.dropped: List[_FullTransfer] = []
+        self.height = height
+        self.state = state
+
+    def __bool__(self) -> bool:
+        return any((self.added, self.confirmed, self.pending, self.failed, self.reorged, self.dropped))
+
+    def __repr__(self) -> str:
+        counts = ", ".join("{}={}".format(name, len(getattr(self, name))) for name in self.__slots__[:6])
+        return "TransferDelta(height={}, {})".format(self.height, counts)
+
+
+class TransferSync:
+    """
+    Keeps a cursor per wallet (`key`, by default its primary address) in `store` and on each poll
+    fetches only transfers confirmed above `cursor - reorg_window`, plus everything pending, of
+    every account (or of `account_index` alone, whose cursor is then keyed "<address>#<index>").
+    Confirmed transfers within the window are remembered so a reorganization shows up as
+    `reorged`, and pending ones so their confirmation shows up as `confirmed`.
+
+        sync = wallet.transfer_sync(FileStateStore("transfers.json"))
+        async for delta in sync.watch(interval=30):
+            for transfer in delta.added + delta.confirmed:
+                credit(transfer)
+
+    The state only moves forward when a delta is committed: `poll()` commits before returning,
+    `watch()` once the loop body that received the delta has finished (so a crash while handling
+    a delta means it's delivered again).
+    """
+
+    def __init__(
+        self,
+        wallet: Any,
+        store: Optional[StateStore] = None,
+        key: Optional[str] = None,
+        reorg_window: int = 10,
+        account_index: Optional[int] = None,
+    ):
+        self._wallet = wallet
+        self._store = store if store is not None else MemoryStateStore()
+        self._key = key
+        self.reorg_window = reorg_window
+        self.account_index = account_index
+
+    async def wallet_key(self) -> str:
+        """
+        The key the cursor is stored under: `key` if given, else the primary address of the wallet
+        open on first use (a wallet-rpc can switch wallets with open_wallet, so its URL doesn't
+        identify one; sync a wallet opened later with a new TransferSync)
+        """
+        if self._key is None:
+            address = _result(await self._wallet.get_address(0, [0])).address
+            self._key = address if self.account_index is None else "{}#{}".format(address, self.account_index)
+        return self._key
+
+    async def poll(self, commit: bool = True) -> TransferDelta:
+        state = await self._store.load(await self.wallet_key()) or {"height": 0, "recent": {}, "pending": {}, "failed": []}
+        since = max(0, state["height"] - self.reorg_window)
+
+        # Height first: blocks found while get_transfers runs are simply fetched again next time
+        height = _result(await self._wallet.get_height()).height
+        result = _result(
+            await self._wallet.get_transfers(
+                min_height=since, account_index=self.account_index or 0, all_accounts=self.account_index is None
+            )
+        )
+
+        confirmed: Dict[str, _FullTransfer] = {}
+        unconfirmed: Dict[str, _FullTransfer] = {}
+        failed: Dict[str, _FullTransfer] = {}
+        for category, into in (("in_", confirmed), ("out", confirmed), ("pending", unconfirmed), ("pool", unconfirmed)):
+            for transfer in getattr(result, category, None) or ():
+                into[_key(transfer)] = transfer
+        for transfer in getattr(result, "failed", None) or ():
+            failed[_key(transfer)] = transfer
+
+        cursor = max(height - 1, state["height"])
+        window = cursor - self.reorg_window
+        recent: Dict[str, Any] = state["recent"]
+        pending: Dict[str, Any] = state["pending"]
+        known_failed = set(state["failed"])
+
+        delta = TransferDelta(
+            cursor,
+            {
+                "height": cursor,
+                "recent": {key: t.as_dict() for key, t in confirmed.items() if getattr(t, "height", 0) > window},
+                "pending": {key: t.as_dict() for key, t in unconfirmed.items()},
+                "failed": sorted(failed),
+            },
+        )
+
+        for key, transfer in confirmed.items():
+            seen = recent.get(key)
+            if seen is not None and seen.get("height") == getattr(transfer, "height", None):
+                continue
+            if seen is not None:
+                delta.reorged.append(_FullTransfer(seen))
+            (delta.confirmed if key in pending else delta.added).append(transfer)
+
+        for key, seen in recent.items():
+            if key not in confirmed and seen.get("height", 0) > since:
+                delta.reorged.append(_FullTransfer(seen))
+
+        for key, transfer in unconfirmed.items():
+            if key not in pending:
+                delta.pending.append(transfer)
+
+        for key, transfer in failed.items():
+            if key not in known_failed:
+                delta.failed.append(transfer)
+
+        for key, seen in pending.items():
+            if key not in confirmed and key not in unconfirmed and key not in failed:
+                delta.dropped.append(_FullTransfer(seen))
+
+        if delta:
+            logger.info("Transfer sync %s: %s", await self.wallet_key(), delta)
+        if commit:
+            await self.commit(delta)
+        return delta
+
+    async def commit(self, delta: TransferDelta):
+        await self._store.save(await self.wallet_key(), delta.state)
+
+    async def watch(self, interval: float = 30.0) -> AsyncIterator[TransferDelta]:
+        """
+        Poll every `interval` seconds, yielding the deltas that aren't empty
+        """
+        while True:
+            delta = await self.poll(commit=False)
+            if delta:
+                yield delta
+            await self.commit(delta)
+            await asyncio.sleep(interval)
+
+
+def _key(transfer: _FullTransfer) -> str:
+    index = getattr(transfer, "subaddr_index", None)
+    return "{}:{}:{}:{}".format(
+        _DIRECTIONS.get(getattr(transfer, "type", ""), "in"),
+        getattr(transfer, "txid", ""),
+        getattr(index, "major", 0),
+        getattr(index, "minor", 0),
+    )
+
+
+def _result(response: Any) -> Any:
+    if response.is_err():
+        raise RpcException(response.error)
+    return response.result
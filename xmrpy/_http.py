@@ -15,50 +15,352 @@
 # IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
 # USE OR OTHER DEALINGS IN THE SOFTWARE.
 
-import json
+import time
+import asyncio
+import functools
+from urllib.parse import urlparse
 import httpx
-from xmrpy._logger import logger
+from xmrpy._auth import DigestAuth
+from xmrpy._codec import Codec, get_codec, to_response
+from xmrpy._limiter import AdaptiveLimiter
+from xmrpy._retry import ERR_OVERLOADED
+from xmrpy._stream import ArrayStream
+from xmrpy._logger import hot, logger
+from xmrpy._utils import derive_bool
 from xmrpy.t import (
     Optional,
     Dict,
+    List,
+    Tuple,
+    Union,
     Any,
     Callable,
+    AsyncIterator,
+    FrozenSet,
     RpcError,
+    RpcException,
     Headers,
     RpcResponse,
+    Priority,
 )
 
 
 class HttpClient:
-    def __init__(self, headers: Optional[Headers], timeout: int = 3):
+    def __init__(
+        self,
+        headers: Optional[Headers],
+        timeout: Union[float, httpx.Timeout] = 3,
+        limits: Optional[httpx.Limits] = None,
+        http2: bool = False,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        codec: Optional[Codec] = None,
+        uds: Optional[Dict[str, str]] = None,
+        limiter: Optional[Callable[[], AdaptiveLimiter]] = None,
+    ):
+        """
+        `uds` maps an origin (e.g. "http://uds-1a2b3c4d") to a unix socket path; requests to
+        that origin go over the socket instead of TCP. `limiter` builds the adaptive
+        concurrency limiter given to each host; without it requests are never held back
+        """
         self._headers = headers
-        self._httpx = httpx.AsyncClient(timeout=timeout)
-        self._auth: httpx.DigestAuth
+        self._timeout = httpx.Timeout(timeout)
+        self._codec = codec or get_codec()
+        limits = limits or httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        mounts = {
+            origin: httpx.AsyncHTTPTransport(uds=path, limits=limits, http2=http2)
+            for origin, path in (uds or {}).items()
+        }
+        self._httpx = httpx.AsyncClient(
+            timeout=timeout,
+            limits=limits,
+            http2=http2,
+            transport=transport,
+            mounts=mounts,  # type: ignore
+        )
+        self._credentials: Optional[Tuple[str, str]] = None
+        self._auths: Dict[str, DigestAuth] = {}
+        self._batch_supported = True
+        self._limiter = limiter
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+
+    @property
+    def lazy_results(self) -> bool:
+        return self._codec.lazy
+
+    @classmethod
+    def from_config(cls, conf: Any, headers: Optional[Headers], **kwargs: Any) -> "HttpClient":
+        read = float(conf.HTTP_READ_TIMEOUT)
+
+        def phase(value: Optional[str]) -> float:
+            return float(value) if value is not None else read
+
+        timeout = httpx.Timeout(
+            read,
+            connect=phase(conf.HTTP_CONNECT_TIMEOUT),
+            write=phase(conf.HTTP_WRITE_TIMEOUT),
+            pool=phase(conf.HTTP_POOL_TIMEOUT),
+        )
+        limits = httpx.Limits(
+            max_connections=int(conf.HTTP_MAX_CONNECTIONS),
+            max_keepalive_connections=int(conf.HTTP_MAX_KEEPALIVE_CONNECTIONS),
+            keepalive_expiry=float(conf.HTTP_KEEPALIVE_EXPIRY),
+        )
+        kwargs.setdefault(
+            "codec",
+            get_codec(
+                conf.JSON_CODEC, lazy=derive_bool(conf.LAZY_RESULTS), validate=derive_bool(conf.VALIDATE_RESULTS)
+            ),
+        )
+        if derive_bool(conf.ADAPTIVE_CONCURRENCY):
+            kwargs.setdefault(
+                "limiter",
+                functools.partial(
+                    AdaptiveLimiter,
+                    initial=int(conf.CONCURRENCY_LIMIT_INITIAL),
+                    min_limit=int(conf.CONCURRENCY_LIMIT_MIN),
+                    max_limit=int(conf.CONCURRENCY_LIMIT_MAX),
+                    queue_timeout=float(conf.CONCURRENCY_QUEUE_TIMEOUT),
+                    max_queue=int(conf.CONCURRENCY_MAX_QUEUE),
+                    aging=float(conf.PRIORITY_AGING),
+                ),
+            )
+        else:
+            # Calls beyond the connection pool would otherwise wait for a connection in httpx, first come first
+            # served: queue them here instead so Priority still orders them, with the pool timeout as the wait
+            kwargs.setdefault(
+                "limiter",
+                functools.partial(
+                    AdaptiveLimiter.fixed,
+                    int(conf.HTTP_MAX_CONNECTIONS),
+                    queue_timeout=phase(conf.HTTP_POOL_TIMEOUT),
+                    max_queue=int(conf.CONCURRENCY_MAX_QUEUE),
+                    aging=float(conf.PRIORITY_AGING),
+                ),
+            )
+        return cls(headers, timeout=timeout, limits=limits, http2=derive_bool(conf.HTTP2), **kwargs)
 
     async def post(
         self,
         url: str,
         data: Optional[Dict[str, Any]] = None,
         ResultClass: Any = Callable[[Any], Any],
-    ):
-        logger.info("POST - %s", url)
-        compact = json.dumps(data)
-        response = await self._httpx.post(url, headers=self._headers, content=compact, auth=self._auth)  # type: ignore
+        priority: Priority = Priority.NORMAL,
+        timeout: Optional[float] = None,
+    ) -> RpcResponse:
+        hot.info("POST - %s", url)
+        compact = self._codec.dumps(data)
+        response = await self._request(url, compact, priority, timeout)
+        if response is None:
+            return HttpClient._overloaded(url)
         if response.status_code != 200:
             logger.error("Non-200[%s] returned via error: %s", response.status_code, response.text)
-            return RpcResponse(
-                {
-                    "result": None,
-                    "error": RpcError({"code": response.status_code, "message": response.text}),
-                    "id": "0",
-                    "jsonrpc": "2.0",
-                }
-            )
+            return HttpClient._error_response(response.status_code, response.text)
+
+        return self._codec.decode(response.content, ResultClass)
+
+    async def post_batch(
+        self,
+        url: str,
+        calls: List[Tuple[Dict[str, Any], Any]],
+        concurrent: bool = True,
+        priority: Priority = Priority.NORMAL,
+    ) -> List[RpcResponse]:
+        if self._batch_supported:
+            hot.info("POST[batch:%s] - %s", len(calls), url)
+            compact = self._codec.dumps([data for data, _ in calls])
+            # A batch takes as long as all of its calls, so its latency says nothing about the wallet's queue
+            response = await self._request(url, compact, priority, sample=False)
+            if response is None:
+                return [HttpClient._overloaded(url, data["id"]) for data, _ in calls]
+
+            try:
+                rjson = self._codec.loads(response.content)
+            except ValueError:
+                rjson = None
+
+            if response.status_code == 200 and isinstance(rjson, list):
+                replies = {reply.get("id"): reply for reply in rjson if isinstance(reply, dict)}
+                missing = "No response for batch id {}"
+                return [
+                    to_response(replies[data["id"]], ResultClass, self._codec.lazy, self._codec.validate)
+                    if data["id"] in replies
+                    else HttpClient._error_response(-32603, missing.format(data["id"]), data["id"])
+                    for data, ResultClass in calls
+                ]
+
+            # Only a reply that doesn't understand the array turns batching off for good: any 200 that isn't
+            # a list, or a JSON-RPC error object (-32600 Invalid Request, -32700 Parse error). Anything else
+            # (5xx, 401, ...) fails this batch alone
+            if response.status_code != 200 and not (isinstance(rjson, dict) and "error" in rjson):
+                logger.error("Non-200[%s] returned via error: %s", response.status_code, response.text)
+                return [
+                    HttpClient._error_response(response.status_code, response.text, data["id"]) for data, _ in calls
+                ]
+
+            logger.warning("Batch request rejected by %s, falling back to individual calls", url)
+            self._batch_supported = False
+
+        if concurrent:
+            return list(await asyncio.gather(*[self.post(url, data, rc, priority) for data, rc in calls]))
+        return [await self.post(url, data, rc, priority) for data, rc in calls]
+
+    async def stream(
+        self,
+        url: str,
+        data: Dict[str, Any],
+        keys: FrozenSet[str],
+        priority: Priority = Priority.NORMAL,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Yield `(key, item)` for every item of the `result` arrays named in `keys`, parsing
+        the response body as it arrives instead of loading it whole
+        """
+        hot.info("POST[stream] - %s", url)
+        compact = self._codec.dumps(data)
+        limiter = self._limiter_for(url)
+        if limiter is not None and not await limiter.acquire(priority):
+            raise RpcException(HttpClient._overloaded(url).error)
+
+        try:
+            async for item in self._stream(url, compact, keys, timeout):
+                yield item
+        finally:
+            if limiter is not None:
+                limiter.release()
+
+    async def _stream(
+        self, url: str, compact: bytes, keys: FrozenSet[str], timeout: Optional[float]
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        async with self._httpx.stream(
+            "POST",
+            url,
+            headers=self._headers,
+            content=compact,
+            auth=self._auth_for(url) or httpx.USE_CLIENT_DEFAULT,
+            timeout=self._timeout_for(timeout),
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                logger.error("Non-200[%s] returned via error: %s", response.status_code, response.text)
+                raise RpcException(RpcError({"code": response.status_code, "message": response.text}))
+
+            parser = ArrayStream(keys)
+            async for chunk in response.aiter_bytes():
+                for item in parser.feed(chunk):
+                    yield item
+                if parser.error is not None:
+                    raise RpcException(RpcError(parser.error))
+
+            for item in parser.close():
+                yield item
+            if parser.error is not None:
+                raise RpcException(RpcError(parser.error))
+
+    async def _request(
+        self,
+        url: str,
+        compact: bytes,
+        priority: Priority = Priority.NORMAL,
+        timeout: Optional[float] = None,
+        sample: bool = True,
+    ) -> Optional[httpx.Response]:
+        # None means the request waited too long for a slot under the host's concurrency limit
+        send = functools.partial(
+            self._httpx.post,
+            url,
+            headers=self._headers,
+            content=compact,
+            auth=self._auth_for(url) or httpx.USE_CLIENT_DEFAULT,
+            timeout=self._timeout_for(timeout),
+        )
+        limiter = self._limiter_for(url)
+        if limiter is None:
+            return await send()
+        if not await limiter.acquire(priority):
+            return None
+
+        start = time.monotonic()
+        try:
+            response = await send()
+        except httpx.TimeoutException:
+            limiter.release(dropped=True)
+            raise
+        except BaseException:
+            limiter.release()
+            raise
+
+        if response.status_code >= 500:
+            limiter.release(dropped=True)
+        else:
+            limiter.release(time.monotonic() - start if sample else None)
+        return response
+
+    def _timeout_for(self, seconds: Optional[float]) -> httpx.Timeout:
+        # A call's own timeout replaces the read timeout and caps the other phases
+        if seconds is None:
+            return self._timeout
 
-        rjson = response.json()
-        if not "error" in rjson:
-            rjson.update({"result": ResultClass(rjson["result"]), "error": None})
-        return RpcResponse(rjson)
+        def cap(phase: Optional[float]) -> float:
+            return seconds if phase is None else min(phase, seconds)  # type: ignore
+
+        base = self._timeout
+        return httpx.Timeout(seconds, connect=cap(base.connect), write=cap(base.write), pool=cap(base.pool))
+
+    def limiter_stats(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Current limit, requests in flight and queued, and rejected requests for the host of
+        `url`, or None without adaptive concurrency
+        """
+        limiter = self._limiter_for(url)
+        return limiter.as_dict() if limiter is not None else None
+
+    def _limiter_for(self, url: str) -> Optional[AdaptiveLimiter]:
+        if self._limiter is None:
+            return None
+
+        host = urlparse(url).netloc
+        if host not in self._limiters:
+            self._limiters[host] = self._limiter()
+        return self._limiters[host]
+
+    @staticmethod
+    def _overloaded(url: str, id: str = "0") -> RpcResponse:
+        logger.warning("Timed out queueing for a request slot to %s", url)
+        message = "Too many requests in flight to {}".format(urlparse(url).netloc)
+        return HttpClient._error_response(ERR_OVERLOADED, message, id)
+
+    @staticmethod
+    def _error_response(code: int, message: str, id: str = "0") -> RpcResponse:
+        return RpcResponse(
+            {
+                "result": None,
+                "error": RpcError({"code": code, "message": message}),
+                "id": id,
+                "jsonrpc": "2.0",
+            }
+        )
 
     def set_digest_auth(self, user: str, passwd: str):
-        self._auth = httpx.DigestAuth(user, passwd)
+        self._credentials = (user, passwd)
+        self._auths = {}
+
+    def auth_stats(self) -> Dict[str, int]:
+        stats = {"challenges": 0, "stale": 0, "avoided": 0}
+        for auth in self._auths.values():
+            for key, value in auth.stats().items():
+                stats[key] += value
+        return stats
+
+    def _auth_for(self, url: str) -> Optional[DigestAuth]:
+        # Each wallet-rpc host issues its own nonces, so challenges are cached per host
+        if self._credentials is None:
+            return None
+
+        host = urlparse(url).netloc
+        if host not in self._auths:
+            self._auths[host] = DigestAuth(*self._credentials)
+        return self._auths[host]
+
+    async def close(self):
+        await self._httpx.aclose()
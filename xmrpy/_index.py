@@ -0,0 +1,238 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Local SQLite (WAL) mirror of a wallet's transfers, kept current by TransferSync, so lookups like
+"has this invoice been paid" are answered from disk instead of by wallet-rpc
+"""
+
+import json
+import asyncio
+import sqlite3
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from xmrpy._history import StateStore, TransferDelta, TransferSync, _key
+from xmrpy._result import _FullTransfer
+from xmrpy.t import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transfers (
+    wallet TEXT NOT NULL,
+    key TEXT NOT NULL,
+    txid TEXT NOT NULL,
+    type TEXT NOT NULL,
+    payment_id TEXT NOT NULL,
+    major INTEGER NOT NULL,
+    minor INTEGER NOT NULL,
+    amount INTEGER NOT NULL,
+    fee INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE (wallet, key)
+);
+CREATE INDEX IF NOT EXISTS transfers_txid ON transfers (wallet, txid);
+CREATE INDEX IF NOT EXISTS transfers_payment_id ON transfers (wallet, payment_id);
+CREATE INDEX IF NOT EXISTS transfers_subaddress ON transfers (wallet, major, minor);
+CREATE INDEX IF NOT EXISTS transfers_height ON transfers (wallet, height);
+CREATE INDEX IF NOT EXISTS transfers_timestamp ON transfers (wallet, timestamp);
+CREATE TABLE IF NOT EXISTS sync_state (
+    wallet TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+"""
+
+_UPSERT = "INSERT OR REPLACE INTO transfers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+
+class TransferIndex(StateStore):
+    """
+    Mirrors `wallet`'s _FullTransfer records into the SQLite database at `path`, indexed by txid,
+    payment ID, subaddress, height and timestamp. `refresh()` (or `watch()`) applies each
+    TransferSync delta and the sync cursor in one transaction; the query helpers run on the
+    index's own thread and return _FullTransfer objects.
+
+        index = wallet.transfer_index("transfers.db")
+        await index.refresh()
+        paid = await index.received(payment_id=invoice.payment_id) >= invoice.amount
+
+    Every account is indexed unless `account_index` picks one (see TransferSync). Pending and pool
+    transfers are indexed as well (with height 0); `confirmations` is as of the last time a
+    transfer changed, so compare `height` with the wallet's height instead. A `path` of ":memory:"
+    keeps the index in memory for the life of the TransferIndex, as its one connection is only
+    ever used from the index's thread.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        wallet: Any,
+        key: Optional[str] = None,
+        reorg_window: int = 10,
+        account_index: Optional[int] = None,
+    ):
+        self.path = path
+        self._sync = TransferSync(wallet, store=self, key=key, reorg_window=reorg_window, account_index=account_index)
+        # One thread owns the connection, so calls are serialized without further locking
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="xmrpy-index")
+        self._db: Optional[sqlite3.Connection] = None
+
+    async def wallet_key(self) -> str:
+        return await self._sync.wallet_key()
+
+    async def refresh(self) -> TransferDelta:
+        """
+        Poll the wallet once and apply what changed
+        """
+        delta = await self._sync.poll(commit=False)
+        await self._run(self._apply, await self.wallet_key(), delta)
+        return delta
+
+    async def watch(self, interval: float = 30.0) -> AsyncIterator[TransferDelta]:
+        while True:
+            delta = await self.refresh()
+            if delta:
+                yield delta
+            await asyncio.sleep(interval)
+
+    async def by_txid(self, txid: str) -> List[_FullTransfer]:
+        return await self._select("txid = ?", (txid,))
+
+    async def by_payment_id(self, payment_id: str) -> List[_FullTransfer]:
+        return await self._select("payment_id = ?", (payment_id,))
+
+    async def by_subaddress(self, major: int, minor: Optional[int] = None) -> List[_FullTransfer]:
+        if minor is None:
+            return await self._select("major = ?", (major,))
+        return await self._select("major = ? AND minor = ?", (major, minor))
+
+    async def between(
+        self, min_height: Optional[int] = None, max_height: Optional[int] = None, by: str = "height"
+    ) -> List[_FullTransfer]:
+        """
+        Transfers with `by` ("height" or "timestamp") in [min_height, max_height]
+        """
+        if by not in ("height", "timestamp"):
+            raise ValueError("Can only range over height or timestamp, not {}".format(by))
+        low = 0 if min_height is None else min_height
+        high = (1 << 63) - 1 if max_height is None else max_height
+        return await self._select("{0} BETWEEN ? AND ? ORDER BY {0}".format(by), (low, high))
+
+    async def received(
+        self,
+        payment_id: Optional[str] = None,
+        major: Optional[int] = None,
+        minor: Optional[int] = None,
+        min_height: int = 1,
+    ) -> int:
+        """
+        Total incoming amount confirmed at `min_height` or above (0 counts the pool too), for a
+        payment ID and/or subaddress
+        """
+        # Pool transfers have height 0
+        where = ["type IN ('in', 'pool')", "height >= ?"]
+        args: List[Any] = [min_height]
+        for column, value in (("payment_id", payment_id), ("major", major), ("minor", minor)):
+            if value is not None:
+                where.append("{} = ?".format(column))
+                args.append(value)
+        sql = "SELECT COALESCE(SUM(amount), 0) FROM transfers WHERE wallet = ? AND " + " AND ".join(where)
+        return await self._run(self._scalar, sql, (await self.wallet_key(), *args))
+
+    async def count(self) -> int:
+        sql = "SELECT COUNT(*) FROM transfers WHERE wallet = ?"
+        return await self._run(self._scalar, sql, (await self.wallet_key(),))
+
+    async def load(self, key: str) -> Optional[Dict[str, Any]]:
+        state = await self._run(self._scalar, "SELECT state FROM sync_state WHERE wallet = ?", (key,))
+        return None if state is None else json.loads(state)
+
+    async def save(self, key: str, state: Dict[str, Any]):
+        await self._run(self._save_state, key, state)
+
+    async def close(self):
+        await self._run(self._close)
+        self._executor.shutdown(wait=False)
+
+    async def _select(self, where: str, args: Tuple[Any, ...]) -> List[_FullTransfer]:
+        sql = "SELECT data FROM transfers WHERE wallet = ? AND " + where
+        rows = await self._run(self._fetch, sql, (await self.wallet_key(), *args))
+        return [_FullTransfer(json.loads(data)) for (data,) in rows]
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args))
+
+    # Everything below runs on the index thread
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(_SCHEMA)
+            self._db = db
+        return self._db
+
+    def _fetch(self, sql: str, args: Tuple[Any, ...]) -> List[Tuple[Any, ...]]:
+        return self._connect().execute(sql, args).fetchall()
+
+    def _scalar(self, sql: str, args: Tuple[Any, ...]) -> Any:
+        row = self._connect().execute(sql, args).fetchone()
+        return None if row is None else row[0]
+
+    def _save_state(self, key: str, state: Dict[str, Any]):
+        self._connect().execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (key, json.dumps(state)))
+
+    def _apply(self, wallet: str, delta: TransferDelta):
+        db = self._connect()
+        db.execute("BEGIN")
+        try:
+            gone = [(wallet, _key(t)) for t in delta.reorged + delta.dropped]
+            db.executemany("DELETE FROM transfers WHERE wallet = ? AND key = ?", gone)
+            changed = delta.added + delta.confirmed + delta.pending + delta.failed
+            db.executemany(_UPSERT, [_row(wallet, t) for t in changed])
+            self._save_state(wallet, delta.state)
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _close(self):
+        if self._db is not None:
+            self._db.execute("PRAGMA optimize")
+            self._db.close()
+            self._db = None
+
+
+def _row(wallet: str, transfer: _FullTransfer) -> Tuple[Any, ...]:
+    index = getattr(transfer, "subaddr_index", None)
+    return (
+        wallet,
+        _key(transfer),
+        getattr(transfer, "txid", ""),
+        getattr(transfer, "type", ""),
+        getattr(transfer, "payment_id", ""),
+        getattr(index, "major", 0),
+        getattr(index, "minor", 0),
+        getattr(transfer, "amount", 0),
+        getattr(transfer, "fee", 0),
+        getattr(transfer, "height", 0),
+        getattr(transfer, "timestamp", 0),
+        json.dumps(transfer.as_dict()),
+    )
@@ -0,0 +1,183 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import time
+import asyncio
+from collections import deque
+from xmrpy._logger import logger
+from xmrpy.t import Any, Deque, Dict, List, Optional, Priority, Tuple
+
+_Waiter = Tuple[float, "asyncio.Future[None]"]
+
+
+class AdaptiveLimiter:
+    """
+    Caps the requests in flight to one wallet-rpc and adapts the cap to the latency it
+    observes, Vegas style: while latency stays near the best seen so far the limit grows by
+    one, once calls start queueing inside the wallet it shrinks by one, and a timeout or
+    5xx cuts it multiplicatively (AIMD). Calls over the limit wait for at most
+    `queue_timeout` seconds, served by Priority and then in FIFO order; a call that has
+    waited `aging` seconds goes ahead of newer higher priority ones so background work
+    isn't starved
+    """
+
+    def __init__(
+        self,
+        initial: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        queue_timeout: float = 10.0,
+        max_queue: int = 1000,
+        alpha: float = 3.0,
+        beta: float = 6.0,
+        backoff: float = 0.9,
+        probe_interval: int = 1000,
+        aging: float = 1.0,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self.alpha = alpha
+        self.beta = beta
+        self.backoff = backoff
+        self.probe_interval = probe_interval
+        self.aging = aging
+
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self._min_rtt: Optional[float] = None
+        self._samples = 0
+        self._waiters: List[Deque[_Waiter]] = [deque() for _ in Priority]
+
+        self.inflight = 0
+        self.rejected = 0
+
+    @classmethod
+    def fixed(cls, limit: int, **kwargs: Any) -> "AdaptiveLimiter":
+        """
+        A limiter that never adapts: `limit` slots, handed out by Priority like the adaptive one
+        """
+        return cls(initial=limit, min_limit=limit, max_limit=limit, **kwargs)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters)
+
+    async def acquire(self, priority: Priority = Priority.NORMAL) -> bool:
+        """
+        Take a slot, waiting in line if the limit is reached. Returns False if the queue is
+        full or no slot freed up within `queue_timeout`
+        """
+        queued = self.queued
+        if self.inflight < self.limit and not queued:
+            self.inflight += 1
+            return True
+
+        if queued >= self.max_queue:
+            self.rejected += 1
+            return False
+
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        entry = (time.monotonic(), waiter)
+        self._waiters[priority].append(entry)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            self._abandon(priority, entry)
+            raise
+
+        if waiter.done():
+            return True
+        self._abandon(priority, entry)
+        self.rejected += 1
+        return False
+
+    def release(self, latency: Optional[float] = None, dropped: bool = False):
+        """
+        Give the slot back. `latency` of a completed call, or `dropped` for a timeout or
+        overloaded response, adjusts the limit; release() alone (e.g. on cancellation) doesn't
+        """
+        self.inflight -= 1
+        if dropped:
+            self._limit = max(self.min_limit, self._limit * self.backoff)
+            logger.debug("Concurrency limit backed off to %s", self.limit)
+        elif latency is not None:
+            self._observe(latency)
+        self._wake()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "inflight": self.inflight,
+            "queued": self.queued,
+            "queued_by_priority": {level.name.lower(): len(self._waiters[level]) for level in Priority},
+            "rejected": self.rejected,
+            "min_rtt": self._min_rtt,
+        }
+
+    def _observe(self, rtt: float):
+        self._samples += 1
+        if self._min_rtt is None or rtt < self._min_rtt or self._samples % self.probe_interval == 0:
+            # Re-baselining now and then lets the limit follow a wallet that got slower for good
+            self._min_rtt = rtt
+
+        # Estimated number of our requests queued inside the wallet rather than being served
+        queue = self._limit * (1 - self._min_rtt / rtt) if rtt > 0 else 0.0
+        if queue < self.alpha:
+            # Only grow while the limit is actually being used, or an idle client creeps to max
+            if self.inflight + 1 >= self._limit / 2:
+                self._limit = min(self.max_limit, self._limit + 1)
+        elif queue > self.beta:
+            self._limit = max(self.min_limit, self._limit - 1)
+
+    def _wake(self):
+        while self.inflight < self.limit:
+            entry = self._next()
+            if entry is None:
+                return
+
+            waiter = entry[1]
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+
+    def _next(self) -> Optional[_Waiter]:
+        heads = [waiters for waiters in self._waiters if waiters]
+        if not heads:
+            return None
+
+        # Among calls that waited past `aging`, the oldest goes first; otherwise highest priority
+        deadline = time.monotonic() - self.aging
+        aged = [waiters for waiters in heads if waiters[0][0] <= deadline]
+        if aged:
+            return min(aged, key=lambda waiters: waiters[0][0]).popleft()
+        return heads[0].popleft()
+
+    def _abandon(self, priority: Priority, entry: _Waiter):
+        if entry[1].done():
+            # The slot was handed over, but the caller gave up on it
+            self.release()
+        else:
+            entry[1].cancel()
+            self._waiters[priority].remove(entry)
@@ -15,22 +15,105 @@
 # IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
 # USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+
+import time
+import queue
+import atexit
 import logging
-from xmrpy._config import config
+import logging.handlers
+from xmrpy._config import Config
+from xmrpy._utils import derive_bool
+from xmrpy.t import Any, Optional
 
 LOG_FORMAT = "[%(asctime)s] %(levelname)s PID:%(process)s %(module)s L%(lineno)s - %(message)s"
 
-logging.basicConfig(
-    level=config.LOG_LEVEL,
-    filename=config.LOG_FILE,
-    format=LOG_FORMAT,
-    datefmt="%Y/%m/%d %H:%M:%S",
-)
 
+class RateLimitedLogger:
+    """
+    Lets at most `rate` lines a second through to `logger` (token bucket, bursts of up to
+    `rate`), for lines logged on every request; the next line let through reports how many
+    were dropped. A `rate` of 0 lets everything through
+    """
+
+    def __init__(self, logger: logging.Logger, rate: float):
+        self._logger = logger
+        self.rate = rate
+        self._tokens = rate
+        self._last = time.monotonic()
+        self.suppressed = 0
+
+    def debug(self, msg: str, *args: Any):
+        self.log(logging.DEBUG, msg, *args)
+
+    def info(self, msg: str, *args: Any):
+        self.log(logging.INFO, msg, *args)
+
+    def log(self, level: int, msg: str, *args: Any):
+        # Checked first so a disabled level costs neither a token nor a LogRecord
+        if not self._logger.isEnabledFor(level):
+            return
+
+        if self.rate > 0:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens < 1:
+                self.suppressed += 1
+                return
+            self._tokens -= 1
+
+        if self.suppressed:
+            msg += " (%s similar lines suppressed)"
+            args += (self.suppressed,)
+            self.suppressed = 0
+        # stacklevel=3 attributes the line to our caller rather than to this wrapper
+        self._logger.log(level, msg, *args, stacklevel=3)
 
-console = logging.StreamHandler()
-console.setLevel(config.LOG_LEVEL)
-console.setFormatter(logging.Formatter(LOG_FORMAT))
 
 logger = logging.getLogger("xmrpy")
-logger.addHandler(console)
+hot = RateLimitedLogger(logger, 10.0)
+listener: Optional[logging.handlers.QueueListener] = None
+_configured = False
+
+
+def setup_logging(conf: Config):
+    """
+    Install the log handlers `conf` asks for. Runs once, when the first Wallet is built, so
+    importing xmrpy neither touches the root logger nor creates the log file
+    """
+    global listener, _configured
+    if _configured:
+        return
+    _configured = True
+
+    console = logging.StreamHandler()
+    console.setLevel(conf.LOG_LEVEL)
+    console.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    if derive_bool(conf.LOG_ASYNC):
+        # Records are queued on the calling thread and written by a listener thread, so file and
+        # console I/O never block the event loop
+        file_handler = logging.FileHandler(conf.LOG_FILE)
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt="%Y/%m/%d %H:%M:%S"))
+        console.addFilter(logging.Filter("xmrpy"))
+
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        enqueue = logging.handlers.QueueHandler(records)  # type: ignore
+        enqueue.setFormatter(logging.Formatter())
+        logging.basicConfig(level=conf.LOG_LEVEL, handlers=[enqueue])
+
+        listener = logging.handlers.QueueListener(
+            records, file_handler, console, respect_handler_level=True  # type: ignore
+        )
+        listener.start()
+        atexit.register(listener.stop)
+    else:
+        logging.basicConfig(
+            level=conf.LOG_LEVEL,
+            filename=conf.LOG_FILE,
+            format=LOG_FORMAT,
+            datefmt="%Y/%m/%d %H:%M:%S",
+        )
+        logger.addHandler(console)
+
+    hot.rate = hot._tokens = float(conf.LOG_HOT_PATH_RATE)
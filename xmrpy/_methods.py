@@ -0,0 +1,169 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from xmrpy.t import Priority
+
+# Methods that only read wallet state a view-only copy of the wallet can answer, and so can
+# be served by any replica (and are safe to retry, coalesce or cache)
+READ_ONLY_METHODS = frozenset(
+    [
+        "check_reserve_proof",
+        "check_spend_proof",
+        "check_tx_key",
+        "check_tx_proof",
+        "get_accounts",
+        "get_address",
+        "get_address_index",
+        "get_balance",
+        "get_bulk_payments",
+        "get_height",
+        "get_languages",
+        "get_payments",
+        "get_transfer_by_txid",
+        "get_transfers",
+        "get_version",
+        "incoming_transfers",
+        "is_multisig",
+        "make_integrated_address",
+        "make_uri",
+        "parse_uri",
+        "split_integrated_address",
+        "validate_address",
+        "verify",
+    ]
+)
+
+# Methods that can be sent again without changing the outcome, and so are retried on failure
+IDEMPOTENT_METHODS = READ_ONLY_METHODS | frozenset(
+    [
+        "auto_refresh",
+        "export_key_images",
+        "export_outputs",
+        "get_account_tags",
+        "get_address_book",
+        "get_attribute",
+        "get_reserve_proof",
+        "get_spend_proof",
+        "get_tx_key",
+        "get_tx_notes",
+        "get_tx_proof",
+        "label_account",
+        "label_address",
+        "query_key",
+        "set_account_tag_description",
+        "set_attribute",
+        "set_tx_notes",
+        "sign",
+        "store",
+    ]
+)
+
+# Seconds a successful response may be served from the response cache
+CACHE_TTLS = {
+    "get_accounts": 30.0,
+    "get_address_index": 3600.0,
+    "get_attribute": 300.0,
+    "get_balance": 30.0,
+    "get_bulk_payments": 30.0,
+    "get_languages": 86400.0,
+    "get_payments": 30.0,
+    "get_transfer_by_txid": 30.0,
+    "get_transfers": 30.0,
+    "get_version": 86400.0,
+    "incoming_transfers": 30.0,
+    "query_key": 86400.0,
+}
+
+# Cached responses that go stale when a new block arrives or the wallet spends
+BALANCE_METHODS = frozenset(
+    [
+        "get_accounts",
+        "get_balance",
+        "get_bulk_payments",
+        "get_payments",
+        "get_transfer_by_txid",
+        "get_transfers",
+        "incoming_transfers",
+    ]
+)
+
+# Cached responses each write invalidates; None means everything (a different wallet was opened)
+INVALIDATES = {
+    "close_wallet": None,
+    "create_account": frozenset(["get_accounts"]),
+    "create_wallet": None,
+    "generate_from_keys": None,
+    "label_account": frozenset(["get_accounts"]),
+    "open_wallet": None,
+    "relay_tx": BALANCE_METHODS,
+    "rescan_blockchain": BALANCE_METHODS,
+    "rescan_spent": BALANCE_METHODS,
+    "restore_deterministic_wallet": None,
+    "set_attribute": frozenset(["get_attribute"]),
+    "submit_multisig": BALANCE_METHODS,
+    "submit_transfer": BALANCE_METHODS,
+    "sweep_all": BALANCE_METHODS,
+    "sweep_dust": BALANCE_METHODS,
+    "sweep_single": BALANCE_METHODS,
+    "transfer": BALANCE_METHODS,
+    "transfer_split": BALANCE_METHODS,
+}
+
+# Scheduling class of each method when requests queue for a wallet-rpc; the rest are NORMAL
+PRIORITIES = {
+    "get_address": Priority.INTERACTIVE,
+    "get_balance": Priority.INTERACTIVE,
+    "make_integrated_address": Priority.INTERACTIVE,
+    "relay_tx": Priority.INTERACTIVE,
+    "submit_transfer": Priority.INTERACTIVE,
+    "sweep_all": Priority.INTERACTIVE,
+    "sweep_single": Priority.INTERACTIVE,
+    "transfer": Priority.INTERACTIVE,
+    "transfer_split": Priority.INTERACTIVE,
+    "validate_address": Priority.INTERACTIVE,
+    "export_key_images": Priority.BACKGROUND,
+    "export_outputs": Priority.BACKGROUND,
+    "get_bulk_payments": Priority.BACKGROUND,
+    "get_transfers": Priority.BACKGROUND,
+    "import_key_images": Priority.BACKGROUND,
+    "import_outputs": Priority.BACKGROUND,
+    "incoming_transfers": Priority.BACKGROUND,
+    "refresh": Priority.BACKGROUND,
+    "rescan_blockchain": Priority.BACKGROUND,
+    "rescan_spent": Priority.BACKGROUND,
+}
+
+# Default seconds slow calls may take. They only ever loosen Config.HTTP_READ_TIMEOUT (an entry
+# tighter than it is ignored); tightening a method is left to Config.METHOD_TIMEOUTS
+TIMEOUTS = {
+    "create_wallet": 60.0,
+    "export_key_images": 120.0,
+    "export_outputs": 120.0,
+    "generate_from_keys": 600.0,
+    "get_transfers": 120.0,
+    "import_key_images": 300.0,
+    "import_outputs": 300.0,
+    "incoming_transfers": 120.0,
+    "open_wallet": 60.0,
+    "refresh": 600.0,
+    "rescan_blockchain": 1800.0,
+    "rescan_spent": 600.0,
+    "restore_deterministic_wallet": 600.0,
+    "sweep_all": 60.0,
+    "transfer": 60.0,
+    "transfer_split": 60.0,
+}
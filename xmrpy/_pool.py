@@ -0,0 +1,164 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import time
+import zlib
+import random
+import asyncio
+import contextlib
+from xmrpy._logger import logger
+from xmrpy._methods import READ_ONLY_METHODS
+from xmrpy._result import GetVersionResult
+from xmrpy._retry import CircuitBreaker
+from xmrpy.t import Any, Dict, List, Optional, Iterator, Callable
+
+_EWMA_WEIGHT = 0.3
+
+UNIX_SCHEME = "unix://"
+
+
+class Endpoint:
+    def __init__(self, addr: str, breaker: Optional[CircuitBreaker] = None):
+        self.addr = addr
+        self.uds: Optional[str] = None
+        host = addr
+        if addr.startswith(UNIX_SCHEME):
+            # unix:///path/to/socket - requests go over the socket, addressed to a host name
+            # unique to it so HttpClient can mount a UDS transport for just that endpoint
+            self.uds = addr[len(UNIX_SCHEME) :]
+            host = "uds-{:08x}".format(zlib.crc32(self.uds.encode()))
+        self.origin = "http://" + host
+        self.url = self.origin + "/json_rpc"
+        self.breaker = breaker or CircuitBreaker()
+        self.healthy = True
+        self.outstanding = 0
+        self.latency: Optional[float] = None
+
+    def observe(self, elapsed: float):
+        if self.latency is None:
+            self.latency = elapsed
+        else:
+            self.latency = _EWMA_WEIGHT * elapsed + (1 - _EWMA_WEIGHT) * self.latency
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "addr": self.addr,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "latency": self.latency,
+            "breaker": self.breaker.as_dict(),
+        }
+
+
+class EndpointPool:
+    """
+    A primary wallet-rpc plus read-only replicas. Writes always go to the primary; reads
+    (see READ_ONLY_METHODS) are spread over healthy replicas by `strategy`:
+
+        least_outstanding - fewest in-flight requests
+        latency           - lowest EWMA latency weighted by in-flight requests
+    """
+
+    strategies = ("least_outstanding", "latency")
+
+    def __init__(
+        self,
+        primary: str,
+        replicas: Optional[List[str]] = None,
+        strategy: str = "least_outstanding",
+        breaker: Callable[[], CircuitBreaker] = CircuitBreaker,
+    ):
+        if strategy not in EndpointPool.strategies:
+            raise ValueError("Unrecognized load balancing strategy: {}.".format(strategy))
+
+        self.primary = Endpoint(primary, breaker())
+        self.replicas = [Endpoint(addr, breaker()) for addr in replicas or []]
+        self._strategy = strategy
+        self._health_task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def endpoints(self) -> List[Endpoint]:
+        return [self.primary] + self.replicas
+
+    def sockets(self) -> Dict[str, str]:
+        return {endpoint.origin: endpoint.uds for endpoint in self.endpoints if endpoint.uds is not None}
+
+    def select(self, method: Optional[str]) -> Endpoint:
+        if method not in READ_ONLY_METHODS:
+            return self.primary
+
+        healthy = [endpoint for endpoint in self.replicas if endpoint.healthy and endpoint.breaker.available()]
+        if not healthy:
+            return self.primary
+
+        random.shuffle(healthy)
+        if self._strategy == "latency":
+            return min(healthy, key=lambda e: (e.latency or 0.0) * (e.outstanding + 1))
+        return min(healthy, key=lambda e: e.outstanding)
+
+    @contextlib.contextmanager
+    def track(self, endpoint: Endpoint) -> Iterator[None]:
+        endpoint.outstanding += 1
+        start = time.monotonic()
+        # Failures are left to the endpoint's circuit breaker, which re-admits it after its reset
+        # timeout; `healthy` is only the health check's verdict
+        try:
+            yield
+            endpoint.observe(time.monotonic() - start)
+        finally:
+            endpoint.outstanding -= 1
+
+    async def probe(self, http: Any):
+        async def check(endpoint: Endpoint):
+            start = time.monotonic()
+            try:
+                response = await http.post(endpoint.url, data=_VERSION_PROBE, ResultClass=GetVersionResult)
+                healthy = not response.is_err()
+            except Exception as err:  # pylint: disable=broad-except
+                logger.warning("Health check for %s failed: %s", endpoint.addr, err)
+                healthy = False
+
+            if healthy:
+                endpoint.observe(time.monotonic() - start)
+            if healthy != endpoint.healthy:
+                logger.info("Endpoint %s is now %s", endpoint.addr, "healthy" if healthy else "unhealthy")
+            endpoint.healthy = healthy
+
+        await asyncio.gather(*[check(endpoint) for endpoint in self.replicas])
+
+    def start_health_checks(self, http: Any, interval: float):
+        if self._health_task is not None or not self.replicas:
+            return
+
+        async def loop():
+            while True:
+                await self.probe(http)
+                await asyncio.sleep(interval)
+
+        self._health_task = asyncio.get_running_loop().create_task(loop())
+
+    async def stop_health_checks(self):
+        if self._health_task is None:
+            return
+
+        self._health_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._health_task
+        self._health_task = None
+
+
+_VERSION_PROBE = {"id": "0", "jsonrpc": "2.0", "method": "get_version"}
@@ -0,0 +1,168 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Raw mode (Client.raw): responses whose `result` is left as the bytes the wallet sent, for
+gateways that forward it rather than read it
+"""
+
+import re
+from xmrpy._retry import ERR_INVALID_RESULT
+from xmrpy.t import Any, Dict, RpcError, RpcResponse
+
+_MISSING = object()
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_NOT_STRUCTURE = bytes(byte for byte in range(256) if byte not in b'"\\{}[],')
+_PARENS = bytes.maketrans(b"{[}]", b"(())")
+
+
+class RawResult:
+    """
+    The undecoded `result` of a response. `bytes(result)` (or `serialize()`) is its JSON, ready to
+    forward; `pointer()` decodes it once and returns the member named by a JSON pointer (RFC 6901)
+
+        with wallet.raw():
+            r = await wallet.get_balance()
+        body = bytes(r.result)
+        unlocked = r.result.pointer("/unlocked_balance")
+    """
+
+    __slots__ = ("content", "_codec", "_value")
+
+    def __init__(self, content: bytes, codec: Any):
+        self.content = content
+        self._codec = codec
+        self._value: Any = _MISSING
+
+    def __bytes__(self) -> bytes:
+        return self.content
+
+    def __len__(self) -> int:
+        return len(self.content)
+
+    def __repr__(self) -> str:
+        return "RawResult({} bytes)".format(len(self.content))
+
+    def serialize(self) -> bytes:
+        return self.content
+
+    def loads(self) -> Any:
+        if self._value is _MISSING:
+            self._value = self._codec.loads(self.content)
+        return self._value
+
+    def as_dict(self) -> Dict[str, Any]:
+        value: Dict[str, Any] = self.loads()
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.loads()
+        return value.get(key, default) if isinstance(value, dict) else default
+
+    def pointer(self, path: str, default: Any = _MISSING) -> Any:
+        """
+        The member at `path` ("/per_subaddress/0/balance"; "" is the whole result). A path that
+        doesn't resolve raises KeyError unless a `default` is given
+        """
+        node = self.loads()
+        if not path:
+            return node
+        if not path.startswith("/"):
+            raise ValueError("JSON pointer must start with '/': {!r}".format(path))
+
+        for token in path[1:].split("/"):
+            token = token.replace("~1", "/").replace("~0", "~")
+            try:
+                node = node[int(token)] if isinstance(node, list) else node[token]
+            except (KeyError, IndexError, ValueError, TypeError):
+                if default is _MISSING:
+                    raise KeyError(path) from None
+                return default
+        return node
+
+    def pointer_bytes(self, path: str) -> bytes:
+        """
+        The member at `path` re-encoded as JSON, for forwarding a single field
+        """
+        content: bytes = self._codec.dumps(self.pointer(path))
+        return content
+
+
+def decode_raw(content: bytes, codec: Any) -> RpcResponse:
+    """
+    Check a response body's envelope and slice its `result` out without decoding it
+
+    wallet-rpc writes "id" and "jsonrpc" ahead of "result", so the result runs from after its key
+    to the closing brace and only the short head is parsed. Error replies, and bodies laid out any
+    other way (members after "result" included), are decoded in full (the result then re-encoded).
+    """
+    start = content.find(b'"result"')
+    if start != -1:
+        head = content[:start].rstrip()
+        if head.startswith(b"{") and head.endswith(b",") and b'"error"' not in head:
+            colon = content.find(b":", start + 8)
+            end = content.rfind(b"}")
+            try:
+                envelope = codec.loads(head[:-1] + b"}")
+            except ValueError:
+                envelope = None
+            if isinstance(envelope, dict) and "jsonrpc" in envelope and "id" in envelope and start < colon < end:
+                result = content[colon + 1 : end].strip()
+                if result and _single_value(result):
+                    envelope.update({"result": RawResult(result, codec), "error": None})
+                    return RpcResponse(envelope)
+
+    try:
+        rjson = codec.loads(content)
+    except ValueError:
+        rjson = None
+    if not isinstance(rjson, dict) or ("result" not in rjson and "error" not in rjson):
+        return RpcResponse(
+            {
+                "result": None,
+                "error": RpcError({"code": ERR_INVALID_RESULT, "message": "Malformed JSON-RPC response"}),
+            }
+        )
+    if rjson.get("error") is None:
+        rjson.update({"result": RawResult(codec.dumps(rjson.get("result")), codec), "error": None})
+    return RpcResponse(rjson)
+
+
+def _single_value(value: bytes) -> bool:
+    """
+    Whether `value` is a single JSON value rather than one followed by more members of the
+    envelope (`{"a":1},"error":null`). Only quotes, brackets and commas are looked at: with the
+    strings dropped, the value is either a scalar (nothing left) or one balanced array or object
+    """
+    structure = value.translate(None, _NOT_STRUCTURE)
+    if b"\\" in structure:
+        # Escapes (rare): find where the strings end properly
+        structure = _STRING.sub(b"", value).translate(None, _NOT_STRUCTURE)
+    else:
+        structure = structure.replace(b'""', b"")
+        if b'"' in structure:
+            # Strings holding brackets or commas
+            structure = b"".join(structure.split(b'"')[::2])
+
+    if not structure:
+        return True
+    if structure[:1] not in b"{[" or structure[-1:] not in b"}]":
+        return False
+    nested = structure[1:-1].translate(_PARENS, b",")
+    while b"()" in nested:
+        nested = nested.replace(b"()", b"")
+    return not nested
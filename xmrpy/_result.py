@@ -16,7 +16,7 @@
 # USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 import enum
-from xmrpy.t import List, Dict, Any, DataClass
+from xmrpy.t import List, DataClass
 
 
 class GetLanguagesResult(DataClass):
@@ -24,18 +24,42 @@ class GetLanguagesResult(DataClass):
     languages_local: List[str]
 
 
-class GetBalanceResult(DataClass):
-    balance = int
-    multisig_import_needed = bool
-    peer_subaddress = List[Dict[str, str]]
-    unlocked_balance = int
-
-
 class _Index(DataClass):
     major: int
     minor: int
 
 
+class _SubaddressBalance(DataClass):
+    account_index: int
+    address: str
+    address_index: int
+    balance: int
+    blocks_to_unlock: int
+    label: str
+    num_unspent_outputs: int
+    unlocked_balance: int
+
+
+class GetBalanceResult(DataClass):
+    balance: int
+    blocks_to_unlock: int
+    multisig_import_needed: bool
+    per_subaddress: List[_SubaddressBalance]
+    unlocked_balance: int
+
+
+class _Subaddress(DataClass):
+    address: str
+    address_index: int
+    label: str
+    used: bool
+
+
+class GetAddressResult(DataClass):
+    address: str
+    addresses: List[_Subaddress]
+
+
 class GetAddressIndexResult(DataClass):
     index: _Index
 
@@ -56,7 +80,7 @@ class ValidateAddressResult(DataClass):
     integrated: bool
     subaddress: bool
     nettype: str
-    openalias_address: bool
+    openalias_address: str
 
 
 class _SubaddressAccount(DataClass):
@@ -64,7 +88,7 @@ class _SubaddressAccount(DataClass):
     balance: int
     base_address: str
     label: str
-    unlocked_balance: str
+    unlocked_balance: int
 
 
 class GetAccountsResult(DataClass):
@@ -82,7 +106,7 @@ class LabelAccountResult(DataClass):
     pass
 
 
-class _AccountTag:
+class _AccountTag(DataClass):
     tag: str
     label: str
     accounts: List[int]
@@ -111,7 +135,7 @@ class GetHeightResult(DataClass):
 class TransferResult(DataClass):
     amount: int
     fee: int
-    multisig_txset: List[Any]
+    multisig_txset: str
     tx_blob: str
     tx_hash: str
     tx_key: str
@@ -126,8 +150,8 @@ class TransferSplitResult(DataClass):
     fee_list: List[int]
     tx_blob_list: List[str]
     tx_metadata_list: List[str]
-    multisig_txset: List[str]
-    unsigned_txset: List[str]
+    multisig_txset: str
+    unsigned_txset: str
 
 
 class SignTransferResult(DataClass):
@@ -186,7 +210,7 @@ class _Payment(DataClass):
     amount: int
     block_height: int
     unlock_time: int
-    subaddr_index: List[Dict[str, str]]
+    subaddr_index: _Index
     address: str
 
 
@@ -203,7 +227,7 @@ class _Transfer(DataClass):
     global_index: int
     key_image: str
     spent: bool
-    subaddr_index: int
+    subaddr_index: _Index
     tx_hash: str
     tx_size: int
 
@@ -258,7 +282,7 @@ class GetTxKeyResult(DataClass):
 class CheckTxKeyResult(DataClass):
     confirmations: int
     in_pool: bool
-    recevied: bool
+    received: int
 
 
 class GetTxProofResult(DataClass):
@@ -290,7 +314,7 @@ class CheckReserveProofResult(DataClass):
     total: int
 
 
-_SubaddrIndex = Dict[str, int]
+_SubaddrIndex = _Index
 
 
 class _FullTransfer(DataClass):
@@ -311,20 +335,16 @@ class _FullTransfer(DataClass):
 
 
 class GetTransfersResult(DataClass):
-    # in: List[_FullTransfer]
+    in_: List[_FullTransfer]
     out: List[_FullTransfer]
     pending: List[_FullTransfer]
     failed: List[_FullTransfer]
     pool: List[_FullTransfer]
 
-    @property
-    def in_(self) -> List[_FullTransfer]:
-        t: List[_FullTransfer] = self.__dict__["in"]
-        return t
-
 
 class GetTransferByTxId(DataClass):
-    tranfer: _FullTransfer
+    transfer: _FullTransfer
+    transfers: List[_FullTransfer]
 
 
 class SignResult(DataClass):
@@ -380,7 +400,7 @@ class ParseUriResult(DataClass):
 
 class _AddressBookEntry(DataClass):
     address: str
-    descrpition: str
+    description: str
     index: int
     payment_id: str
 
@@ -491,7 +511,7 @@ class SignMultisigResult(DataClass):
 
 
 class SubmitMultisigResult(DataClass):
-    tx_hash_list: str
+    tx_hash_list: List[str]
 
 
 class Result(enum.Enum):
@@ -510,11 +530,12 @@ class Result(enum.Enum):
     EditAddressBook = EditAddressBookResult
     ExportKeyImages = ExportKeyImagesResult
     ExportMultisigInfo = ExportMultisigInfoResult
-    ExportOutputs = GetAccountsResult
+    ExportOutputs = ExportOutputsResult
     FinalizeMultisig = FinalizeMultisigResult
     GenerateFromKeys = GenerateFromKeysResult
     GetAccounts = GetAccountsResult
     GetAccountTags = GetAccountTagsResult
+    GetAddress = GetAddressResult
     GetAddressBook = GetAddressBookResult
     GetAddressIndex = GetAddressIndexResult
     GetAttribute = GetAttributeResult
@@ -525,7 +546,7 @@ class Result(enum.Enum):
     GetPayments = GetPaymentsResult
     GetReserveProof = GetReserveProofResult
     GetSpendProof = GetSpendProofResult
-    GetTransferByTxId = GetTransfersResult
+    GetTransferByTxId = GetTransferByTxId
     GetTransfers = GetTransfersResult
     GetTxKey = GetTxKeyResult
     GetTxNotes = GetTxNotesResult
@@ -533,7 +554,7 @@ class Result(enum.Enum):
     GetVersion = GetVersionResult
     ImportKeyImages = ImportKeyImagesResult
     ImportMultisigInfo = ImportMultisigInfoResult
-    ImportOutputs = IncomingTransfersResult
+    ImportOutputs = ImportOutputsResult
     IncomingTransfers = IncomingTransfersResult
     IsMultisig = IsMultisigResult
     LabelAccount = LabelAccountResult
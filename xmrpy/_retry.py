@@ -0,0 +1,99 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import time
+import random
+from xmrpy._logger import logger
+from xmrpy.t import Any, Dict, Optional
+
+# JSON-RPC implementation-defined server error codes for failures raised on the client side
+ERR_TRANSPORT = -32001
+ERR_CIRCUIT_OPEN = -32002
+ERR_OVERLOADED = -32003
+ERR_DEADLINE = -32004
+ERR_INVALID_RESULT = -32005
+
+
+class RetryPolicy:
+    def __init__(self, attempts: int = 3, backoff_base: float = 0.1, backoff_max: float = 2.0):
+        self.attempts = max(1, attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def delay(self, attempt: int) -> float:
+        # "Full jitter": uniformly random up to the capped exponential backoff
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and fails calls fast for `reset_timeout`
+    seconds, then lets a single trial call through (half-open) to decide whether to close
+    again or re-open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CircuitBreaker.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return CircuitBreaker.HALF_OPEN
+        return CircuitBreaker.OPEN
+
+    def available(self) -> bool:
+        state = self.state
+        return state == CircuitBreaker.CLOSED or (state == CircuitBreaker.HALF_OPEN and not self._trial)
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == CircuitBreaker.CLOSED:
+            return True
+        if state == CircuitBreaker.HALF_OPEN and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def success(self):
+        self.failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def release(self):
+        # The call was abandoned (e.g. cancelled) without telling us anything about the endpoint
+        self._trial = False
+
+    def failure(self):
+        self.failures += 1
+        if self._trial or self.failures >= self.threshold:
+            if self._opened_at is None or self._trial:
+                logger.warning("Circuit breaker opened after %s consecutive failures", self.failures)
+            self._opened_at = time.monotonic()
+        self._trial = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"state": self.state, "failures": self.failures}
@@ -0,0 +1,177 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import codecs
+from xmrpy.t import Any, Callable, Dict, List, Optional, Tuple, FrozenSet
+
+_WHITESPACE = " \t\n\r"
+# Characters a number can continue with
+_NUMBER = "0123456789.eE+-"
+_TRIM_AT = 1 << 16
+
+
+class _NeedMore(Exception):
+    pass
+
+
+class ArrayStream:
+    """
+    Incremental parser for a JSON-RPC response body of the form
+
+        {"id": ..., "jsonrpc": ..., "result": {"<key>": [<item>, ...], ...}}
+
+    Bytes are fed in as they arrive and every item of the arrays named in `keys` is returned
+    as soon as it is complete, so only the item being parsed is ever buffered. Other members
+    of `result` are kept in `extras`, and a non-null `error` member is kept in `error`.
+    """
+
+    def __init__(self, keys: FrozenSet[str]):
+        self._keys = keys
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        # Each state consumes one step of the body, returning an array item when it completes one
+        self._state: Callable[[], Optional[Tuple[str, Any]]] = self._top_start
+        self._key = ""
+
+        self.extras: Dict[str, Any] = {}
+        self.error: Optional[Dict[str, Any]] = None
+
+    def feed(self, chunk: bytes) -> List[Tuple[str, Any]]:
+        self._buf += self._utf8.decode(chunk)
+        return self._drain()
+
+    def close(self) -> List[Tuple[str, Any]]:
+        self._buf += self._utf8.decode(b"", final=True)
+        self._eof = True
+        items = self._drain()
+        if self._state != self._done and self.error is None:
+            raise ValueError("Truncated JSON-RPC response")
+        return items
+
+    def _drain(self) -> List[Tuple[str, Any]]:
+        items: List[Tuple[str, Any]] = []
+        try:
+            while self._state != self._done and self.error is None:
+                item = self._state()
+                if item is not None:
+                    items.append(item)
+        except _NeedMore:
+            pass
+
+        if self._pos > _TRIM_AT:
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+        return items
+
+    def _skip_ws(self, pos: int) -> int:
+        buf = self._buf
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        if pos == len(buf):
+            raise _NeedMore
+        return pos
+
+    def _value(self, pos: int) -> Tuple[Any, int]:
+        try:
+            value, end = self._decoder.raw_decode(self._buf, pos)
+        except json.JSONDecodeError:
+            if self._eof:
+                raise
+            raise _NeedMore
+        # A number or literal running up to the end of the buffer may still be incomplete, including
+        # one that only parsed short because the buffer ends inside its fraction or exponent ("-1.5e")
+        buf = self._buf
+        if not self._eof and buf[end - 1] not in '}]"':
+            tail = end
+            while tail < len(buf) and buf[tail] in _NUMBER:
+                tail += 1
+            if tail == len(buf):
+                raise _NeedMore
+        return value, end
+
+    def _member(self, pos: int) -> Tuple[Optional[str], int]:
+        pos = self._skip_ws(pos)
+        if self._buf[pos] == ",":
+            pos = self._skip_ws(pos + 1)
+        if self._buf[pos] == "}":
+            return None, pos + 1
+
+        key, pos = self._value(pos)
+        pos = self._skip_ws(pos)
+        if self._buf[pos] != ":":
+            raise ValueError("Expected ':' after key '{}'".format(key))
+        return key, self._skip_ws(pos + 1)
+
+    def _expect(self, char: str) -> None:
+        pos = self._skip_ws(self._pos)
+        if self._buf[pos] != char:
+            raise ValueError("Expected '{}' at offset {}".format(char, pos))
+        self._pos = pos + 1
+
+    def _top_start(self) -> None:
+        self._expect("{")
+        self._state = self._top_member
+
+    def _top_member(self) -> None:
+        key, pos = self._member(self._pos)
+        if key is None:
+            self._pos = pos
+            self._state = self._done
+            return
+
+        if key == "result" and self._buf[pos] == "{":
+            self._pos = pos + 1
+            self._state = self._result_member
+            return
+
+        value, self._pos = self._value(pos)
+        if key == "error" and value is not None:
+            self.error = value
+
+    def _result_member(self) -> None:
+        key, pos = self._member(self._pos)
+        if key is None:
+            self._pos = pos
+            self._state = self._top_member
+            return
+
+        if key in self._keys and self._buf[pos] == "[":
+            self._pos = pos + 1
+            self._key = key
+            self._state = self._array_item
+            return
+
+        self.extras[key], self._pos = self._value(pos)
+
+    def _array_item(self) -> Optional[Tuple[str, Any]]:
+        pos = self._skip_ws(self._pos)
+        if self._buf[pos] == ",":
+            pos = self._skip_ws(pos + 1)
+        if self._buf[pos] == "]":
+            self._pos = pos + 1
+            self._state = self._result_member
+            return None
+
+        value, self._pos = self._value(pos)
+        return self._key, value
+
+    def _done(self) -> None:
+        pass
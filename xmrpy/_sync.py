@@ -0,0 +1,189 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import inspect
+import functools
+import threading
+import concurrent.futures
+from xmrpy._wallet import Batch, Client
+from xmrpy._config import Config
+from xmrpy._http import Headers
+from xmrpy.t import Any, Dict, List, Optional, Callable, Awaitable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+class SyncClient:
+    """
+    Blocking facade over Client for synchronous code (Celery, Django, scripts)
+
+    A single Client and its HttpClient live on one background event loop thread for the life
+    of the SyncClient, so pooled connections are kept between calls. Every method blocks until
+    its coroutine finishes on that loop, and may be called from any number of threads at once.
+
+        wallet = SyncWallet(config).auth()
+        print(wallet.get_height().result.height)
+    """
+
+    def __init__(
+        self,
+        conf: Optional[Config] = None,
+        headers: Optional[Headers] = None,
+        replicas: Optional[List[str]] = None,
+    ):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="xmrpy-loop", daemon=True)
+        self._thread.start()
+
+        async def create() -> Client:
+            # Built on the loop thread so httpx binds its pool to that loop
+            return Client(conf, headers=headers, replicas=replicas)
+
+        self._client = self._run(create())
+
+    def __enter__(self) -> "SyncClient":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # Calls carry the calling thread's context onto the loop, so the contextvar it sets applies
+    priority = staticmethod(Client.priority)
+    deadline = staticmethod(Client.deadline)
+    raw = staticmethod(Client.raw)
+    primary = staticmethod(Client.primary)
+
+    def auth(self) -> "SyncClient":
+        self._apply(self._client.auth)
+        return self
+
+    def auth_stats(self) -> Dict[str, int]:
+        return self._apply(self._client.auth_stats)
+
+    def endpoints(self) -> List[Dict[str, Any]]:
+        return self._apply(self._client.endpoints)
+
+    def coalesce_stats(self) -> Dict[str, int]:
+        return self._apply(self._client.coalesce_stats)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self._apply(self._client.cache_stats)
+
+    def invalidate_cache(self):
+        self._apply(self._client.invalidate_cache)
+
+    def start_health_checks(self, interval: Optional[float] = None):
+        self._apply(self._client.start_health_checks, interval)
+
+    def batch(self, concurrent: bool = True) -> "SyncBatch":
+        """
+        Queue calls and send them as a single JSON-RPC 2.0 batch when the block exits (see
+        Client.batch); each queued call returns a concurrent.futures.Future
+
+            with wallet.batch() as b:
+                balance = b.get_balance(0, [0])
+                height = b.get_height()
+
+            print(balance.result().result.balance, height.result().result.height)
+        """
+        return SyncBatch(self, Batch(self._client, concurrent=concurrent))
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+
+        self._run(self._client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _run(self, coro: Awaitable[T]) -> T:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()  # type: ignore
+
+    def _apply(self, fn: Callable[..., T], *args: Any) -> T:
+        async def call() -> T:
+            return fn(*args)
+
+        return self._run(call())
+
+
+class SyncBatch:
+    def __init__(self, client: SyncClient, batch: Batch):
+        self._client = client
+        self._batch = batch
+
+    def __enter__(self) -> "SyncBatch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._client._run(self._batch.__aexit__(exc_type, exc, tb))
+
+    def flush(self):
+        self._client._run(self._batch.flush())
+
+    def _queue(self, call: Awaitable["asyncio.Future[T]"]) -> "concurrent.futures.Future[T]":
+        future = self._client._run(call)
+
+        async def resolve() -> T:
+            return await future
+
+        return asyncio.run_coroutine_threadsafe(resolve(), self._client._loop)
+
+
+def _queueing(name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(fn)
+    def queue(self: SyncBatch, *args: Any, **kwargs: Any) -> Any:
+        # Helpers that can't be batched raise TypeError right here, on the calling thread
+        return self._queue(getattr(self._batch, name)(*args, **kwargs))
+
+    return queue
+
+
+def _blocking(name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    if inspect.isasyncgenfunction(fn):
+
+        @functools.wraps(fn)
+        def iterate(self: SyncClient, *args: Any, **kwargs: Any) -> Iterator[Any]:
+            agen = getattr(self._client, name)(*args, **kwargs)
+            try:
+                while True:
+                    try:
+                        yield self._run(agen.__anext__())
+                    except StopAsyncIteration:
+                        return
+            finally:
+                self._run(agen.aclose())
+
+        return iterate
+
+    @functools.wraps(fn)
+    def call(self: SyncClient, *args: Any, **kwargs: Any) -> Any:
+        return self._run(getattr(self._client, name)(*args, **kwargs))
+
+    return call
+
+
+for _name, _fn in inspect.getmembers(Client):
+    if not _name.startswith("_") and (inspect.iscoroutinefunction(_fn) or inspect.isasyncgenfunction(_fn)):
+        if _name != "close":
+            _method = _blocking(_name, _fn)
+            _method.__qualname__ = "SyncClient." + _name
+            setattr(SyncClient, _name, _method)
+            _method = _queueing(_name, _fn)
+            _method.__qualname__ = "SyncBatch." + _name
+            setattr(SyncBatch, _name, _method)
@@ -36,22 +36,32 @@ def derive_loglevel(level: str):
     raise ValueError("Unrecognized log level: {}.".format(level))
 
 
-def is_simple_type(value: Any) -> bool:
-    return any(
-        [
-            isinstance(value, bytes),
-            isinstance(value, str),
-            isinstance(value, int),
-            isinstance(value, list),
-            isinstance(value, dict),
-            value is None,
-        ]
-    )
+def derive_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+
+    value = str(value).strip().lower()
+    if value in ("1", "true", "yes", "on"):
+        return True
+    if value in ("0", "false", "no", "off", ""):
+        return False
+
+    raise ValueError("Unrecognized boolean value: {}.".format(value))
+
+
+def split_list(value: str) -> List[str]:
+    return [item for item in re.split(r"[,\s]+", value or "") if item]
+
+
+def split_mapping(value: str) -> Dict[str, str]:
+    # "a:1 b:2" -> {"a": "1", "b": "2"}
+    pairs = [item.partition(":") for item in split_list(value)]
+    return {key: val for key, _, val in pairs if val}
 
 
 def strip_chars(s: str) -> str:
     s = s.strip()
-    return re.sub(r"[^A-Za-z0-9:._\s]+", "", s)
+    return re.sub(r"[^A-Za-z0-9:._/\-\s]+", "", s)
 
 
 def config_file_to_config(p: str):
@@ -88,9 +98,12 @@ def config_file_to_config(p: str):
 
 
 def dump_dict(data: Dict[str, Any]) -> Dict[str, Prim]:
-    inner = {}
-    for key, value in data.items():
-        if not is_simple_type(value):
-            value = value.as_dict()
-        inner[key] = value
-    return inner
+    return {key: dump_value(value) for key, value in data.items()}
+
+
+def dump_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return [dump_value(item) for item in value]
+    if hasattr(value, "as_dict"):
+        return value.as_dict()
+    return value
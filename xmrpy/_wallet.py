@@ -15,24 +15,293 @@
 # IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
 # USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+import time
+import asyncio
+import contextlib
+import functools
+import itertools
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
 from urllib.parse import urlparse
-from xmrpy.t import Dict, List, Optional, Any, TransferType
+import httpx
+from xmrpy.t import (
+    Dict,
+    List,
+    Optional,
+    Any,
+    Tuple,
+    Iterator,
+    AsyncIterator,
+    FrozenSet,
+    TransferType,
+    Priority,
+    RpcError,
+    RpcException,
+)
 from xmrpy._http import HttpClient, Headers, RpcResponse
-from xmrpy._config import Config, config
-from xmrpy._logger import logger
+from xmrpy._config import Config, load_config
+from xmrpy._logger import logger, setup_logging
+from xmrpy._cache import ResponseCache
+from xmrpy._coalesce import SingleFlight, request_key
+from xmrpy._history import StateStore, TransferSync
+from xmrpy._methods import CACHE_TTLS, IDEMPOTENT_METHODS, PRIORITIES, READ_ONLY_METHODS, TIMEOUTS
+from xmrpy._pool import Endpoint, EndpointPool
+from xmrpy._raw import RawResult
+from xmrpy._retry import ERR_CIRCUIT_OPEN, ERR_DEADLINE, ERR_TRANSPORT, CircuitBreaker, RetryPolicy
+from xmrpy._utils import derive_bool, split_list, split_mapping
+from xmrpy._watcher import PaymentWatcher
 from xmrpy._result import *
+from xmrpy._result import _FullTransfer, _Payment, _Transfer
+
+if TYPE_CHECKING:
+    from xmrpy._index import TransferIndex
+
+_priority: ContextVar[Optional[Priority]] = ContextVar("xmrpy_priority", default=None)
+_deadline: ContextVar[Optional[float]] = ContextVar("xmrpy_deadline", default=None)
+_raw: ContextVar[bool] = ContextVar("xmrpy_raw", default=False)
+_primary: ContextVar[bool] = ContextVar("xmrpy_primary", default=False)
 
 
 class Client:
-    def __init__(self, conf: Optional[Config] = None, headers: Optional[Headers] = None):
-        self._config = conf or config
-        self._http = HttpClient(headers, timeout=int(self._config.HTTP_READ_TIMEOUT))
-        self.url = urlparse("http://" + self._config.WALLET_RPC_ADDR + "/json_rpc")
+    def __init__(
+        self,
+        conf: Optional[Config] = None,
+        headers: Optional[Headers] = None,
+        replicas: Optional[List[str]] = None,
+    ):
+        self._config = conf or load_config()
+        setup_logging(self._config)
+        self._pool = EndpointPool(
+            self._config.WALLET_RPC_ADDR,
+            replicas if replicas is not None else split_list(self._config.WALLET_RPC_REPLICA_ADDRS),
+            strategy=self._config.LOAD_BALANCE_STRATEGY,
+            breaker=functools.partial(
+                CircuitBreaker,
+                threshold=int(self._config.BREAKER_FAILURE_THRESHOLD),
+                reset_timeout=float(self._config.BREAKER_RESET_TIMEOUT),
+            ),
+        )
+        self._retry = RetryPolicy(
+            attempts=int(self._config.RETRY_ATTEMPTS),
+            backoff_base=float(self._config.RETRY_BACKOFF_BASE),
+            backoff_max=float(self._config.RETRY_BACKOFF_MAX),
+        )
+        self._http = HttpClient.from_config(self._config, headers, uds=self._pool.sockets())
+        read = float(self._config.HTTP_READ_TIMEOUT)
+        self._timeouts = {method: seconds for method, seconds in TIMEOUTS.items() if seconds > read}
+        self._timeouts.update(
+            {method: float(seconds) for method, seconds in split_mapping(self._config.METHOD_TIMEOUTS).items()}
+        )
+        self._coalesce = SingleFlight() if derive_bool(self._config.COALESCE_READS) else None
+        self._cache: Optional[ResponseCache] = None
+        if derive_bool(self._config.RESPONSE_CACHE):
+            self._cache = ResponseCache(max_size=int(self._config.RESPONSE_CACHE_SIZE))
+        self.url = urlparse(self._pool.primary.url)
+        self._ids = itertools.count(1)
+
+    async def __aenter__(self) -> "Client":
+        await self.warmup()
+        self.start_health_checks()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
 
     def auth(self):
         self._http.set_digest_auth(self._config.DIGEST_USER_NAME, self._config.DIGEST_USER_PASSWORD)
         return self
 
+    def auth_stats(self) -> Dict[str, int]:
+        """
+        Digest auth counters: 401 `challenges` paid, how many of them were `stale` nonces, and
+        how many requests were signed up front and `avoided` a challenge round trip
+        """
+        return self._http.auth_stats()
+
+    async def warmup(self, connections: Optional[int] = None):
+        """
+        Open `connections` pooled connections to every endpoint, primary and replicas, up front
+        (defaults to Config.HTTP_PREWARM_CONNECTIONS) by issuing that many concurrent get_version
+        calls to each. They're posted straight to the endpoint rather than routed, so neither read
+        coalescing nor the response cache can answer them without a connection
+        """
+        if connections is None:
+            connections = int(self._config.HTTP_PREWARM_CONNECTIONS)
+
+        async def warm(endpoint: Endpoint):
+            try:
+                data = Client._attach_default_params({"method": "get_version"})
+                await self._http.post(endpoint.url, data=data, ResultClass=Result.GetVersion.value)
+            except httpx.TransportError as err:
+                logger.warning("Pre-warming a connection to %s failed: %r", endpoint.addr, err)
+
+        await asyncio.gather(*[warm(endpoint) for endpoint in self._pool.endpoints for _ in range(connections)])
+
+    def start_health_checks(self, interval: Optional[float] = None):
+        """
+        Probe every replica with get_version each `interval` seconds (defaults to
+        Config.HEALTH_CHECK_INTERVAL); unhealthy replicas receive no reads until they recover
+        """
+        if interval is None:
+            interval = float(self._config.HEALTH_CHECK_INTERVAL)
+        self._pool.start_health_checks(self._http, interval)
+
+    def endpoints(self) -> List[Dict[str, Any]]:
+        """
+        Health, in-flight requests, latency, circuit breaker state and concurrency limit
+        (current limit, queue depth) of every endpoint
+        """
+        return [
+            dict(endpoint.as_dict(), concurrency=self._http.limiter_stats(endpoint.url))
+            for endpoint in self._pool.endpoints
+        ]
+
+    def coalesce_stats(self) -> Dict[str, int]:
+        """
+        With Config.COALESCE_READS, `hits` counts read-only calls that joined an identical call of
+        the same priority already in flight instead of sending their own request. Calls made
+        under a deadline are never shared
+        """
+        if self._coalesce is None:
+            return {"hits": 0, "misses": 0, "inflight": 0}
+        return self._coalesce.stats()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        if self._cache is None:
+            return {"hits": 0, "misses": 0, "evictions": 0, "size": 0, "height": None}
+        return self._cache.stats()
+
+    def invalidate_cache(self):
+        if self._cache is not None:
+            self._cache.invalidate()
+
+    async def close(self):
+        await self._pool.stop_health_checks()
+        await self._http.close()
+
+    @staticmethod
+    @contextlib.contextmanager
+    def priority(level: Priority) -> Iterator[None]:
+        """
+        Schedule every call made inside the block (and in tasks it starts) as `level`,
+        overriding the per-method default. Calls queue, and so get reordered, once a wallet-rpc
+        has Config.HTTP_MAX_CONNECTIONS in flight (or the adaptive limit, with
+        Config.ADAPTIVE_CONCURRENCY)
+
+            with wallet.priority(Priority.BACKGROUND):
+                transfers = await wallet.get_transfers()
+        """
+        token = _priority.set(level)
+        try:
+            yield
+        finally:
+            _priority.reset(token)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def deadline(seconds: float) -> Iterator[None]:
+        """
+        Give every call made inside the block (and in tasks it starts) a shared budget of
+        `seconds`; a nested deadline can only shorten it. Calls still running when it is spent
+        are cancelled, and calls made afterwards fail at once with ERR_DEADLINE
+
+            with wallet.deadline(0.2):
+                height = await wallet.get_height()
+        """
+        at = time.monotonic() + seconds
+        current = _deadline.get()
+        token = _deadline.set(at if current is None else min(current, at))
+        try:
+            yield
+        finally:
+            _deadline.reset(token)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def raw() -> Iterator[None]:
+        """
+        Leave the result of every call made inside the block undecoded: its `result` is a
+        RawResult holding the result's JSON bytes as the wallet sent them, to forward as is or
+        pick single fields from with `pointer()`. Errors are still decoded into RpcError. Batches
+        and streaming iterators always decode.
+
+            with wallet.raw():
+                r = await wallet.get_balance()
+            return Response(bytes(r.result), media_type="application/json")
+        """
+        token = _raw.set(True)
+        try:
+            yield
+        finally:
+            _raw.reset(token)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def primary() -> Iterator[None]:
+        """
+        Send every call made inside the block (and in tasks it starts) to the primary, fresh: reads
+        skip the replicas, the response cache and coalescing, so calls that must agree with each
+        other (a height and what was found below it) see the same wallet
+
+            with wallet.primary():
+                height = await wallet.get_height()
+                payments = await wallet.get_bulk_payments(payment_ids, cursor)
+        """
+        token = _primary.set(True)
+        try:
+            yield
+        finally:
+            _primary.reset(token)
+
+    def transfer_sync(
+        self,
+        store: Optional[StateStore] = None,
+        key: Optional[str] = None,
+        reorg_window: int = 10,
+        account_index: Optional[int] = None,
+    ) -> TransferSync:
+        """
+        Incremental get_transfers: each poll fetches only blocks above the cursor kept in `store`
+        (in memory by default) less `reorg_window`, and returns what changed (see TransferSync).
+        Every account is synced unless `account_index` picks one
+        """
+        return TransferSync(self, store=store, key=key, reorg_window=reorg_window, account_index=account_index)
+
+    def transfer_index(
+        self, path: str, key: Optional[str] = None, reorg_window: int = 10, account_index: Optional[int] = None
+    ) -> "TransferIndex":
+        """
+        A local SQLite index of this wallet's transfers at `path`, kept current by `refresh()`
+        (see TransferIndex). Every account is indexed unless `account_index` picks one
+        """
+        from xmrpy._index import TransferIndex
+
+        return TransferIndex(path, self, key=key, reorg_window=reorg_window, account_index=account_index)
+
+    def payment_watcher(self, **kwargs: Any) -> PaymentWatcher:
+        """
+        Watch many payment IDs at once with chunked, incremental get_bulk_payments polls
+        (see PaymentWatcher for the options)
+        """
+        return PaymentWatcher(self, **kwargs)
+
+    def batch(self, concurrent: bool = True) -> "Batch":
+        """
+        Queue calls and send them as a single JSON-RPC 2.0 batch when the context exits
+
+            async with wallet.batch() as b:
+                balance = await b.get_balance(0, [0])
+                height = await b.get_height()
+
+            print((await balance).result.balance, (await height).result.height)
+
+        Each queued call returns a future resolving to its RpcResponse once the batch is sent.
+        If the server rejects batch arrays, calls are sent individually from then on,
+        concurrently when `concurrent` is set; a batch that fails otherwise (5xx, 401, transport
+        error) resolves every call to the error.
+        """
+        return Batch(self, concurrent=concurrent)
+
     async def get_balance(self, account_index: int = 0, address_indices: List[int] = [0]) -> RpcResponse[Result]:
         return await self._send(
             {
@@ -42,6 +311,14 @@ class Client:
             Result.GetBalance,
         )
 
+    async def get_address(
+        self, account_index: int = 0, address_index: Optional[List[int]] = None
+    ) -> RpcResponse[Result]:
+        params: Dict[str, Any] = {"account_index": account_index}
+        if address_index is not None:
+            params["address_index"] = address_index
+        return await self._send({"method": "get_address", "params": params}, Result.GetAddress)
+
     async def get_address_index(self, address: str) -> RpcResponse[Result]:
         return await self._send(
             {"method": "get_address_index", "params": {"address": address}},
@@ -370,6 +647,20 @@ class Client:
             Result.GetBulkPayments,
         )
 
+    async def iter_bulk_payments(self, payment_ids: List[str], min_block_height: int) -> AsyncIterator[_Payment]:
+        async for _, payment in self._stream(
+            {
+                "method": "get_bulk_payments",
+                "params": {
+                    "payment_ids": payment_ids,
+                    "min_block_height": min_block_height,
+                },
+            },
+            frozenset(("payments",)),
+            _Payment,
+        ):
+            yield payment
+
     async def incoming_transfers(
         self,
         transfer_type: TransferType,
@@ -388,6 +679,26 @@ class Client:
             Result.IncomingTransfers,
         )
 
+    async def iter_incoming_transfers(
+        self,
+        transfer_type: TransferType,
+        account_index: int = 0,
+        subaddr_indices: Optional[List[int]] = None,
+    ) -> AsyncIterator[_Transfer]:
+        async for _, transfer in self._stream(
+            {
+                "method": "incoming_transfers",
+                "params": {
+                    "transfer_type": transfer_type.value,
+                    "account_index": account_index,
+                    "subaddr_indices": subaddr_indices,
+                },
+            },
+            frozenset(("transfers",)),
+            _Transfer,
+        ):
+            yield transfer
+
     async def query_key(self, key_type: str) -> RpcResponse[Result]:
         return await self._send(
             {"method": "query_key", "params": {"key_type": key_type}},
@@ -554,8 +865,68 @@ class Client:
             Result.CheckReserveProof,
         )
 
-    async def get_transfers(self) -> RpcResponse[Result]:
-        return await self._send({"method": "get_transfers"}, Result.GetTransfers)
+    async def get_transfers(
+        self,
+        in_: bool = True,
+        out: bool = True,
+        pending: bool = True,
+        failed: bool = True,
+        pool: bool = True,
+        account_index: int = 0,
+        subaddr_indices: Optional[List[int]] = None,
+        min_height: Optional[int] = None,
+        max_height: Optional[int] = None,
+        all_accounts: bool = False,
+    ) -> RpcResponse[Result]:
+        """
+        Transfers of the requested categories, filtered on the wallet's side. With `min_height`
+        and/or `max_height`, only transfers confirmed in blocks above `min_height` and up to
+        `max_height` (pending and pool transfers are always included). The result only decodes
+        the categories asked for.
+        """
+        categories = {"in": in_, "out": out, "pending": pending, "failed": failed, "pool": pool}
+        params: Dict[str, Any] = dict(categories, account_index=account_index)
+        if subaddr_indices:
+            params["subaddr_indices"] = subaddr_indices
+        if min_height is not None or max_height is not None:
+            params["filter_by_height"] = True
+            params["min_height"] = min_height or 0
+            if max_height is not None:
+                params["max_height"] = max_height
+        if all_accounts:
+            params["all_accounts"] = True
+
+        wanted = tuple(key for key, value in categories.items() if value)
+        return await self._send(
+            {"method": "get_transfers", "params": params},
+            Result.GetTransfers,
+            only=wanted if len(wanted) < len(categories) else None,
+        )
+
+    async def iter_transfers(
+        self,
+        in_: bool = True,
+        out: bool = True,
+        pending: bool = True,
+        failed: bool = True,
+        pool: bool = True,
+        account_index: int = 0,
+        subaddr_indices: Optional[List[int]] = None,
+    ) -> AsyncIterator[_FullTransfer]:
+        """
+        Stream transfers one at a time as the response is parsed, so memory stays bounded
+        regardless of wallet history size. Each transfer's category is in its `type` field.
+        """
+        categories = {"in": in_, "out": out, "pending": pending, "failed": failed, "pool": pool}
+        async for _, transfer in self._stream(
+            {
+                "method": "get_transfers",
+                "params": dict(categories, account_index=account_index, subaddr_indices=subaddr_indices),
+            },
+            frozenset(key for key, value in categories.items() if value),
+            _FullTransfer,
+        ):
+            yield transfer
 
     async def get_transfer_by_txid(self, txid: str, account_index: int) -> RpcResponse[Result]:
         return await self._send(
@@ -610,6 +981,14 @@ class Client:
             Result.ExportKeyImages,
         )
 
+    async def iter_key_images(self, all: bool = False) -> AsyncIterator[SignedKeyImage]:
+        async for _, key_image in self._stream(
+            {"method": "export_key_images", "params": {"all": all}},
+            frozenset(("signed_key_images",)),
+            SignedKeyImage,
+        ):
+            yield key_image
+
     async def import_key_images(self, signed_key_images: List[SignedKeyImage]) -> RpcResponse[Result]:
         return await self._send(
             {
@@ -898,7 +1277,15 @@ class Client:
     async def transfer_sign_submit(self, **kwargs):
         """
         Custom RPC method intended to simplify the steps of sending a transfer
+
+        With `timeout` (seconds) the three steps share one deadline, and once it is spent the
+        remaining steps are not sent
         """
+        timeout = kwargs.pop("timeout", None)
+        if timeout is not None:
+            with self.deadline(timeout):
+                return await self.transfer_sign_submit(**kwargs)
+
         destinations = kwargs.get("destinations")
         account_index = kwargs.get("account_index")
         subaddress_indices = kwargs.get("subaddress_indices")
@@ -954,13 +1341,255 @@ class Client:
 
         return result
 
-    async def _send(self, args: Dict[str, Any], ResultClass: Result) -> RpcResponse[Result]:
+    async def _send(
+        self, args: Dict[str, Any], ResultClass: Result, only: Optional[Tuple[str, ...]] = None
+    ) -> RpcResponse[Result]:
+        """
+        With `only`, the result decodes just those keys (see DataClass.only)
+        """
         data = Client._attach_default_params(args)
-        rpcmsg: RpcResponse[Result] = await self._http.post(self.url.geturl(), data=data, ResultClass=ResultClass.value)
+        method = data.get("method")
+        # Anything with a cache TTL gets a key (query_key, get_attribute too); only reads are coalesced
+        key = request_key(data) if method in READ_ONLY_METHODS or method in CACHE_TTLS else None
+        result_class = ResultClass.value.only(*only) if only is not None else ResultClass.value
+        if _raw.get():
+            result_class = RawResult
+            key = None if key is None else "raw:" + key
+
+        cache = self._cache
+        if cache is not None and key is not None and cache.cacheable(method) and not _primary.get():
+            cached: Optional[RpcResponse[Result]] = cache.get(key)
+            if cached is not None:
+                return cached
+
+        priority = Client._priority_for(method)
+        # Joiners wait on the first caller's task, which runs in its context: share only calls of the same
+        # priority, and none made under a deadline (a joiner would get the first caller's ERR_DEADLINE) or
+        # pinned to the primary
+        shareable = method in READ_ONLY_METHODS and _deadline.get() is None and not _primary.get()
+        if self._coalesce is not None and key is not None and shareable:
+            shared = "{}:{}".format(priority.value, key)
+            rpcmsg = await self._coalesce.do(shared, lambda: self._dispatch(data, result_class, priority))
+        else:
+            rpcmsg = await self._dispatch(data, result_class, priority)
+
+        if cache is not None:
+            cache.observe(method, rpcmsg)
+            if key is not None and cache.cacheable(method) and not rpcmsg.is_err():
+                cache.put(key, method, rpcmsg)  # type: ignore
         return rpcmsg
 
+    async def _dispatch(self, data: Dict[str, Any], ResultClass: Any, priority: Priority) -> RpcResponse[Result]:
+        method = data.get("method")
+        attempts = self._retry.attempts if method in IDEMPOTENT_METHODS else 1
+
+        for attempt in range(attempts):
+            if attempt:
+                delay = self._retry.delay(attempt - 1)
+                remaining = Client._remaining()
+                if remaining is not None and remaining <= delay:
+                    break
+                await asyncio.sleep(delay)
+                logger.info("Retrying %s (attempt %s/%s)", method, attempt + 1, attempts)
+
+            endpoint = self._pool.primary if _primary.get() else self._pool.select(method)
+            rpcmsg = await self._call(endpoint, data, ResultClass, priority)
+            if not Client._failed(rpcmsg):
+                return rpcmsg
+
+        return rpcmsg
+
+    async def _call(
+        self, endpoint: Endpoint, data: Dict[str, Any], ResultClass: Any, priority: Priority
+    ) -> RpcResponse[Result]:
+        method = data.get("method")
+        timeout = self._timeouts.get(method)  # type: ignore
+        remaining = Client._remaining()
+        if remaining is not None:
+            if remaining <= 0:
+                return HttpClient._error_response(ERR_DEADLINE, "Deadline exceeded before {} was sent".format(method))
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+        if not endpoint.breaker.allow():
+            return HttpClient._error_response(ERR_CIRCUIT_OPEN, "Circuit breaker open for {}".format(endpoint.addr))
+
+        async def send() -> RpcResponse[Result]:
+            with self._pool.track(endpoint):
+                return await self._http.post(
+                    endpoint.url, data=data, ResultClass=ResultClass, priority=priority, timeout=timeout
+                )
+
+        try:
+            # The deadline covers queueing for a slot too, which the HTTP timeouts don't
+            rpcmsg = await (send() if remaining is None else asyncio.wait_for(send(), remaining))
+        except httpx.TransportError as err:
+            logger.error("%s to %s failed: %r", data.get("method"), endpoint.addr, err)
+            rpcmsg = HttpClient._error_response(ERR_TRANSPORT, "{}: {}".format(type(err).__name__, err))
+        except asyncio.TimeoutError:
+            endpoint.breaker.release()
+            logger.warning("%s to %s cancelled at its deadline", method, endpoint.addr)
+            return HttpClient._error_response(ERR_DEADLINE, "Deadline exceeded during {}".format(method))
+        except BaseException:
+            endpoint.breaker.release()
+            raise
+
+        if Client._failed(rpcmsg):
+            endpoint.breaker.failure()
+        else:
+            endpoint.breaker.success()
+        return rpcmsg
+
+    @staticmethod
+    def _failed(rpcmsg: RpcResponse[Result]) -> bool:
+        # Transport errors, open breakers and 5xx statuses are endpoint failures; JSON-RPC errors are not
+        return rpcmsg.is_err() and (rpcmsg.error.code >= 500 or rpcmsg.error.code in (ERR_TRANSPORT, ERR_CIRCUIT_OPEN))
+
+    async def _stream(
+        self, args: Dict[str, Any], keys: FrozenSet[str], ItemClass: Any
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        data = Client._attach_default_params(args)
+        method = data.get("method")
+        remaining = Client._remaining()
+        if remaining is not None and remaining <= 0:
+            raise RpcException(
+                RpcError({"code": ERR_DEADLINE, "message": "Deadline exceeded before {} was sent".format(method)})
+            )
+
+        endpoint = self._pool.primary if _primary.get() else self._pool.select(method)
+        if not endpoint.breaker.allow():
+            raise RpcException(
+                RpcError({"code": ERR_CIRCUIT_OPEN, "message": "Circuit breaker open for {}".format(endpoint.addr)})
+            )
+
+        make = ItemClass.wrap if self._http.lazy_results else ItemClass
+        try:
+            with self._pool.track(endpoint):
+                async for key, item in self._http.stream(
+                    endpoint.url, data, keys, Client._priority_for(method), self._stream_timeout(method)
+                ):
+                    yield key, make(item)
+        except httpx.TransportError:
+            endpoint.breaker.failure()
+            raise
+        except BaseException:
+            endpoint.breaker.release()
+            raise
+        endpoint.breaker.success()
+
+    def _stream_timeout(self, method: Optional[str]) -> Optional[float]:
+        timeout = self._timeouts.get(method)  # type: ignore
+        remaining = Client._remaining()
+        if remaining is None:
+            return timeout
+        return max(0.0, remaining) if timeout is None else max(0.0, min(timeout, remaining))
+
+    @staticmethod
+    def _remaining() -> Optional[float]:
+        deadline = _deadline.get()
+        return None if deadline is None else deadline - time.monotonic()
+
+    @staticmethod
+    def _priority_for(method: Optional[str]) -> Priority:
+        level = _priority.get()
+        if level is not None:
+            return level
+        return PRIORITIES.get(method, Priority.NORMAL)  # type: ignore
+
     @staticmethod
     def _attach_default_params(data: Dict[str, Any]) -> Dict[str, Any]:
         payload = {"id": "0", "jsonrpc": "2.0"}
         payload.update(data)
         return payload
+
+
+class Batch(Client):
+    """
+    Queues the RPC methods of Client instead of sending them (see Client.batch). The stats and
+    cache helpers report on the wallet the batch came from; streaming iterators and the other
+    helpers that send requests of their own raise TypeError
+    """
+
+    def __init__(self, client: Client, concurrent: bool = True):
+        self._config = client._config
+        self._http = client._http
+        self._pool = client._pool
+        self._cache = client._cache
+        self._coalesce = client._coalesce
+        self.url = client.url
+        self._client = client
+        self._concurrent = concurrent
+        self._calls: List[Tuple[Dict[str, Any], Any, "asyncio.Future[RpcResponse[Result]]"]] = []
+
+    async def __aenter__(self) -> "Batch":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.flush()
+            return
+
+        for _, _, future in self._calls:
+            future.cancel()
+        self._calls = []
+
+    async def flush(self):
+        calls, self._calls = self._calls, []
+        if not calls:
+            return
+
+        try:
+            responses = await self._http.post_batch(
+                self.url.geturl(),
+                [(data, ResultClass) for data, ResultClass, _ in calls],
+                concurrent=self._concurrent,
+                priority=Client._priority_for(None),
+            )
+        except httpx.TransportError as err:
+            logger.error("Batch of %s calls to %s failed: %r", len(calls), self.url.netloc, err)
+            message = "{}: {}".format(type(err).__name__, err)
+            responses = [HttpClient._error_response(ERR_TRANSPORT, message, data["id"]) for data, _, _ in calls]
+        except BaseException:
+            for _, _, future in calls:
+                future.cancel()
+            raise
+
+        for (data, _, future), response in zip(calls, responses):
+            # Batched writes make cached reads stale just like direct ones
+            if self._cache is not None:
+                self._cache.observe(data["method"], response)
+            future.set_result(response)
+
+    async def _send(  # type: ignore
+        self, args: Dict[str, Any], ResultClass: Result, only: Optional[Tuple[str, ...]] = None
+    ) -> "asyncio.Future[RpcResponse[Result]]":
+        data = Client._attach_default_params(args)
+        data["id"] = str(next(self._client._ids))
+        future: "asyncio.Future[RpcResponse[Result]]" = asyncio.get_running_loop().create_future()
+        result_class = ResultClass.value.only(*only) if only is not None else ResultClass.value
+        self._calls.append((data, result_class, future))
+        return future
+
+
+def _unbatchable(name: str) -> Any:
+    def method(self: Batch, *args: Any, **kwargs: Any) -> Any:
+        raise TypeError("{}() can't be queued in a batch, call it on the wallet instead".format(name))
+
+    method.__name__ = method.__qualname__ = name
+    return method
+
+
+for _name in (
+    "batch",
+    "close",
+    "iter_bulk_payments",
+    "iter_incoming_transfers",
+    "iter_key_images",
+    "iter_transfers",
+    "payment_watcher",
+    "start_health_checks",
+    "transfer_index",
+    "transfer_sign_submit",
+    "transfer_sync",
+    "warmup",
+):
+    setattr(Batch, _name, _unbatchable(_name))
@@ -0,0 +1,196 @@
+# Copyright 2021 Rashad Alston
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial
+# portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO
+# EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE
+# USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Watching many open invoices (payment IDs) for payments with get_bulk_payments: active IDs are
+sent in a few evenly sized chunks, each asking only for blocks above the height it last
+scanned, and an invoice leaves the set once it's paid in full
+"""
+
+import math
+import string
+import asyncio
+from xmrpy._logger import logger
+from xmrpy._result import _Payment
+from xmrpy.t import Any, AsyncIterator, Callable, Dict, List, Optional, Priority, Tuple
+
+
+class PaymentEvent:
+    """
+    A payment to a watched payment ID: `received` is the invoice's running total and `settled`
+    whether that reached the amount it was added with (it's then no longer watched)
+    """
+
+    __slots__ = ("payment_id", "payment", "received", "settled")
+
+    def __init__(self, payment_id: str, payment: _Payment, received: int, settled: bool):
+        self.payment_id = payment_id
+        self.payment = payment
+        self.received = received
+        self.settled = settled
+
+    def __repr__(self) -> str:
+        return "PaymentEvent({}, amount={}, received={}, settled={})".format(
+            self.payment_id, getattr(self.payment, "amount", None), self.received, self.settled
+        )
+
+
+class _Invoice:
+    __slots__ = ("amount", "received", "cursor")
+
+    def __init__(self, amount: Optional[int], cursor: int):
+        self.amount = amount
+        self.received = 0
+        self.cursor = cursor
+
+
+class PaymentWatcher:
+    """
+    Polls get_bulk_payments for every watched payment ID. Each poll sorts the active IDs by the
+    height they were last scanned to and splits them into evenly sized chunks of at most
+    `chunk_size`, sent `concurrency` at a time at background priority; a chunk asks for blocks
+    above its lowest cursor, so once IDs have been polled together a poll only covers the blocks
+    found since. Payments are reported once they have `confirmations` confirmations, to
+    `on_payment` (a function or coroutine function) and/or `queue`, and are returned by `poll()`.
+    Polls read from the primary wallet-rpc only (see Wallet.primary), never from replicas.
+
+        watcher = wallet.payment_watcher(queue=events)
+        watcher.add(invoice.payment_id, amount=invoice.amount, height=invoice.created_at)
+        asyncio.create_task(watcher.run(interval=20))
+    """
+
+    def __init__(
+        self,
+        wallet: Any,
+        on_payment: Optional[Callable[[PaymentEvent], Any]] = None,
+        queue: Optional["asyncio.Queue[PaymentEvent]"] = None,
+        chunk_size: int = 1000,
+        concurrency: int = 4,
+        confirmations: int = 1,
+    ):
+        self._wallet = wallet
+        self._on_payment = on_payment
+        self._queue = queue
+        self.chunk_size = max(1, chunk_size)
+        self.concurrency = max(1, concurrency)
+        self.confirmations = max(1, confirmations)
+        self._invoices: Dict[str, _Invoice] = {}
+
+    def __len__(self) -> int:
+        return len(self._invoices)
+
+    def __contains__(self, payment_id: str) -> bool:
+        return payment_id in self._invoices
+
+    def add(self, payment_id: str, amount: Optional[int] = None, height: int = 0):
+        """
+        Watch `payment_id` for payments in blocks above `height` until `amount` (atomic units)
+        has been received; without `amount` it's watched until removed
+        """
+        if len(payment_id) not in (16, 64) or not all(c in string.hexdigits for c in payment_id):
+            raise ValueError("Invalid payment ID: {!r}".format(payment_id))
+        self._invoices[payment_id] = _Invoice(amount, height)
+
+    def remove(self, payment_id: str):
+        self._invoices.pop(payment_id, None)
+
+    def chunks(self) -> List[Tuple[int, List[str]]]:
+        """
+        The (min_block_height, payment IDs) requests the next poll sends
+        """
+        ordered = sorted(self._invoices, key=lambda payment_id: self._invoices[payment_id].cursor)
+        if not ordered:
+            return []
+        size = math.ceil(len(ordered) / math.ceil(len(ordered) / self.chunk_size))
+        chunks = [ordered[i : i + size] for i in range(0, len(ordered), size)]
+        return [(self._invoices[chunk[0]].cursor, chunk) for chunk in chunks]
+
+    async def poll(self) -> List[PaymentEvent]:
+        # Cursors advance to the height a poll saw, so the height and the payments below it have to come
+        # from the same wallet-rpc: a replica that is behind would have cursors skip blocks it hasn't seen
+        with self._wallet.primary():
+            response = await self._wallet.get_height()
+            if response.is_err():
+                logger.warning("Payment watcher couldn't get the wallet height: %s", response.error.message)
+                return []
+            # Highest block whose payments have enough confirmations
+            target = response.result.height - self.confirmations
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def scan(cursor: int, payment_ids: List[str]) -> List[PaymentEvent]:
+                async with semaphore:
+                    return await self._scan(cursor, payment_ids, target)
+
+            with self._wallet.priority(Priority.BACKGROUND):
+                results = await asyncio.gather(
+                    *[scan(cursor, payment_ids) for cursor, payment_ids in self.chunks() if cursor < target]
+                )
+
+        events = [event for chunk in results for event in chunk]
+        for event in events:
+            await self._deliver(event)
+        return events
+
+    async def run(self, interval: float = 30.0):
+        while self._invoices:
+            await self.poll()
+            await asyncio.sleep(interval)
+
+    async def events(self, interval: float = 30.0) -> AsyncIterator[PaymentEvent]:
+        """
+        Poll every `interval` seconds for as long as any payment ID is watched, yielding events
+        """
+        while self._invoices:
+            for event in await self.poll():
+                yield event
+            await asyncio.sleep(interval)
+
+    async def _scan(self, cursor: int, payment_ids: List[str], target: int) -> List[PaymentEvent]:
+        response = await self._wallet.get_bulk_payments(payment_ids, cursor)
+        if response.is_err():
+            # The chunk's cursors stay put, so the next poll covers these blocks again
+            logger.warning("get_bulk_payments failed for %s IDs: %s", len(payment_ids), response.error.message)
+            return []
+
+        events: List[PaymentEvent] = []
+        payments = sorted(getattr(response.result, "payments", None) or (), key=lambda payment: payment.block_height)
+        for payment in payments:
+            invoice = self._invoices.get(payment.payment_id)
+            # Chunks ask from their lowest cursor, so skip what an ID's own cursor already covered
+            if invoice is None or not invoice.cursor < payment.block_height <= target:
+                continue
+            invoice.received += payment.amount
+            settled = invoice.amount is not None and invoice.received >= invoice.amount
+            events.append(PaymentEvent(payment.payment_id, payment, invoice.received, settled))
+
+        for payment_id in payment_ids:
+            invoice = self._invoices.get(payment_id)
+            if invoice is None:
+                continue
+            invoice.cursor = max(invoice.cursor, target)
+            if invoice.amount is not None and invoice.received >= invoice.amount:
+                del self._invoices[payment_id]
+        return events
+
+    async def _deliver(self, event: PaymentEvent):
+        if self._on_payment is not None:
+            result = self._on_payment(event)
+            if asyncio.iscoroutine(result):
+                await result
+        if self._queue is not None:
+            await self._queue.put(event)
@@ -18,6 +18,7 @@
 # pylint: disable=unused-import
 import enum
 import json
+import keyword
 from typing import (
     Dict,
     TypeVar,
@@ -26,11 +27,22 @@ from typing import (
     Callable,
     Optional,
     List,
+    Tuple,
     Mapping,
     Generic,
+    Generator,
+    AsyncIterator,
+    FrozenSet,
+    Iterator,
+    Awaitable,
+    Deque,
+    Iterable,
+    Sequence,
+    Type,
+    cast,
 )
 
-__all__ = ["Headers", "TransferType"]
+__all__ = ["Headers", "TransferType", "Priority"]
 
 T = TypeVar("T")
 
@@ -47,8 +59,78 @@ class TransferType(enum.Enum):
     unavailable = "unavailable"
 
 
-class DataClass:
-    def __init__(self, data: Mapping[str, Optional[Any]], **kwargs: Dict[str, Optional[Any]]):
+class Priority(enum.IntEnum):
+    """
+    Scheduling class of a call: when requests queue for a wallet-rpc, interactive calls are
+    sent before normal ones, and normal before background scans
+    """
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+def _field_converter(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    # Nested objects and lists of objects of a lazy instance become lazy instances of the
+    # annotated DataClass subclass
+    if isinstance(annotation, type) and issubclass(annotation, DataClass):
+        return lambda value: _wrap(annotation, value)
+
+    args = getattr(annotation, "__args__", None) or ()
+    if getattr(annotation, "__origin__", None) is list and args and isinstance(args[0], type):
+        item = args[0]
+        if issubclass(item, DataClass):
+
+            def convert(value: Any) -> Any:
+                if not isinstance(value, list):
+                    return value
+                return [_wrap(item, v) for v in value]
+
+            return convert
+    return None
+
+
+def _wrap(cls: Any, value: Any) -> Any:
+    return cls.wrap(value) if isinstance(value, dict) else value
+
+
+class _DataClassMeta(type):
+    """
+    Gives every DataClass subclass `__slots__` generated from its annotations, so instances
+    carry no per-instance `__dict__`, plus the converters wrap() uses for its nested fields
+    """
+
+    def __new__(mcs, name: str, bases: Tuple[type, ...], namespace: Dict[str, Any]):
+        annotations = namespace.get("__annotations__", {})
+        if "__slots__" not in namespace:
+            namespace["__slots__"] = tuple(attr for attr in annotations if attr not in namespace)
+        cls = super().__new__(mcs, name, bases, namespace)
+
+        fields: Dict[str, Tuple[str, Optional[Callable[[Any], Any]]]] = {}
+        for base in reversed(cls.__mro__[1:]):
+            fields.update(getattr(base, "_fields", {}))
+        for attr in namespace["__slots__"]:
+            if attr in annotations:
+                # Keyword keys ("in") are stored under a trailing underscore ("in_")
+                key = attr[:-1] if attr.endswith("_") and keyword.iskeyword(attr[:-1]) else attr
+                fields[key] = (attr, _field_converter(annotations[attr]))
+        cls._fields = fields  # type: ignore
+        cls._keys = {attr: key for key, (attr, _) in fields.items()}  # type: ignore
+        return cls
+
+
+class DataClass(metaclass=_DataClassMeta):
+    # `_extra` holds keys without an annotated field of their own (None when there are none);
+    # `_raw` is the decoded JSON a lazy instance (see wrap()) materializes its fields from
+    __slots__ = ("_extra", "_raw")
+    _fields: Dict[str, Tuple[str, Optional[Callable[[Any], Any]]]] = {}
+    _keys: Dict[str, str] = {}
+    # Set on the classes only() derives: keys outside `_fields` are dropped rather than kept as extras
+    _skip = False
+
+    def __init__(self, data: Mapping[str, Optional[Any]] = None, **kwargs: Dict[str, Optional[Any]]):  # type: ignore
+        self._extra: Optional[Dict[str, Any]] = None
+        self._raw: Optional[Dict[str, Any]] = None
         if data:
             if isinstance(data, str):
                 as_dict: Dict[str, Any] = json.loads(data)
@@ -61,23 +143,136 @@ class DataClass:
         elif kwargs:
             self._inject_props(kwargs)
 
+    @classmethod
+    def wrap(cls, data: Dict[str, Any]):
+        """
+        A lazy instance over the decoded JSON `data`: each field is built (and cached) the first
+        time it's read, and as_dict() returns `data` itself. Treat it as read-only, changes to
+        it aren't reflected in as_dict()
+        """
+        self = cls.__new__(cls)
+        self._extra = None
+        self._raw = data
+        return self
+
+    @classmethod
+    def only(cls, *keys: str) -> Type["DataClass"]:
+        """
+        A subclass of `cls` whose decoder builds only the fields for `keys` and skips everything
+        else in the reply without decoding it
+
+            GetTransfersResult.only("in", "pool")
+        """
+        selected = frozenset(keys)
+        derived: Optional[Dict[FrozenSet[str], Type[DataClass]]] = cls.__dict__.get("_derived")
+        if derived is None:
+            derived = {}
+            cls._derived = derived  # type: ignore
+        subclass = derived.get(selected)
+        if subclass is None:
+            name = "{}[{}]".format(cls.__name__, ",".join(sorted(selected)))
+            namespace = {"__slots__": (), "__module__": cls.__module__, "__reduce__": _reduce_only}
+            subclass = cast(Type[DataClass], _DataClassMeta(name, (cls,), namespace))
+            subclass._fields = {key: field for key, field in cls._fields.items() if key in selected}
+            subclass._keys = {attr: key for key, (attr, _) in subclass._fields.items()}
+            subclass._skip = True
+            derived[selected] = subclass
+        return subclass
+
     def serialize(self) -> bytes:
         return json.dumps(self.as_dict()).encode()
 
     def as_dict(self) -> Dict[str, Prim]:
+        if self._raw is not None:
+            return self._raw
+
         from xmrpy._utils import dump_dict
 
-        return dump_dict(self.__dict__)
+        return dump_dict(dict(self.items()))
 
     def _inject_props(self, data: Dict[str, Any]):
-        for key, value in data.items():
-            self.__dict__[key] = DataClass(value) if isinstance(value, dict) else value
+        # Each class compiles its own decoder (see xmrpy._decoder) the first time it's built
+        cls = type(self)
+        fill = cls.__dict__.get("_fill")
+        if fill is None:
+            from xmrpy._decoder import filler
+
+            fill = filler(cls)
+            cls._fill = fill  # type: ignore
+        fill(self, data)
+
+    def _materialize(self, key: str, value: Any) -> Any:
+        field = self._fields.get(key)
+        if field is not None and field[1] is not None:
+            return field[1](value)
+        return _wrap(DataClass, value)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for names that aren't set fields
+        extra = object.__getattribute__(self, "_extra")
+        if extra is not None and name in extra:
+            return extra[name]
+
+        raw = object.__getattribute__(self, "_raw")
+        key = self._keys.get(name, name)
+        if raw is not None and key in raw and (key in self._fields or not self._skip):
+            value = self._materialize(key, raw[key])
+            if name in self._keys:
+                setattr(self, name, value)
+            else:
+                if extra is None:
+                    self._extra = extra = {}
+                extra[name] = value
+            return value
+
+        raise AttributeError("{!r} object has no attribute {!r}".format(type(self).__name__, name))
+
+    def __getitem__(self, key: str) -> Any:
+        field = self._fields.get(key)
+        try:
+            return getattr(self, field[0] if field is not None else key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
 
     def __contains__(self, key: str) -> bool:
-        return key in self.__dict__
+        if self._raw is not None:
+            return key in self._raw and (key in self._fields or not self._skip)
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
 
     def items(self):
-        return self.__dict__.items()
+        if self._raw is not None:
+            for key in self._raw:
+                if key in self._fields or not self._skip:
+                    yield key, self[key]
+            return
+
+        for key, (attr, _) in self._fields.items():
+            try:
+                yield key, getattr(self, attr)
+            except AttributeError:
+                continue
+        if self._extra is not None:
+            yield from self._extra.items()
+
+
+def _reduce_only(self: DataClass) -> Any:
+    # Classes made by only() can't be found by name, so they pickle as their base plus the keys
+    cls = type(self)
+    return _restore_only, (cls.__bases__[0], tuple(cls._fields), self.as_dict())
+
+
+def _restore_only(cls: Type[DataClass], keys: Tuple[str, ...], data: Dict[str, Any]) -> DataClass:
+    return cls.only(*keys)(data)
 
 
 class RpcError(DataClass):
@@ -85,6 +280,12 @@ class RpcError(DataClass):
     message: str
 
 
+class RpcException(Exception):
+    def __init__(self, error: RpcError):
+        super().__init__("{} ({})".format(error.message, error.code))
+        self.error = error
+
+
 class RpcResponse(DataClass, Generic[T]):
     error: RpcError
     result: T
@@ -92,15 +293,10 @@ class RpcResponse(DataClass, Generic[T]):
     jsonrpc: str
 
     def is_err(self) -> bool:
-        return self.__dict__.get("error") is not None
+        return getattr(self, "error", None) is not None
 
     def err_details(self) -> Optional[str]:
         if self.is_err():
             m: str = self.error.message
             return m
         return None
-
-    def as_dict(self) -> Dict[str, Prim]:
-        from xmrpy._utils import dump_dict
-
-        return dump_dict(self.__dict__)